@@ -0,0 +1,59 @@
+"""Benchmark of the LPT schedulers.
+
+To run, use 'python3 lpt_benchmark.py [max_exponent]'.
+
+This benchmark measures how the scheduling time of lpt,
+lpt_with_limits and list_scheduler_for_uniform_resources grows with:
+    - the number of tasks (10^3 up to 10^max_exponent, default 6) for
+    a fixed number of resources (100);
+    - the number of resources (10 up to 10^4) for a fixed number of
+    tasks (10^5).
+Task loads come from a uniform distribution.
+"""
+
+import sys
+import time
+
+import simulator.schedulers as schedulers
+import simulator.support as support
+
+
+def run(scheduler_name, num_tasks, num_resources):
+    """Returns the time in seconds taken to schedule a uniform workload."""
+    task_loads = support.generate_uniform_loads(
+            num_tasks, 1, 100, 42, as_array=True)
+    start = time.perf_counter()
+    if scheduler_name == 'lpt':
+        schedulers.lpt(task_loads, num_resources)
+    elif scheduler_name == 'lpt_with_limits':
+        task_limit = -(-num_tasks // num_resources) + 1
+        schedulers.lpt_with_limits(task_loads, num_resources, task_limit)
+    else:
+        resource_speeds = [1 + resource % 4
+                           for resource in range(num_resources)]
+        schedulers.list_scheduler_for_uniform_resources(
+                task_loads, num_resources, resource_speeds)
+    return time.perf_counter() - start
+
+
+def report(scenarios):
+    """Prints the time and throughput of each scheduler per scenario."""
+    names = ['lpt', 'lpt_with_limits', 'uniform_resources']
+    print(f'{"tasks":>10} {"resources":>10} ' +
+          ' '.join(f'{name:>24}' for name in names))
+    for num_tasks, num_resources in scenarios:
+        cells = []
+        for name in names:
+            elapsed = run(name, num_tasks, num_resources)
+            cells.append(f'{elapsed:8.3f}s {num_tasks/elapsed:11.0f} t/s')
+        print(f'{num_tasks:>10} {num_resources:>10} ' +
+              ' '.join(f'{cell:>24}' for cell in cells))
+
+
+max_exponent = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+
+print('Scaling in the number of tasks (100 resources)')
+report([(10**exponent, 100) for exponent in range(3, max_exponent + 1)])
+
+print('\nScaling in the number of resources (10^5 tasks)')
+report([(10**5, 10**exponent) for exponent in range(1, 5)])
@@ -0,0 +1,438 @@
+"""Module containing a benchmark harness for schedulers and evaluators.
+
+Each benchmark schedules (or evaluates) a workload for a combination of
+load distribution, number of tasks and number of resources. It records
+the wall time (best of a few repetitions), the peak memory allocated
+during one run (with tracemalloc) and the throughput in tasks per
+second. Results can be saved as JSON baselines and compared with later
+runs to detect performance regressions.
+
+To run, use 'python3 -m simulator.bench [options]'. For example:
+    python3 -m simulator.bench --tasks 1000 100000 --save baseline.json
+    python3 -m simulator.bench --tasks 1000 100000 --compare baseline.json
+Use 'python3 -m simulator.bench --help' for the list of options.
+"""
+
+import argparse     # for the command line
+import json         # for baselines
+import platform     # for describing the machine
+import sys          # for the exit status
+import time         # for timing
+import tracemalloc  # for peak memory
+import numpy as np  # for arrays
+
+import simulator.schedulers as schedulers
+import simulator.schedulers_np as schedulers_np
+import simulator.support as support
+import simulator.workloads as workloads
+
+# Version of the baseline files
+BASELINE_VERSION = 1
+
+
+def _round_robin(task_loads, num_resources, mapping):
+    schedulers.round_robin(len(task_loads), num_resources)
+
+
+def _compact(task_loads, num_resources, mapping):
+    schedulers.compact(len(task_loads), num_resources)
+
+
+def _uniformly_random(task_loads, num_resources, mapping):
+    schedulers.uniformly_random(len(task_loads), num_resources, 0)
+
+
+def _list_scheduler(task_loads, num_resources, mapping):
+    schedulers.list_scheduler(task_loads, num_resources)
+
+
+def _lpt(task_loads, num_resources, mapping):
+    schedulers.lpt(task_loads, num_resources)
+
+
+def _lpt_with_limits(task_loads, num_resources, mapping):
+    task_limit = -(-len(task_loads) // num_resources) + 1
+    schedulers.lpt_with_limits(task_loads, num_resources, task_limit)
+
+
+def _uniform_resources(task_loads, num_resources, mapping):
+    resource_speeds = [1 + resource % 4 for resource in range(num_resources)]
+    schedulers.list_scheduler_for_uniform_resources(
+            task_loads, num_resources, resource_speeds)
+
+
+def _karmarkar_karp(task_loads, num_resources, mapping):
+    schedulers.karmarkar_karp(task_loads, num_resources)
+
+
+def _multifit(task_loads, num_resources, mapping):
+    schedulers.multifit(task_loads, num_resources)
+
+
+def _round_robin_np(task_loads, num_resources, mapping):
+    schedulers_np.round_robin(len(task_loads), num_resources)
+
+
+def _compact_np(task_loads, num_resources, mapping):
+    schedulers_np.compact(len(task_loads), num_resources)
+
+
+def _uniformly_random_np(task_loads, num_resources, mapping):
+    schedulers_np.uniformly_random(len(task_loads), num_resources, 0)
+
+
+def _list_scheduler_np(task_loads, num_resources, mapping):
+    schedulers_np.list_scheduler(task_loads, num_resources)
+
+
+def _block_list_scheduler_np(task_loads, num_resources, mapping):
+    schedulers_np.block_list_scheduler(task_loads, num_resources)
+
+
+def _evaluate_mapping(task_loads, num_resources, mapping):
+    support.evaluate_mapping(mapping, task_loads, num_resources,
+                             verbose=False)
+
+
+# Benchmarks available by name.
+# Each one is called as benchmark(task_loads, num_resources, mapping),
+# where mapping is a round-robin mapping (used by evaluators only).
+BENCHMARKS = {
+    'round_robin': _round_robin,
+    'compact': _compact,
+    'uniformly_random': _uniformly_random,
+    'list_scheduler': _list_scheduler,
+    'lpt': _lpt,
+    'lpt_with_limits': _lpt_with_limits,
+    'uniform_resources': _uniform_resources,
+    'karmarkar_karp': _karmarkar_karp,
+    'multifit': _multifit,
+    'round_robin_np': _round_robin_np,
+    'compact_np': _compact_np,
+    'uniformly_random_np': _uniformly_random_np,
+    'list_scheduler_np': _list_scheduler_np,
+    'block_list_scheduler_np': _block_list_scheduler_np,
+    'evaluate_mapping': _evaluate_mapping,
+}
+
+# Load distributions available by name.
+# Each one is called as distribution(num_tasks, rng_seed).
+DISTRIBUTIONS = {
+    'uniform': lambda size, seed: workloads.uniform_loads(size, 1, 100, seed),
+    'exponential': lambda size, seed: workloads.exponential_loads(
+            size, 10.0, seed),
+    'pareto': lambda size, seed: workloads.pareto_loads(size, 1.5, 1.0, seed),
+}
+
+# Fields identifying a benchmark result
+KEY_FIELDS = ('benchmark', 'distribution', 'num_tasks', 'num_resources')
+
+
+def _key(result):
+    return tuple(result[field] for field in KEY_FIELDS)
+
+
+def measure(function, arguments, repeat=3, memory=True):
+    """Measures the time and memory used by a function.
+
+    Parameters
+    ----------
+    function : callable
+        Function to measure
+    arguments : tuple
+        Arguments of the function
+    repeat : int [default=3]
+        Number of timed calls (the fastest one is reported)
+    memory : bool [default=True]
+        True if the peak memory should be measured in an extra call
+
+    Returns
+    -------
+    tuple
+        (seconds, peak_memory) with the best wall time and the peak
+        memory in bytes allocated during the call (None if not measured)
+
+    Notes
+    -----
+    Tracing memory allocations slows Python code down, so the memory is
+    measured in a separate call that is not timed. Arrays allocated by
+    NumPy are included in the peak.
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*arguments)
+        seconds = min(seconds, time.perf_counter() - start)
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function(*arguments)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_memory
+
+
+def run_benchmarks(
+        benchmarks,
+        num_tasks,
+        num_resources,
+        distributions=('uniform',),
+        repeat=3,
+        memory=True,
+        time_limit=None,
+        rng_seed=0,
+        baseline=None,
+        verbose=False):
+    """Runs a grid of benchmarks.
+
+    Parameters
+    ----------
+    benchmarks : list of str
+        Names of benchmarks in BENCHMARKS
+    num_tasks : list of int
+        Numbers of tasks
+    num_resources : list of int
+        Numbers of resources
+    distributions : list of str [default=('uniform',)]
+        Names of load distributions in DISTRIBUTIONS
+    repeat : int [default=3]
+        Number of timed calls per benchmark
+    memory : bool [default=True]
+        True if the peak memory should be measured
+    time_limit : float [default=None]
+        Larger numbers of tasks are skipped for a benchmark once one of
+        its calls takes longer than this (in seconds). None for no limit.
+    rng_seed : int [default=0]
+        Seed for the load distributions
+    baseline : list of dict [default=None]
+        Results from load_baseline, used to print the change in time
+        of each result when verbose
+    verbose : bool [default=False]
+        True if each result should be printed as soon as it is available
+
+    Returns
+    -------
+    list of dict
+        One result per benchmark with the KEY_FIELDS, 'seconds',
+        'peak_memory' and 'tasks_per_second'
+    """
+    reference = {_key(result): result for result in baseline or []}
+    results = []
+    too_slow = set()
+    for distribution in distributions:
+        for tasks in sorted(num_tasks):
+            task_loads = DISTRIBUTIONS[distribution](tasks, rng_seed)
+            for resources in num_resources:
+                mapping = schedulers_np.round_robin(tasks, resources)
+                for name in benchmarks:
+                    if (name, distribution, resources) in too_slow:
+                        continue
+                    seconds, peak_memory = measure(
+                            BENCHMARKS[name],
+                            (task_loads, resources, mapping),
+                            repeat, memory)
+                    result = {'benchmark': name,
+                              'distribution': distribution,
+                              'num_tasks': tasks,
+                              'num_resources': resources,
+                              'seconds': seconds,
+                              'peak_memory': peak_memory,
+                              'tasks_per_second': tasks / seconds
+                              if seconds > 0 else float('inf')}
+                    results.append(result)
+                    if verbose:
+                        print(format_result(result,
+                                            reference.get(_key(result))),
+                              flush=True)
+                    if time_limit is not None and seconds > time_limit:
+                        too_slow.add((name, distribution, resources))
+    return results
+
+
+def format_result(result, baseline=None):
+    """Returns a line of text describing a result.
+
+    Parameters
+    ----------
+    result : dict
+        Result from run_benchmarks
+    baseline : dict [default=None]
+        Result of the same benchmark in a baseline
+
+    Returns
+    -------
+    str
+        Benchmark, time, peak memory, throughput and, if a baseline is
+        given, the relative change in time
+    """
+    if result['peak_memory'] is None:
+        memory = '-'
+    else:
+        memory = f'{result["peak_memory"] / 2**20:.1f} MiB'
+    line = (f'{result["benchmark"]:>24} {result["distribution"]:>12}' +
+            f' {result["num_tasks"]:>10} {result["num_resources"]:>9}' +
+            f' {result["seconds"]:10.4f}s {memory:>12}' +
+            f' {result["tasks_per_second"]:12.0f} t/s')
+    if baseline is not None:
+        change = result['seconds'] / baseline['seconds'] - 1
+        line += f' {change:+8.1%}'
+    return line
+
+
+def save_baseline(filename, results):
+    """Saves results as a JSON baseline.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the JSON file
+    results : list of dict
+        Results from run_benchmarks
+    """
+    baseline = {'version': BASELINE_VERSION,
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.platform(),
+                'results': results}
+    with open(filename, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=1)
+
+
+def load_baseline(filename):
+    """Reads the results of a JSON baseline.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the JSON file written by save_baseline
+
+    Returns
+    -------
+    list of dict
+        Results in the baseline
+
+    Raises
+    ------
+    ValueError
+        If the file has an unsupported version
+    """
+    with open(filename) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f'Unsupported baseline version in {filename}')
+    return baseline['results']
+
+
+def compare(results, baseline, threshold=0.2):
+    """Finds the results that are slower than a baseline.
+
+    Parameters
+    ----------
+    results : list of dict
+        Results from run_benchmarks
+    baseline : list of dict
+        Results from load_baseline
+    threshold : float [default=0.2]
+        Relative increase in time (or peak memory) considered a
+        regression, e.g., 0.2 for 20% slower
+
+    Returns
+    -------
+    list of tuple
+        (result, baseline result, reason) of each regression, where
+        reason is 'time' or 'memory' (a result slower and larger than
+        its baseline appears twice)
+
+    Notes
+    -----
+    Results without a matching benchmark in the baseline are ignored.
+    Times below one millisecond are too noisy to be compared.
+    """
+    reference = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = reference.get(_key(result))
+        if old is None:
+            continue
+        if max(result['seconds'], old['seconds']) >= 1e-3 and \
+                result['seconds'] > old['seconds'] * (1 + threshold):
+            regressions.append((result, old, 'time'))
+        if result['peak_memory'] is not None and \
+                old['peak_memory'] is not None and \
+                result['peak_memory'] > old['peak_memory'] * (1 + threshold):
+            regressions.append((result, old, 'memory'))
+    return regressions
+
+
+def main(arguments=None):
+    """Runs the benchmarks from the command line.
+
+    Parameters
+    ----------
+    arguments : list of str [default=None]
+        Command line arguments (None for sys.argv)
+
+    Returns
+    -------
+    int
+        Exit status: 1 if a regression was found, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(
+            prog='python3 -m simulator.bench',
+            description='Benchmarks of schedulers and evaluators.')
+    parser.add_argument('--benchmarks', nargs='+', default=list(BENCHMARKS),
+                        choices=list(BENCHMARKS), metavar='NAME',
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--tasks', nargs='+', type=int,
+                        default=[10**3, 10**4, 10**5],
+                        help='numbers of tasks (default: 10^3 10^4 10^5)')
+    parser.add_argument('--resources', nargs='+', type=int, default=[100],
+                        help='numbers of resources (default: 100)')
+    parser.add_argument('--distributions', nargs='+', default=['uniform'],
+                        choices=list(DISTRIBUTIONS),
+                        help='load distributions (default: uniform)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed calls per benchmark (default: 3)')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='skip larger numbers of tasks for a benchmark'
+                        ' once a call takes longer (in seconds)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not measure the peak memory')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for the load distributions')
+    parser.add_argument('--save', metavar='FILE',
+                        help='save the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare the results with a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown considered a regression'
+                        ' (default: 0.2)')
+    options = parser.parse_args(arguments)
+
+    baseline = []
+    if options.compare:
+        baseline = load_baseline(options.compare)
+
+    print(f'{"benchmark":>24} {"distribution":>12} {"tasks":>10}' +
+          f' {"resources":>9} {"time":>11} {"peak memory":>12}' +
+          f' {"throughput":>16}' + (f' {"change":>8}' if baseline else ''))
+    results = run_benchmarks(
+            options.benchmarks, options.tasks, options.resources,
+            options.distributions, options.repeat, not options.no_memory,
+            options.time_limit, options.seed, baseline, verbose=True)
+
+    if options.save:
+        save_baseline(options.save, results)
+        print(f'Results saved to {options.save}')
+    regressions = compare(results, baseline, options.threshold)
+    for result, old, reason in regressions:
+        print(f'Regression ({reason}): {result["benchmark"]}' +
+              f' {result["distribution"]} {result["num_tasks"]} tasks' +
+              f' {result["num_resources"]} resources')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""Module containing a cache of scheduling results.
+
+Parameter sweeps often run the same deterministic scheduler (e.g., lpt,
+list_scheduler or compact) on the same task loads and number of
+resources many times. A ResultCache runs each combination once and
+returns the stored mapping and metrics afterwards.
+
+Results are identified by a fingerprint: a BLAKE2b hash of the raw
+bytes of the task loads (with their type and shape), of the scheduler
+name, of the number of resources and of the other parameters. Hashing
+the array buffer avoids converting the loads to Python tuples, and
+reads at the speed of memory (or of the disk, for memory maps).
+Schedulers that only need the number of tasks (e.g., round_robin and
+compact) are identified by that number instead of the loads: their
+mapping is shared by all loads with the same number of tasks, and
+only the metrics are computed for each set of loads.
+
+Results are kept in memory in least-recently-used order, up to a
+total size in bytes, and optionally in a directory, so they survive
+the process and can be shared by the workers of a sweep.
+
+Only deterministic schedulers should be cached: randomized schedulers
+must receive their seed as a parameter (e.g., rng_seed=3).
+
+Example
+-------
+>>> import simulator.schedulers as schedulers
+>>> from simulator.cache import ResultCache
+>>> cache = ResultCache(max_bytes=1 << 28, directory='cache')
+>>> mapping, metrics = cache.schedule(schedulers.lpt, task_loads, 100)
+>>> mapping, metrics = cache.schedule(schedulers.lpt, task_loads, 100)
+>>> cache.hits
+1
+"""
+
+import collections  # for the LRU order
+import hashlib      # for fingerprints
+import inspect      # for the parameters of schedulers
+import os           # for the disk store
+import numpy as np  # for arrays
+
+from simulator.support import compute_metrics, MappingMetrics  # for metrics
+
+# Fields of MappingMetrics stored with each result
+_METRIC_FIELDS = MappingMetrics.__slots__
+# Estimated memory used by an entry besides its arrays (in bytes)
+_ENTRY_OVERHEAD = 512
+# Number of bytes hashed at a time for arrays that are not contiguous
+_CHUNK_SIZE = 1 << 24
+
+
+def _hash_array(hasher, values):
+    """Adds the type, shape and bytes of an array to a hash."""
+    values = np.asarray(values)
+    hasher.update(f'{values.dtype.str}{values.shape}'.encode())
+    if values.flags.c_contiguous:
+        hasher.update(memoryview(values.reshape(-1)).cast('B'))
+        return
+    values = values.reshape(-1)
+    for start in range(0, len(values), _CHUNK_SIZE):
+        chunk = np.ascontiguousarray(values[start:start + _CHUNK_SIZE])
+        hasher.update(memoryview(chunk).cast('B'))
+
+
+def fingerprint(scheduler_name, task_loads, num_resources, parameters=None):
+    """Returns the fingerprint of a scheduling problem.
+
+    Parameters
+    ----------
+    scheduler_name : string
+        Name identifying the scheduler
+    task_loads : int, or list, numpy.ndarray or Workload of int or float
+        Load of the tasks, or the number of tasks for schedulers that
+        only depend on it
+    num_resources : int
+        Number of resources
+    parameters : dict [default=None]
+        Other parameters of the scheduler. Lists and arrays are hashed
+        by their contents, other values by their repr.
+
+    Returns
+    -------
+    str
+        Hexadecimal BLAKE2b digest (32 characters)
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f'{scheduler_name}|{num_resources}|'.encode())
+    if isinstance(task_loads, int):
+        hasher.update(f'num_tasks={task_loads}'.encode())
+    else:
+        _hash_array(hasher, task_loads)
+    for name, value in sorted((parameters or {}).items()):
+        hasher.update(f'|{name}='.encode())
+        if isinstance(value, (list, tuple)) or hasattr(value, '__array__'):
+            _hash_array(hasher, value)
+        else:
+            hasher.update(repr(value).encode())
+    return hasher.hexdigest()
+
+
+def _scheduler_name(scheduler):
+    """Returns the module and name of a scheduler."""
+    return f'{scheduler.__module__}.{scheduler.__qualname__}'
+
+
+def _takes_num_tasks(scheduler):
+    """True if the first parameter of a scheduler is the number of tasks.
+
+    Some schedulers (e.g., round_robin and compact) only need the number
+    of tasks, not their loads.
+    """
+    try:
+        parameters = inspect.signature(scheduler).parameters
+    except (TypeError, ValueError):
+        return False
+    return next(iter(parameters), None) == 'num_tasks'
+
+
+def _entry_size(mapping, metrics):
+    """Returns the estimated memory used by a cached result."""
+    if metrics is None:
+        return mapping.nbytes + _ENTRY_OVERHEAD
+    return (mapping.nbytes + np.asarray(metrics.resource_loads).nbytes +
+            np.asarray(metrics.tasks_per_resource).nbytes + _ENTRY_OVERHEAD)
+
+
+def _read_only(array):
+    """Returns a read-only view of an array."""
+    view = np.asarray(array).view()
+    view.flags.writeable = False
+    return view
+
+
+class ResultCache:
+    """Cache of mappings and metrics keyed by problem fingerprints.
+
+    Parameters
+    ----------
+    max_bytes : int [default=1 << 28]
+        Maximum memory used by the results kept in memory. The least
+        recently used results are evicted first.
+    directory : string [default=None]
+        Directory where results are also stored (None keeps them in
+        memory only). It is created if needed.
+
+    Attributes
+    ----------
+    hits : int
+        Number of results found in memory
+    disk_hits : int
+        Number of results found in the directory
+    misses : int
+        Number of results computed by running the scheduler
+    evictions : int
+        Number of results removed from memory to respect max_bytes
+    current_bytes : int
+        Memory used by the results kept in memory
+    """
+
+    __slots__ = ('max_bytes', 'directory', 'hits', 'disk_hits', 'misses',
+                 'evictions', 'current_bytes', '_entries')
+
+    def __init__(self, max_bytes=1 << 28, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        # Fingerprint -> (mapping, metrics, size), in LRU order
+        self._entries = collections.OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return (f'ResultCache(entries={len(self._entries)}, ' +
+                f'bytes={self.current_bytes}, hits={self.hits}, ' +
+                f'disk_hits={self.disk_hits}, misses={self.misses})')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        """Removes all results from memory (the directory is kept)."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _store(self, key, mapping, metrics):
+        """Keeps a result in memory, evicting old results if needed."""
+        size = _entry_size(mapping, metrics)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (mapping, metrics, size)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (_, _, old_size) = self._entries.popitem(last=False)
+            self.current_bytes -= old_size
+            self.evictions += 1
+
+    def _filename(self, key):
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def _load(self, key):
+        """Returns a result from the directory, or None if absent."""
+        if self.directory is None:
+            return None
+        try:
+            with np.load(self._filename(key), allow_pickle=False) as data:
+                mapping = data['mapping']
+                metrics = None
+                if _METRIC_FIELDS[0] in data.files:
+                    metrics = MappingMetrics(*[
+                            data[field] if data[field].ndim > 0
+                            else data[field].item()
+                            for field in _METRIC_FIELDS])
+        except (OSError, KeyError, ValueError):
+            # Missing, partially written or invalid files are recomputed
+            return None
+        return mapping, metrics
+
+    def _save(self, key, mapping, metrics):
+        """Writes a result to the directory (atomically)."""
+        if self.directory is None:
+            return
+        temporary = self._filename(key) + f'.{os.getpid()}.tmp'
+        fields = () if metrics is None else _METRIC_FIELDS
+        with open(temporary, 'wb') as result_file:
+            np.savez(result_file, mapping=mapping,
+                     **{field: getattr(metrics, field) for field in fields})
+        os.replace(temporary, self._filename(key))
+
+    def lookup(self, key):
+        """Returns a cached result.
+
+        Parameters
+        ----------
+        key : string
+            Fingerprint of the problem (see fingerprint)
+
+        Returns
+        -------
+        tuple or None
+            (mapping, metrics) if the result is in memory or in the
+            directory, None otherwise. Metrics are None for schedulers
+            that only depend on the number of tasks.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+        result = self._load(key)
+        if result is not None:
+            self.disk_hits += 1
+            mapping = _read_only(result[0])
+            self._store(key, mapping, result[1])
+            return mapping, result[1]
+        return None
+
+    def schedule(self, scheduler, task_loads, num_resources, **parameters):
+        """Returns the mapping of a scheduler and its metrics.
+
+        The scheduler only runs if the result is not cached.
+
+        Parameters
+        ----------
+        scheduler : callable
+            Scheduler called as scheduler(task_loads, num_resources,
+            **parameters), or scheduler(len(task_loads), num_resources,
+            **parameters) if its first parameter is 'num_tasks' (e.g.,
+            round_robin and compact)
+        task_loads : list, numpy.ndarray or Workload of int or float
+            Load of the tasks
+        num_resources : int
+            Number of resources
+        **parameters
+            Other parameters of the scheduler (part of the fingerprint)
+
+        Returns
+        -------
+        tuple
+            (mapping, metrics) where mapping is a read-only
+            numpy.ndarray of int32 and metrics is a
+            support.MappingMetrics. Cached metrics are shared between
+            hits, so they should not be modified.
+
+        Notes
+        -----
+        Schedulers that only need the number of tasks are cached by that
+        number: the loads are not hashed, and the metrics are computed
+        at each call.
+        """
+        num_tasks_only = _takes_num_tasks(scheduler)
+        key = fingerprint(_scheduler_name(scheduler),
+                          len(task_loads) if num_tasks_only else task_loads,
+                          num_resources, parameters)
+        result = self.lookup(key)
+        if result is None:
+            self.misses += 1
+            if num_tasks_only:
+                mapping = scheduler(len(task_loads), num_resources,
+                                    **parameters)
+            else:
+                mapping = scheduler(task_loads, num_resources, **parameters)
+            mapping = _read_only(np.asarray(mapping, dtype=np.int32))
+            metrics = None
+            if not num_tasks_only:
+                metrics = compute_metrics(mapping, task_loads, num_resources)
+            self._save(key, mapping, metrics)
+            self._store(key, mapping, metrics)
+            result = mapping, metrics
+        mapping, metrics = result
+        if num_tasks_only:
+            metrics = compute_metrics(mapping, task_loads, num_resources)
+        return mapping, metrics
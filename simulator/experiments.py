@@ -0,0 +1,378 @@
+"""Module containing a parallel runner for scheduling experiments.
+
+An experiment is one combination of scheduler, load generator, number of
+tasks, number of resources and seed. The runner executes a grid of such
+experiments over a pool of processes and writes one CSV row per
+experiment as soon as its results are available.
+
+Example
+-------
+>>> import simulator.experiments as experiments
+>>> experiments.run_experiments(
+...         'results.csv',
+...         schedulers=['round_robin', 'list_scheduler'],
+...         num_tasks=[100, 1000],
+...         num_resources=[4, 16],
+...         load_generators=['uniform'],
+...         seeds=range(10))
+"""
+
+import csv                 # for the results file
+import itertools           # for the experiment grid
+import os                  # for checking existing results
+import time                # for timing the schedulers
+import concurrent.futures  # for the pool of processes
+
+import simulator.schedulers as schedulers
+import simulator.support as support
+import simulator.workloads as workloads
+
+
+def _round_robin(task_loads, num_resources, rng_seed):
+    return schedulers.round_robin(len(task_loads), num_resources)
+
+
+def _compact(task_loads, num_resources, rng_seed):
+    return schedulers.compact(len(task_loads), num_resources)
+
+
+def _uniformly_random(task_loads, num_resources, rng_seed):
+    return schedulers.uniformly_random(len(task_loads), num_resources,
+                                       rng_seed)
+
+
+def _list_scheduler(task_loads, num_resources, rng_seed):
+    return schedulers.list_scheduler(task_loads, num_resources)
+
+
+def _lpt(task_loads, num_resources, rng_seed):
+    return schedulers.lpt(task_loads, num_resources)
+
+
+def _karmarkar_karp(task_loads, num_resources, rng_seed):
+    return schedulers.karmarkar_karp(task_loads, num_resources)
+
+
+def _multifit(task_loads, num_resources, rng_seed):
+    return schedulers.multifit(task_loads, num_resources)
+
+
+def _uniform_loads(num_tasks, rng_seed):
+    return support.generate_uniform_loads(num_tasks, 1, 10, rng_seed)
+
+
+def _exponential_loads(num_tasks, rng_seed):
+    return workloads.exponential_loads(num_tasks, 5.0, rng_seed)
+
+
+def _pareto_loads(num_tasks, rng_seed):
+    return workloads.pareto_loads(num_tasks, 1.5, 1.0, rng_seed)
+
+
+def _bimodal_loads(num_tasks, rng_seed):
+    return workloads.bimodal_loads(num_tasks, 1.0, 10.0, 0.1, 0.1, rng_seed)
+
+
+def _zipf_loads(num_tasks, rng_seed):
+    return workloads.zipf_loads(num_tasks, 2.0, None, rng_seed)
+
+
+# Schedulers available by name.
+# Each one is called as scheduler(task_loads, num_resources, rng_seed).
+SCHEDULERS = {
+    'round_robin': _round_robin,
+    'compact': _compact,
+    'uniformly_random': _uniformly_random,
+    'list_scheduler': _list_scheduler,
+    'lpt': _lpt,
+    'karmarkar_karp': _karmarkar_karp,
+    'multifit': _multifit,
+}
+
+# Load generators available by name.
+# Each one is called as generator(num_tasks, rng_seed).
+LOAD_GENERATORS = {
+    'uniform': _uniform_loads,
+    'exponential': _exponential_loads,
+    'pareto': _pareto_loads,
+    'bimodal': _bimodal_loads,
+    'zipf': _zipf_loads,
+}
+
+# Columns of the results file
+FIELDS = ['scheduler', 'load_generator', 'num_tasks', 'num_resources',
+          'seed', 'makespan', 'imbalance', 'stdev', 'median', 'average',
+          'minimum', 'scheduling_time']
+
+# Columns identifying an experiment
+KEY_FIELDS = FIELDS[:5]
+
+
+def _resolve(entries, registry):
+    """Returns a dictionary of named callables.
+
+    Parameters
+    ----------
+    entries : list of str or dict of str to callable
+        Names from 'registry' or mapping of names to callables
+    registry : dict of str to callable
+        Callables available by name
+
+    Returns
+    -------
+    dict of str to callable
+        Callable of each entry
+    """
+    if isinstance(entries, dict):
+        return dict(entries)
+    return {name: registry[name] for name in entries}
+
+
+def experiment_grid(
+        schedulers,
+        num_tasks,
+        num_resources,
+        load_generators,
+        seeds):
+    """Returns the list of experiments from a grid of parameters.
+
+    Parameters
+    ----------
+    schedulers : list of str
+        Names of the schedulers
+    num_tasks : list of int
+        Numbers of tasks
+    num_resources : list of int
+        Numbers of resources
+    load_generators : list of str
+        Names of the load generators
+    seeds : list of int
+        Seeds for the random number generators
+
+    Returns
+    -------
+    list of tuple
+        Experiments as (scheduler, load_generator, num_tasks,
+        num_resources, seed), in a deterministic order
+    """
+    return [(scheduler, generator, tasks, resources, seed)
+            for generator, tasks, seed, resources, scheduler
+            in itertools.product(load_generators, num_tasks, seeds,
+                                 num_resources, schedulers)]
+
+
+def run_experiment(
+        scheduler,
+        load_generator,
+        num_tasks,
+        num_resources,
+        seed):
+    """Runs one experiment.
+
+    Parameters
+    ----------
+    scheduler : callable
+        Scheduler called as scheduler(task_loads, num_resources, seed)
+    load_generator : callable
+        Load generator called as load_generator(num_tasks, seed)
+    num_tasks : int
+        Number of tasks
+    num_resources : int
+        Number of resources
+    seed : int
+        Seed for the load generator and the scheduler
+
+    Returns
+    -------
+    list
+        Values of the metric columns of FIELDS
+
+    Notes
+    -----
+    The results depend only on the parameters, so they are the same
+    whatever process runs the experiment. The scheduling time is the
+    only exception.
+    """
+    task_loads = load_generator(num_tasks, seed)
+    start = time.perf_counter()
+    mapping = scheduler(task_loads, num_resources, seed)
+    elapsed = time.perf_counter() - start
+    metrics = support.compute_metrics(mapping, task_loads, num_resources)
+    return [metrics.makespan, metrics.imbalance, metrics.stdev,
+            metrics.median, metrics.average, metrics.minimum, elapsed]
+
+
+def _run_chunk(chunk):
+    """Runs a list of (key, scheduler, load_generator) experiments.
+
+    Returns
+    -------
+    list of list
+        Results rows (key followed by metrics)
+    """
+    rows = []
+    for key, scheduler, load_generator in chunk:
+        _, _, num_tasks, num_resources, seed = key
+        rows.append(list(key) + run_experiment(
+                scheduler, load_generator, num_tasks, num_resources, seed))
+    return rows
+
+
+def _read_completed(filename):
+    """Reads the keys of the experiments already stored in a file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the results file
+
+    Returns
+    -------
+    set of tuple
+        Keys (as strings) of the complete rows in the file
+
+    Notes
+    -----
+    A row left incomplete by an interruption is removed from the file.
+    """
+    completed = set()
+    if not os.path.exists(filename):
+        return completed
+    with open(filename, newline='') as results_file:
+        text = results_file.read()
+    lines = text.splitlines(keepends=True)
+    # Drops the last line if it was interrupted while being written
+    if lines and not lines[-1].endswith('\n'):
+        lines = lines[:-1]
+        with open(filename, 'w', newline='') as results_file:
+            results_file.writelines(lines)
+    for row in csv.reader(lines[1:]):
+        if len(row) == len(FIELDS):
+            completed.add(tuple(row[:len(KEY_FIELDS)]))
+    return completed
+
+
+def run_experiments(
+        filename,
+        schedulers,
+        num_tasks,
+        num_resources,
+        load_generators,
+        seeds,
+        num_workers=None,
+        chunk_size=16,
+        verbose=False):
+    """Runs a grid of experiments and stores their results in a CSV file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the CSV file to store the results
+    schedulers : list of str or dict of str to callable
+        Names of schedulers in SCHEDULERS, or mapping of names to
+        schedulers called as scheduler(task_loads, num_resources, seed)
+    num_tasks : list of int
+        Numbers of tasks
+    num_resources : list of int
+        Numbers of resources
+    load_generators : list of str or dict of str to callable
+        Names of load generators in LOAD_GENERATORS, or mapping of names
+        to generators called as generator(num_tasks, seed)
+    seeds : list of int
+        Seeds for the random number generators
+    num_workers : int [default=None]
+        Number of worker processes (None uses all processors, 1 runs
+        the experiments in the current process)
+    chunk_size : int [default=16]
+        Number of experiments sent to a worker at a time
+    verbose : bool [default=False]
+        True if messages should be printed during the experiments
+
+    Returns
+    -------
+    int
+        Number of experiments run (excluding the ones already in the file)
+
+    Notes
+    -----
+    Experiments already present in the file are skipped, so an
+    interrupted run can be resumed by calling this function again with
+    the same arguments.
+    Rows are written in the order in which chunks finish. Use
+    load_results to read them back.
+    Custom schedulers and generators must be picklable (e.g., functions
+    defined at the top level of a module).
+    """
+    scheduler_functions = _resolve(schedulers, SCHEDULERS)
+    generator_functions = _resolve(load_generators, LOAD_GENERATORS)
+    grid = experiment_grid(list(scheduler_functions), num_tasks,
+                           num_resources, list(generator_functions), seeds)
+
+    completed = _read_completed(filename)
+    pending = [(key, scheduler_functions[key[0]], generator_functions[key[1]])
+               for key in grid
+               if tuple(str(value) for value in key) not in completed]
+    chunks = [pending[i:i + chunk_size]
+              for i in range(0, len(pending), chunk_size)]
+    if verbose:
+        print(f'Experiments: {len(grid)} in the grid,' +
+              f' {len(grid) - len(pending)} already done,' +
+              f' {len(chunks)} chunks to run.')
+
+    write_header = not os.path.exists(filename) or \
+        os.path.getsize(filename) == 0
+    with open(filename, 'a', newline='') as results_file:
+        writer = csv.writer(results_file)
+        if write_header:
+            writer.writerow(FIELDS)
+            results_file.flush()
+        if num_workers == 1:
+            for chunk in chunks:
+                writer.writerows(_run_chunk(chunk))
+                results_file.flush()
+        else:
+            with concurrent.futures.ProcessPoolExecutor(num_workers) as pool:
+                futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+                for done, future in enumerate(
+                        concurrent.futures.as_completed(futures), 1):
+                    writer.writerows(future.result())
+                    results_file.flush()
+                    if verbose:
+                        print(f'- Finished chunk {done} of {len(chunks)}')
+
+    return len(pending)
+
+
+def load_results(filename):
+    """Reads a results file as columns.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the CSV file written by run_experiments
+
+    Returns
+    -------
+    dict of str to list
+        Values of each column of FIELDS, with rows sorted by experiment
+    """
+    with open(filename, newline='') as results_file:
+        rows = [row for row in csv.DictReader(results_file)
+                if None not in row.values()]
+
+    def key(row):
+        return (row['scheduler'], row['load_generator'],
+                int(row['num_tasks']), int(row['num_resources']),
+                int(row['seed']))
+
+    rows.sort(key=key)
+    columns = {}
+    for field in FIELDS:
+        values = [row[field] for row in rows]
+        if field in ('scheduler', 'load_generator'):
+            columns[field] = values
+        elif field in KEY_FIELDS:
+            columns[field] = [int(value) for value in values]
+        else:
+            columns[field] = [float(value) for value in values]
+    return columns
@@ -0,0 +1,364 @@
+"""Module containing task graphs and communication-aware scheduling.
+
+A task graph represents the communication between tasks. It is stored
+in compressed sparse row (CSR) format using NumPy arrays only:
+the neighbors of task t are indices[indptr[t]:indptr[t + 1]] and the
+amount of communication with them is in the same range of weights.
+Graphs are undirected, so each edge is stored in both directions.
+
+Implemented scheduling methods: graph_partition.
+"""
+
+import heapq        # for heaps (it implements only min-heaps)
+import numpy as np  # for arrays
+
+
+class TaskGraph:
+    """Undirected task graph in CSR format.
+
+    Parameters
+    ----------
+    indptr : array_like of int
+        Position of the first neighbor of each task (length num_tasks + 1)
+    indices : array_like of int
+        Neighbors of the tasks
+    weights : array_like of int or float [default=None]
+        Communication of each edge (None for unit weights)
+
+    Attributes
+    ----------
+    num_tasks : int
+        Number of tasks (vertices)
+    indptr : numpy.ndarray of int64
+        Position of the first neighbor of each task
+    indices : numpy.ndarray of int64
+        Neighbors of the tasks
+    weights : numpy.ndarray
+        Communication of each edge
+    """
+
+    __slots__ = ('num_tasks', 'indptr', 'indices', 'weights')
+
+    def __init__(self, indptr, indices, weights=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(self.indices), dtype=np.int64)
+        self.weights = np.asarray(weights)
+        self.num_tasks = len(self.indptr) - 1
+
+    def __repr__(self):
+        return (f'TaskGraph(num_tasks={self.num_tasks}, ' +
+                f'num_edges={self.num_edges})')
+
+    @property
+    def num_edges(self):
+        """Number of undirected edges."""
+        return len(self.indices) // 2
+
+    @classmethod
+    def from_edges(cls, num_tasks, sources, destinations, weights=None):
+        """Builds a graph from a list of edges.
+
+        Parameters
+        ----------
+        num_tasks : int
+            Number of tasks
+        sources : array_like of int
+            First task of each edge
+        destinations : array_like of int
+            Second task of each edge
+        weights : array_like of int or float [default=None]
+            Communication of each edge (None for unit weights)
+
+        Returns
+        -------
+        TaskGraph
+            Graph with the edges in both directions
+
+        Notes
+        -----
+        Self-loops are removed and the weights of repeated edges are
+        added together.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        destinations = np.asarray(destinations, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(sources), dtype=np.int64)
+        weights = np.asarray(weights)
+        # Adds the reverse edges and removes self-loops
+        all_sources = np.concatenate([sources, destinations])
+        all_destinations = np.concatenate([destinations, sources])
+        all_weights = np.concatenate([weights, weights])
+        not_loop = all_sources != all_destinations
+        keys = (all_sources[not_loop] * num_tasks +
+                all_destinations[not_loop])
+        # Sorts the edges by source and destination, merging repetitions
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        merged_weights = np.bincount(inverse,
+                                     weights=all_weights[not_loop],
+                                     minlength=len(unique_keys))
+        if np.issubdtype(weights.dtype, np.integer):
+            merged_weights = np.rint(merged_weights).astype(np.int64)
+        edge_sources = unique_keys // num_tasks
+        indptr = np.zeros(num_tasks + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_sources, minlength=num_tasks),
+                  out=indptr[1:])
+        return cls(indptr, unique_keys % num_tasks, merged_weights)
+
+    def edge_sources(self):
+        """Returns the source task of each stored edge.
+
+        Returns
+        -------
+        numpy.ndarray of int64
+            Array aligned with 'indices' and 'weights'
+        """
+        return np.repeat(np.arange(self.num_tasks, dtype=np.int64),
+                         np.diff(self.indptr))
+
+
+def _connections(mapping, graph, num_resources, sources=None):
+    """Computes how each task communicates with each resource.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of int
+        Mapping of tasks to resources
+    graph : TaskGraph
+        Communication between tasks
+    num_resources : int
+        Number of resources
+    sources : numpy.ndarray of int64 [default=None]
+        Result of graph.edge_sources(), if already available
+
+    Returns
+    -------
+    tuple
+        (internal, best_resource, best_external) where internal is the
+        communication of each task with its own resource, and
+        best_resource is the other resource with which each task
+        communicates the most (best_external), or -1 if none
+    """
+    if sources is None:
+        sources = graph.edge_sources()
+    num_tasks = graph.num_tasks
+    source_resources = mapping[sources]
+    destination_resources = mapping[graph.indices]
+    same = source_resources == destination_resources
+    internal = np.bincount(sources[same], weights=graph.weights[same],
+                           minlength=num_tasks)
+
+    # Sums the communication of each (task, other resource) pair
+    cut = ~same
+    keys = sources[cut] * num_resources + destination_resources[cut]
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    pair_weights = np.bincount(inverse, weights=graph.weights[cut],
+                               minlength=len(unique_keys))
+    pair_tasks = unique_keys // num_resources
+    # Largest weight per task: sorts by task, then by decreasing weight
+    order = np.lexsort((-pair_weights, pair_tasks))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = pair_tasks[order][1:] != pair_tasks[order][:-1]
+    best_pairs = order[first]
+
+    best_resource = np.full(num_tasks, -1, dtype=np.int64)
+    best_external = np.zeros(num_tasks)
+    best_resource[pair_tasks[best_pairs]] = \
+        unique_keys[best_pairs] % num_resources
+    best_external[pair_tasks[best_pairs]] = pair_weights[best_pairs]
+    return internal, best_resource, best_external
+
+
+def _grow_partitions(task_loads, graph, num_resources):
+    """Greedy graph growing partitioning.
+
+    Parameters
+    ----------
+    task_loads : list of int or float
+        Load of the tasks
+    graph : TaskGraph
+        Communication between tasks
+    num_resources : int
+        Number of resources
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Resources are filled one at a time, each up to its share of the
+    remaining load. A resource grows from an unmapped seed task by
+    repeatedly taking the unmapped task with the most communication
+    with it (a max-heap with outdated entries skipped when popped).
+    The last resource takes all remaining tasks.
+    """
+    num_tasks = graph.num_tasks
+    indptr = graph.indptr.tolist()
+    indices = graph.indices
+    weights = graph.weights
+    mapping = np.full(num_tasks, -1, dtype=np.int64)
+    unmapped = np.ones(num_tasks, dtype=bool)
+    remaining_load = sum(task_loads)
+    next_seed = 0
+
+    for resource in range(num_resources - 1):
+        target = remaining_load / (num_resources - resource)
+        resource_load = 0
+        # Communication of each unmapped task with this resource
+        connection = {}
+        # Each item in the heap follows the convention (-connection, task)
+        frontier = []
+        while resource_load < target:
+            if frontier:
+                negative_weight, task = heapq.heappop(frontier)
+                if not unmapped[task] or \
+                        -negative_weight != connection[task]:
+                    continue  # Outdated entry
+            else:
+                # New seed (first unmapped task)
+                while next_seed < num_tasks and not unmapped[next_seed]:
+                    next_seed += 1
+                if next_seed == num_tasks:
+                    break
+                task = next_seed
+            mapping[task] = resource
+            unmapped[task] = False
+            resource_load += task_loads[task]
+            first, last = indptr[task], indptr[task + 1]
+            for neighbor, weight in zip(indices[first:last].tolist(),
+                                        weights[first:last].tolist()):
+                if unmapped[neighbor]:
+                    weight += connection.get(neighbor, 0)
+                    connection[neighbor] = weight
+                    heapq.heappush(frontier, (-weight, neighbor))
+        remaining_load -= resource_load
+
+    mapping[unmapped] = num_resources - 1
+    return mapping
+
+
+def _refine_partitions(
+        mapping,
+        task_loads,
+        graph,
+        num_resources,
+        max_load,
+        num_passes):
+    """Kernighan-Lin/Fiduccia-Mattheyses style refinement passes.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of int64
+        Mapping of tasks to resources (modified in place)
+    task_loads : numpy.ndarray of float64
+        Load of the tasks
+    graph : TaskGraph
+        Communication between tasks
+    num_resources : int
+        Number of resources
+    max_load : float
+        Maximum load allowed per resource
+    num_passes : int
+        Maximum number of passes
+
+    Notes
+    -----
+    Each pass computes the gain of moving every task to the resource
+    it communicates the most with (vectorized over all edges). Moves
+    are then applied by decreasing gain if they respect the maximum
+    load. Tasks of overloaded resources may move with a negative gain
+    to restore the balance. A moved task locks its neighbors until the
+    next pass, since their gains are outdated.
+    """
+    sources = graph.edge_sources()
+    indptr = graph.indptr
+    indices = graph.indices
+    resource_loads = np.bincount(mapping, weights=task_loads,
+                                 minlength=num_resources)
+    for refinement_pass in range(num_passes):
+        internal, best_resource, best_external = _connections(
+                mapping, graph, num_resources, sources)
+        gains = best_external - internal
+        overloaded = resource_loads[mapping] > max_load
+        candidates = np.flatnonzero((best_resource >= 0) &
+                                    ((gains > 0) | overloaded))
+        candidates = candidates[np.argsort(-gains[candidates],
+                                           kind='stable')]
+        locked = np.zeros(graph.num_tasks, dtype=bool)
+        num_moves = 0
+        for task in candidates.tolist():
+            if locked[task]:
+                continue
+            source = mapping[task]
+            destination = best_resource[task]
+            load = task_loads[task]
+            if resource_loads[destination] + load > max_load:
+                continue
+            if gains[task] <= 0 and resource_loads[source] <= max_load:
+                continue  # No longer needed for balance
+            mapping[task] = destination
+            resource_loads[source] -= load
+            resource_loads[destination] += load
+            locked[indices[indptr[task]:indptr[task + 1]]] = True
+            num_moves += 1
+        if num_moves == 0:
+            break
+
+
+def graph_partition(
+        task_loads,
+        num_resources,
+        graph,
+        tolerance=1.05,
+        num_passes=8,
+        verbose=False):
+    """Communication-aware scheduling by graph partitioning.
+
+    Parameters
+    ----------
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    graph : TaskGraph
+        Communication between tasks
+    tolerance : float [default=1.05]
+        Maximum resource load relative to the average load, used during
+        refinement
+    num_passes : int [default=8]
+        Maximum number of refinement passes
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    The mapping balances the load of the resources while keeping tasks
+    that communicate on the same resource. It starts from a greedy
+    graph growing partitioning (see _grow_partitions) and improves it
+    with refinement passes that move boundary tasks to reduce the edge
+    cut (see _refine_partitions).
+    Resources are allowed a maximum load of max(tolerance x average,
+    average + largest task), since tasks cannot be split.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Graph Partition: starting with {num_tasks} tasks,' +
+              f' {graph.num_edges} edges and {num_resources} resources.')
+    task_loads = np.asarray(task_loads, dtype=np.float64)
+    mapping = _grow_partitions(task_loads.tolist(), graph, num_resources)
+    if verbose:
+        print('- Greedy graph growing done')
+    if num_tasks > 0:
+        average = task_loads.sum() / num_resources
+        max_load = max(tolerance * average, average + task_loads.max())
+        _refine_partitions(mapping, task_loads, graph, num_resources,
+                           max_load, num_passes)
+    return mapping.astype(np.int32)
@@ -0,0 +1,324 @@
+"""Module containing scheduling algorithms for unrelated resources.
+
+On unrelated (heterogeneous) resources, the cost of a task depends on
+the resource that executes it, e.g., a task can be fast on an
+accelerator and slow on a CPU. Costs are given as a matrix with one row
+per task and either:
+    - one column per resource (tasks x resources); or
+    - one column per resource type (tasks x types), together with the
+    type of each resource. This saves memory when many resources share
+    the same type.
+
+Implemented scheduling methods: min_min, max_min, sufferage, heft.
+"""
+
+import numpy as np  # for arrays
+
+
+def _cost_rows(costs, resource_types):
+    """Returns a function giving the costs of some tasks on all resources.
+
+    Parameters
+    ----------
+    costs : numpy.ndarray
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : numpy.ndarray of int64 or None
+        Type of each resource (None if costs has one column per resource)
+
+    Returns
+    -------
+    function
+        Function receiving task identifiers (int or array) and
+        returning their costs on all resources
+    """
+    if resource_types is None:
+        return costs.__getitem__
+    return lambda tasks: costs[tasks][..., resource_types]
+
+
+def _prepare(costs, resource_types):
+    """Checks and converts the inputs of a heuristic.
+
+    Returns
+    -------
+    tuple
+        (costs as a float64 array, resource_types as an int64 array or
+        None, number of resources)
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    if costs.ndim != 2:
+        raise ValueError('The cost matrix must have two dimensions')
+    if resource_types is None:
+        return costs, None, costs.shape[1]
+    resource_types = np.asarray(resource_types, dtype=np.int64)
+    if len(resource_types) > 0 and (resource_types.min() < 0 or
+                                    resource_types.max() >= costs.shape[1]):
+        raise ValueError('Resource types must index the cost columns')
+    return costs, resource_types, len(resource_types)
+
+
+def task_costs(mapping, costs, resource_types=None):
+    """Returns the cost of each task on the resource it is mapped to.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources
+    costs : array_like of int or float
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : array_like of int [default=None]
+        Type of each resource (None if costs has one column per resource)
+
+    Returns
+    -------
+    numpy.ndarray of float64
+        Cost of each task
+
+    Notes
+    -----
+    The result can be used as task loads in support.compute_metrics or
+    support.evaluate_mapping.
+    """
+    costs, resource_types, _ = _prepare(costs, resource_types)
+    mapping = np.asarray(mapping, dtype=np.int64)
+    columns = mapping if resource_types is None else resource_types[mapping]
+    return costs[np.arange(len(mapping)), columns]
+
+
+def _greedy_batch(costs, resource_types, num_resources, rule):
+    """Batch mode heuristics (min-min, max-min and sufferage).
+
+    Parameters
+    ----------
+    costs : numpy.ndarray of float64
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : numpy.ndarray of int64 or None
+        Type of each resource
+    num_resources : int
+        Number of resources
+    rule : string
+        'min', 'max' or 'sufferage'
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    At each step, every unmapped task has a best resource (earliest
+    completion time). The rule chooses one task, which is mapped to its
+    best resource. Only that resource becomes slower, so only tasks
+    whose best (or, for sufferage, second best) resource it was have to
+    be updated. Their completion times on all resources are computed at
+    once (a NumPy argmin per row).
+    """
+    num_tasks = costs.shape[0]
+    rows = _cost_rows(costs, resource_types)
+    ready = np.zeros(num_resources)
+    mapping = np.empty(num_tasks, dtype=np.int32)
+    # Best (and second best) completion time and resource of each task
+    best_time = np.empty(num_tasks)
+    best_resource = np.empty(num_tasks, dtype=np.int64)
+    second_resource = np.full(num_tasks, -1, dtype=np.int64)
+    # Value used to choose the next task (unmapped tasks are never chosen)
+    if rule == 'min':
+        done = np.inf
+    else:
+        done = -np.inf
+    score = np.empty(num_tasks)
+
+    def update(tasks):
+        completion = ready + rows(tasks)
+        if rule == 'sufferage' and num_resources > 1:
+            top_two = np.argpartition(completion, 1, axis=1)[:, :2]
+            top_times = np.take_along_axis(completion, top_two, axis=1)
+            # Orders each pair (argpartition keeps ties in any order)
+            swap = (top_times[:, 1] < top_times[:, 0]) | (
+                    (top_times[:, 1] == top_times[:, 0]) &
+                    (top_two[:, 1] < top_two[:, 0]))
+            top_two[swap] = top_two[swap][:, ::-1]
+            top_times[swap] = top_times[swap][:, ::-1]
+            best_resource[tasks] = top_two[:, 0]
+            best_time[tasks] = top_times[:, 0]
+            second_resource[tasks] = top_two[:, 1]
+            score[tasks] = top_times[:, 1] - top_times[:, 0]
+        else:
+            best = np.argmin(completion, axis=1)
+            best_resource[tasks] = best
+            best_time[tasks] = np.take_along_axis(
+                    completion, best[:, None], axis=1)[:, 0]
+            score[tasks] = best_time[tasks]
+
+    if num_tasks > 0:
+        update(np.arange(num_tasks))
+    unmapped = np.ones(num_tasks, dtype=bool)
+    for step in range(num_tasks):
+        if rule == 'min':
+            task = int(np.argmin(score))
+        else:
+            task = int(np.argmax(score))
+        resource = int(best_resource[task])
+        mapping[task] = resource
+        ready[resource] = best_time[task]
+        unmapped[task] = False
+        score[task] = done
+        affected = best_resource == resource
+        if rule == 'sufferage':
+            affected |= second_resource == resource
+        affected = np.flatnonzero(affected & unmapped)
+        if len(affected) > 0:
+            update(affected)
+    return mapping
+
+
+def min_min(
+        costs,
+        resource_types=None,
+        verbose=False):
+    """Min-Min scheduling algorithm for unrelated resources.
+
+    Parameters
+    ----------
+    costs : array_like of int or float
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : array_like of int [default=None]
+        Type of each resource (None if costs has one column per resource)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Among all unmapped tasks, Min-Min maps the task with the earliest
+    completion time to the resource that achieves it.
+    Ties are broken by the task and resource with the lowest index.
+    """
+    costs, resource_types, num_resources = _prepare(costs, resource_types)
+    if verbose:
+        print(f'Min-Min: starting with {costs.shape[0]} tasks' +
+              f' and {num_resources} resources.')
+    return _greedy_batch(costs, resource_types, num_resources, 'min')
+
+
+def max_min(
+        costs,
+        resource_types=None,
+        verbose=False):
+    """Max-Min scheduling algorithm for unrelated resources.
+
+    Parameters
+    ----------
+    costs : array_like of int or float
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : array_like of int [default=None]
+        Type of each resource (None if costs has one column per resource)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Among all unmapped tasks, Max-Min maps the task whose earliest
+    completion time is the latest to the resource that achieves it.
+    Long tasks are mapped first, as in LPT.
+    """
+    costs, resource_types, num_resources = _prepare(costs, resource_types)
+    if verbose:
+        print(f'Max-Min: starting with {costs.shape[0]} tasks' +
+              f' and {num_resources} resources.')
+    return _greedy_batch(costs, resource_types, num_resources, 'max')
+
+
+def sufferage(
+        costs,
+        resource_types=None,
+        verbose=False):
+    """Sufferage scheduling algorithm for unrelated resources.
+
+    Parameters
+    ----------
+    costs : array_like of int or float
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : array_like of int [default=None]
+        Type of each resource (None if costs has one column per resource)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    The sufferage of a task is the difference between its second
+    earliest and its earliest completion times, i.e., how much it
+    would suffer from not getting its best resource. The task with the
+    largest sufferage is mapped to its best resource first.
+    """
+    costs, resource_types, num_resources = _prepare(costs, resource_types)
+    if verbose:
+        print(f'Sufferage: starting with {costs.shape[0]} tasks' +
+              f' and {num_resources} resources.')
+    return _greedy_batch(costs, resource_types, num_resources, 'sufferage')
+
+
+def heft(
+        costs,
+        resource_types=None,
+        verbose=False):
+    """HEFT-style earliest finish time scheduling for unrelated resources.
+
+    Parameters
+    ----------
+    costs : array_like of int or float
+        Cost matrix (tasks x resources or tasks x types)
+    resource_types : array_like of int [default=None]
+        Type of each resource (None if costs has one column per resource)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    As in Heterogeneous Earliest Finish Time (HEFT), tasks are ranked
+    by their average cost over all resources and mapped in decreasing
+    order of rank, each to the resource where it finishes the earliest.
+    Tasks are independent here, so the rank of a task is its own
+    average cost. Each task takes a single pass (an argmin) over the
+    resources, so the whole algorithm is O(n x m).
+    """
+    costs, resource_types, num_resources = _prepare(costs, resource_types)
+    num_tasks = costs.shape[0]
+    if verbose:
+        print(f'HEFT: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    if resource_types is None:
+        ranks = costs.mean(axis=1)
+    else:
+        # Average weighted by the number of resources of each type
+        type_counts = np.bincount(resource_types, minlength=costs.shape[1])
+        ranks = costs @ type_counts / max(num_resources, 1)
+    order = np.argsort(-ranks, kind='stable')
+    rows = _cost_rows(costs, resource_types)
+    ready = np.zeros(num_resources)
+    mapping = np.empty(num_tasks, dtype=np.int32)
+    for task in order.tolist():
+        finish = ready + rows(task)
+        resource = int(np.argmin(finish))
+        mapping[task] = resource
+        ready[resource] = finish[resource]
+    return mapping
@@ -0,0 +1,155 @@
+"""Module containing hierarchical scheduling algorithms.
+
+Resources are organized as a tree, e.g., nodes x sockets x cores, given
+as a list of the number of children per level ([nodes, sockets, cores]).
+Leaves are numbered in order: core c of socket s of node n is resource
+(n * sockets + s) * cores + c.
+
+Each level is scheduled with any of the schedulers from
+simulator.schedulers or simulator.schedulers_np.
+"""
+
+import concurrent.futures  # for the pool of processes
+import numpy as np         # for arrays
+
+import simulator.schedulers as schedulers
+import simulator.schedulers_np as schedulers_np
+
+# Schedulers that receive a number of tasks instead of the task loads
+_COUNT_SCHEDULERS = {schedulers.round_robin, schedulers.compact,
+                     schedulers.uniformly_random, schedulers_np.round_robin,
+                     schedulers_np.compact, schedulers_np.uniformly_random}
+
+
+def _schedule_level(scheduler, task_loads, num_resources):
+    """Calls a scheduler on a level and returns its mapping as an array."""
+    if scheduler in _COUNT_SCHEDULERS:
+        mapping = scheduler(len(task_loads), num_resources)
+    else:
+        mapping = scheduler(task_loads, num_resources)
+    return np.asarray(mapping, dtype=np.int64)
+
+
+def _group_tasks(mapping, num_groups):
+    """Returns the tasks of each group of a mapping.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of int
+        Group of each task
+    num_groups : int
+        Number of groups
+
+    Returns
+    -------
+    list of numpy.ndarray
+        Tasks of each group, in increasing order
+    """
+    order = np.argsort(mapping, kind='stable')
+    bounds = np.searchsorted(mapping[order], np.arange(1, num_groups))
+    return np.split(order, bounds)
+
+
+def _schedule_subtree(task_loads, levels, level_schedulers):
+    """Schedules tasks over a subtree of resources.
+
+    Parameters
+    ----------
+    task_loads : numpy.ndarray
+        Load of the tasks in the subtree
+    levels : list of int
+        Number of children per level of the subtree
+    level_schedulers : list of function
+        Scheduler of each level
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Leaf of the subtree (from 0) of each task
+    """
+    mapping = _schedule_level(level_schedulers[0], task_loads, levels[0])
+    if len(levels) == 1:
+        return mapping
+    leaves_per_group = int(np.prod(levels[1:]))
+    leaves = np.empty(len(task_loads), dtype=np.int64)
+    for group, tasks in enumerate(_group_tasks(mapping, levels[0])):
+        leaves[tasks] = group * leaves_per_group + _schedule_subtree(
+                task_loads[tasks], levels[1:], level_schedulers[1:])
+    return leaves
+
+
+def hierarchical_scheduler(
+        task_loads,
+        levels,
+        level_schedulers=schedulers.lpt,
+        num_workers=1,
+        verbose=False):
+    """Hierarchical scheduling algorithm.
+
+    Parameters
+    ----------
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    levels : list of int
+        Number of children per level (e.g., [nodes, sockets, cores])
+    level_schedulers : function or list of function [default=lpt]
+        Scheduler used at each level (one for all levels or one per
+        level). Schedulers that take a number of tasks (round_robin,
+        compact, uniformly_random) are called with the number of tasks
+        of the group.
+    num_workers : int [default=1]
+        Number of worker processes (1 schedules the subtrees in the
+        current process, None uses all processors)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources (leaves of the tree)
+
+    Notes
+    -----
+    The tasks are first scheduled over the first level (e.g., nodes)
+    as if each group of resources were a single resource. The tasks of
+    each group are then scheduled over its children, recursively.
+    The subtrees under the first level are independent, so they are
+    scheduled in parallel when more than one worker is used. Schedulers
+    must be picklable in that case (e.g., functions defined at the top
+    level of a module).
+    Each level only sees its own number of children, so scheduling
+    costs grow with the sum of the level sizes instead of their product.
+    """
+    task_loads = np.asarray(task_loads)
+    levels = list(levels)
+    if callable(level_schedulers):
+        level_schedulers = [level_schedulers] * len(levels)
+    level_schedulers = list(level_schedulers)
+    if verbose:
+        print(f'Hierarchical Scheduler: starting with {len(task_loads)}' +
+              f' tasks and levels {levels}.')
+
+    mapping = _schedule_level(level_schedulers[0], task_loads, levels[0])
+    if len(levels) == 1:
+        return mapping.astype(np.int32)
+    leaves_per_group = int(np.prod(levels[1:]))
+    groups = _group_tasks(mapping, levels[0])
+    leaves = np.empty(len(task_loads), dtype=np.int32)
+
+    if num_workers == 1:
+        subtrees = (_schedule_subtree(task_loads[tasks], levels[1:],
+                                      level_schedulers[1:])
+                    for tasks in groups)
+        for group, (tasks, subtree) in enumerate(zip(groups, subtrees)):
+            leaves[tasks] = group * leaves_per_group + subtree
+    else:
+        with concurrent.futures.ProcessPoolExecutor(num_workers) as pool:
+            futures = [pool.submit(_schedule_subtree, task_loads[tasks],
+                                   levels[1:], level_schedulers[1:])
+                       for tasks in groups]
+            for group, (tasks, future) in enumerate(zip(groups, futures)):
+                leaves[tasks] = group * leaves_per_group + future.result()
+                if verbose:
+                    print(f'- Scheduled subtree {group}')
+
+    return leaves
@@ -0,0 +1,684 @@
+"""Module containing plots of mappings.
+
+This module is imported lazily: simulator.support only loads it (and
+matplotlib) when a plot is requested, so schedulers and evaluators
+start without paying for matplotlib.
+
+Two modes are available:
+    - interactive: plot_mapping draws with matplotlib.pyplot and shows
+    the plot, as support.plot_mapping always did;
+    - headless: MappingRenderer and render_mappings draw on a single
+    Agg figure that is reused for every file. They never import
+    matplotlib.pyplot, never open windows and need no display.
+When there are more resources than bars in a plot, consecutive
+resources are grouped and each group is drawn as its minimum, mean
+and maximum load.
+
+For large instances (e.g., 10^5 resources), aggregated views are
+computed from precomputed load arrays with binning, so their cost does
+not depend on drawing one artist per resource:
+    - load histograms, sorted load curves and percentile bands of
+    groups of resources (MappingRenderer.render_overview);
+    - resource x time utilization heatmaps of simulations
+    (MappingRenderer.render_timeline);
+    - plots updated incrementally as chunks of tasks are mapped
+    (LoadMonitor).
+
+Example
+-------
+>>> import simulator.plotting as plotting
+>>> plotting.render_mappings(mappings, task_loads, 100000,
+...                          ['lpt.png', 'round_robin.png'])
+"""
+
+import numpy as np                                           # for loads
+from matplotlib.figure import Figure                         # for figures
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # headless
+
+from simulator.support import compute_metrics  # for resource loads
+
+# Maximum number of bars drawn before resources are grouped
+MAX_BARS = 2000
+
+
+def _group_starts(length, max_groups):
+    """Returns the first index of each group of consecutive values."""
+    num_groups = min(length, max(max_groups, 1))
+    return np.arange(num_groups, dtype=np.int64) * length // num_groups
+
+
+def downsample(values, max_points=MAX_BARS):
+    """Groups consecutive values and summarizes each group.
+
+    Parameters
+    ----------
+    values : array_like of int or float
+        Values to group (e.g., the load of each resource)
+    max_points : int [default=MAX_BARS]
+        Maximum number of groups
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (first index, minimum, mean and maximum of each group). With
+        fewer values than max_points, each value is its own group.
+    """
+    values = np.asarray(values)
+    starts = _group_starts(len(values), max_points)
+    if len(starts) == 0:
+        empty = np.zeros(0)
+        return starts, empty, empty, empty
+    sizes = np.diff(np.append(starts, len(values)))
+    minimum = np.minimum.reduceat(values, starts)
+    maximum = np.maximum.reduceat(values, starts)
+    mean = np.add.reduceat(values, starts, dtype=np.float64) / sizes
+    return starts, minimum, mean, maximum
+
+
+def sorted_load_curve(resource_loads, max_points=MAX_BARS):
+    """Returns points of the curve of resource loads in decreasing order.
+
+    Parameters
+    ----------
+    resource_loads : array_like of int or float
+        Load of each resource
+    max_points : int [default=MAX_BARS]
+        Maximum number of points (the first and last ranks are always
+        included)
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (rank, load) of each point, where rank 0 is the most loaded
+        resource
+    """
+    loads = np.sort(np.asarray(resource_loads))[::-1]
+    if len(loads) <= max_points:
+        ranks = np.arange(len(loads))
+    else:
+        ranks = np.unique(np.linspace(0, len(loads) - 1, max(max_points, 2))
+                          .round().astype(np.int64))
+    return ranks, loads[ranks]
+
+
+def percentile_bands(
+        resource_loads,
+        num_groups=100,
+        percentiles=(0, 25, 50, 75, 100)):
+    """Returns percentiles of the loads of groups of consecutive resources.
+
+    Parameters
+    ----------
+    resource_loads : array_like of int or float
+        Load of each resource
+    num_groups : int [default=100]
+        Maximum number of groups
+    percentiles : sequence of float [default=(0, 25, 50, 75, 100)]
+        Percentiles computed for each group (between 0 and 100)
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (first index of each group, matrix (percentiles x groups) of
+        load percentiles)
+
+    Notes
+    -----
+    All groups are sorted at once (lexicographic sort by group and
+    load), and percentiles are interpolated linearly between the two
+    closest ranks of each group, as in numpy.percentile.
+    """
+    loads = np.asarray(resource_loads, dtype=np.float64)
+    starts = _group_starts(len(loads), num_groups)
+    bands = np.zeros((len(percentiles), len(starts)))
+    if len(starts) == 0:
+        return starts, bands
+    sizes = np.diff(np.append(starts, len(loads)))
+    groups = np.repeat(np.arange(len(starts)), sizes)
+    loads = loads[np.lexsort((loads, groups))]
+    for row, percentile in enumerate(percentiles):
+        position = percentile / 100 * (sizes - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, sizes - 1)
+        fraction = position - lower
+        bands[row] = ((1 - fraction) * loads[starts + lower] +
+                      fraction * loads[starts + upper])
+    return starts, bands
+
+
+def group_rows(matrix, max_rows):
+    """Averages groups of consecutive rows of a matrix.
+
+    Parameters
+    ----------
+    matrix : array_like of float
+        Matrix to reduce (e.g., resources x time intervals)
+    max_rows : int
+        Maximum number of rows of the result
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (first row of each group, matrix with the mean of each group)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    starts = _group_starts(matrix.shape[0], max_rows)
+    if len(starts) == 0:
+        return starts, matrix
+    sizes = np.diff(np.append(starts, matrix.shape[0]))
+    return starts, np.add.reduceat(matrix, starts, axis=0) / sizes[:, None]
+
+
+def draw_loads(axes, resource_loads, max_bars=MAX_BARS):
+    """Draws the load of each resource on some axes.
+
+    Parameters
+    ----------
+    axes : matplotlib.axes.Axes
+        Axes where to draw
+    resource_loads : array_like of int or float
+        Load of each resource
+    max_bars : int [default=MAX_BARS]
+        Maximum number of bars. Above it, resources are grouped and
+        each group is drawn as a band from its minimum to its maximum
+        load, with a line at its mean load.
+    """
+    resource_loads = np.asarray(resource_loads)
+    num_resources = len(resource_loads)
+    if num_resources <= max_bars:
+        axes.bar(np.arange(num_resources), resource_loads)
+    else:
+        starts, minimum, mean, maximum = downsample(resource_loads, max_bars)
+        edges = np.append(starts, num_resources)
+        # Repeats the last value so the last group has its full width
+        axes.fill_between(edges, np.append(minimum, minimum[-1]),
+                          np.append(maximum, maximum[-1]), step='post',
+                          alpha=0.4, label='Min-max')
+        axes.step(edges, np.append(mean, mean[-1]), where='post',
+                  label='Mean')
+        axes.set_xlim(0, num_resources)
+        axes.legend(loc='lower right')
+    axes.set_ylabel('Load (a.u.)')
+    axes.set_xlabel('Resources')
+    axes.set_title('Resources\' load')
+
+
+def draw_histogram(axes, resource_loads, num_bins=50):
+    """Draws a histogram of the resource loads on some axes.
+
+    Parameters
+    ----------
+    axes : matplotlib.axes.Axes
+        Axes where to draw
+    resource_loads : array_like of int or float
+        Load of each resource
+    num_bins : int [default=50]
+        Number of bins between the minimum and maximum loads
+    """
+    counts, edges = np.histogram(resource_loads, bins=num_bins)
+    axes.stairs(counts, edges, fill=True)
+    axes.set_ylabel('Resources')
+    axes.set_xlabel('Load (a.u.)')
+    axes.set_title('Load histogram')
+
+
+def draw_sorted_loads(axes, resource_loads, max_points=MAX_BARS):
+    """Draws the resource loads in decreasing order on some axes.
+
+    Parameters
+    ----------
+    axes : matplotlib.axes.Axes
+        Axes where to draw
+    resource_loads : array_like of int or float
+        Load of each resource
+    max_points : int [default=MAX_BARS]
+        Maximum number of points of the curve
+    """
+    ranks, loads = sorted_load_curve(resource_loads, max_points)
+    axes.plot(ranks, loads)
+    if len(loads) > 0:
+        axes.axhline(np.mean(resource_loads), linestyle='--',
+                     color='gray', label='Mean')
+        axes.legend(loc='upper right')
+    axes.set_ylabel('Load (a.u.)')
+    axes.set_xlabel('Resources (sorted by load)')
+    axes.set_title('Sorted loads')
+
+
+def draw_percentile_bands(
+        axes,
+        resource_loads,
+        num_groups=100,
+        percentiles=(0, 25, 50, 75, 100)):
+    """Draws percentile bands of groups of resources on some axes.
+
+    Parameters
+    ----------
+    axes : matplotlib.axes.Axes
+        Axes where to draw
+    resource_loads : array_like of int or float
+        Load of each resource
+    num_groups : int [default=100]
+        Maximum number of groups of consecutive resources
+    percentiles : sequence of float [default=(0, 25, 50, 75, 100)]
+        Percentiles of each group. Bands are drawn between pairs of
+        percentiles from the outside in, and the middle one (if the
+        number of percentiles is odd) is drawn as a line.
+    """
+    starts, bands = percentile_bands(resource_loads, num_groups,
+                                     percentiles)
+    if len(starts) > 0:
+        edges = np.append(starts, len(resource_loads))
+        bands = np.concatenate([bands, bands[:, -1:]], axis=1)
+        num_pairs = len(percentiles) // 2
+        for pair in range(num_pairs):
+            axes.fill_between(
+                    edges, bands[pair], bands[-pair - 1], step='post',
+                    alpha=0.25 + 0.5 * pair / max(num_pairs, 1),
+                    color='tab:blue',
+                    label=f'P{percentiles[pair]:g}-' +
+                          f'P{percentiles[-pair - 1]:g}')
+        if len(percentiles) % 2 == 1:
+            axes.step(edges, bands[num_pairs], where='post',
+                      color='black', label=f'P{percentiles[num_pairs]:g}')
+        axes.set_xlim(0, len(resource_loads))
+        axes.legend(loc='lower right')
+    axes.set_ylabel('Load (a.u.)')
+    axes.set_xlabel('Resources')
+    axes.set_title('Load percentiles')
+
+
+def draw_heatmap(axes, timeline, makespan, max_rows=500):
+    """Draws the utilization of resources over time on some axes.
+
+    Parameters
+    ----------
+    axes : matplotlib.axes.Axes
+        Axes where to draw
+    timeline : array_like of float
+        Matrix (resources x time intervals) of utilizations, e.g., from
+        simulation.SimulationResult.utilization_timeline
+    makespan : float
+        Time at the end of the last interval
+    max_rows : int [default=500]
+        Maximum number of rows drawn. Above it, consecutive resources
+        are averaged.
+
+    Returns
+    -------
+    matplotlib.image.AxesImage
+        Image of the heatmap (e.g., for a color bar)
+    """
+    timeline = np.asarray(timeline)
+    num_resources = timeline.shape[0]
+    _, rows = group_rows(timeline, max_rows)
+    image = axes.imshow(rows, aspect='auto', interpolation='nearest',
+                        extent=(0, max(makespan, 1e-12), num_resources, 0),
+                        vmin=0, vmax=1)
+    axes.set_ylabel('Resources')
+    axes.set_xlabel('Time (a.u.)')
+    axes.set_title('Resource utilization')
+    return image
+
+
+def plot_mapping(
+        mapping,
+        task_loads,
+        num_resources,
+        filename=None,
+        show=True,
+        max_bars=MAX_BARS):
+    """Creates a bar plot representing the mapping with matplotlib.pyplot.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    filename : string [default=None]
+        Name of the file to store the plot
+    show : bool [default=True]
+        True if the plot should be shown
+    max_bars : int [default=MAX_BARS]
+        Maximum number of bars before resources are grouped
+
+    Notes
+    -----
+    The bar plot represents each resource in the horizontal axis and
+    its load in the vertical axis.
+    """
+    import matplotlib.pyplot as plt  # for interactive plots
+
+    resource_loads = compute_metrics(
+            mapping, task_loads, num_resources).resource_loads
+    draw_loads(plt.gca(), resource_loads, max_bars)
+
+    # Saves the plot in a file if a filename is given
+    if filename is not None:
+        plt.savefig(filename, bbox_inches='tight')
+
+    # Shows plot
+    if show:
+        plt.show()
+
+
+class MappingRenderer:
+    """Headless renderer saving plots of mappings to files.
+
+    One Agg figure is created and reused for every plot, so rendering
+    many mappings does not create (and leak) one figure per file.
+
+    Parameters
+    ----------
+    figsize : tuple of float [default=(6.4, 4.8)]
+        Size of the figure in inches
+    dpi : int [default=100]
+        Resolution of the figure
+    max_bars : int [default=MAX_BARS]
+        Maximum number of bars before resources are grouped
+
+    Attributes
+    ----------
+    figure : matplotlib.figure.Figure
+        Figure reused for each plot
+    """
+
+    __slots__ = ('figure', 'canvas', 'max_bars')
+
+    def __init__(self, figsize=(6.4, 4.8), dpi=100, max_bars=MAX_BARS):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.max_bars = max_bars
+
+    def render_loads(self, resource_loads, filename, title=None):
+        """Saves a plot of precomputed resource loads to a file.
+
+        Parameters
+        ----------
+        resource_loads : array_like of int or float
+            Load of each resource
+        filename : string
+            Name of the file (its extension defines its format)
+        title : string [default=None]
+            Title of the plot (None for the default title)
+        """
+        self.figure.clear()
+        axes = self.figure.add_subplot()
+        draw_loads(axes, resource_loads, self.max_bars)
+        if title is not None:
+            axes.set_title(title)
+        self.figure.savefig(filename, bbox_inches='tight')
+
+    def render_overview(self, resource_loads, filename, title=None,
+                        num_bins=50):
+        """Saves aggregated views of precomputed resource loads to a file.
+
+        The views are a load histogram, the sorted load curve and
+        percentile bands of groups of resources. Their cost depends on
+        the number of bins and groups, not on the number of resources.
+
+        Parameters
+        ----------
+        resource_loads : array_like of int or float
+            Load of each resource
+        filename : string
+            Name of the file (its extension defines its format)
+        title : string [default=None]
+            Title of the figure
+        num_bins : int [default=50]
+            Number of bins of the histogram
+        """
+        self.figure.clear()
+        histogram, curve, bands = self.figure.subplots(3, 1)
+        draw_histogram(histogram, resource_loads, num_bins)
+        draw_sorted_loads(curve, resource_loads, self.max_bars)
+        draw_percentile_bands(bands, resource_loads)
+        if title is not None:
+            self.figure.suptitle(title)
+        self.figure.tight_layout()
+        self.figure.savefig(filename, bbox_inches='tight')
+
+    def render_timeline(self, result, filename, title=None, num_bins=100,
+                        max_rows=500):
+        """Saves a resource x time utilization heatmap to a file.
+
+        Parameters
+        ----------
+        result : simulation.SimulationResult
+            Outcome of a simulation
+        filename : string
+            Name of the file (its extension defines its format)
+        title : string [default=None]
+            Title of the plot (None for the default title)
+        num_bins : int [default=100]
+            Number of time intervals
+        max_rows : int [default=500]
+            Maximum number of rows before resources are averaged
+        """
+        self.figure.clear()
+        axes = self.figure.add_subplot()
+        image = draw_heatmap(axes, result.utilization_timeline(num_bins),
+                             result.makespan, max_rows)
+        self.figure.colorbar(image, ax=axes, label='Utilization')
+        if title is not None:
+            axes.set_title(title)
+        self.figure.savefig(filename, bbox_inches='tight')
+
+    def render(self, mapping, task_loads, num_resources, filename,
+               title=None):
+        """Saves a plot of a mapping to a file.
+
+        Parameters
+        ----------
+        mapping : list or numpy.ndarray of int
+            Mapping of tasks to resources
+        task_loads : list or numpy.ndarray of int or float
+            Load of the tasks
+        num_resources : int
+            Number of resources
+        filename : string
+            Name of the file (its extension defines its format)
+        title : string [default=None]
+            Title of the plot (None for the default title)
+        """
+        resource_loads = compute_metrics(
+                mapping, task_loads, num_resources).resource_loads
+        self.render_loads(resource_loads, filename, title)
+
+
+def render_mappings(
+        mappings,
+        task_loads,
+        num_resources,
+        filenames,
+        titles=None,
+        max_bars=MAX_BARS,
+        verbose=False):
+    """Saves plots of many mappings to files without showing them.
+
+    Parameters
+    ----------
+    mappings : list of (list or numpy.ndarray of int)
+        Mappings of tasks to resources
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks (shared by all mappings)
+    num_resources : int
+        Number of resources
+    filenames : list of string
+        Name of the file of each mapping
+    titles : list of string [default=None]
+        Title of each plot (None for the default title)
+    max_bars : int [default=MAX_BARS]
+        Maximum number of bars before resources are grouped
+    verbose : bool [default=False]
+        True if messages should be printed during rendering
+
+    Raises
+    ------
+    ValueError
+        If the numbers of mappings, filenames and titles differ
+    """
+    if len(mappings) != len(filenames):
+        raise ValueError('Each mapping needs one filename')
+    if titles is None:
+        titles = [None] * len(mappings)
+    elif len(titles) != len(mappings):
+        raise ValueError('Each mapping needs one title')
+    if verbose:
+        print(f'Rendering: starting with {len(mappings)} mappings' +
+              f' and {num_resources} resources.')
+    renderer = MappingRenderer(max_bars=max_bars)
+    for mapping, filename, title in zip(mappings, filenames, titles):
+        renderer.render(mapping, task_loads, num_resources, filename, title)
+
+
+class LoadMonitor:
+    """Headless plot of resource loads updated as tasks are mapped.
+
+    Loads are accumulated from chunks of tasks (or set from a scheduler,
+    e.g., schedulers.OnlineListScheduler.resource_loads), and snapshots
+    of their percentiles are recorded over time. Each render updates
+    the existing lines and bars of a single figure instead of drawing
+    it again, so its cost depends on the number of snapshots and bins
+    only.
+
+    Parameters
+    ----------
+    num_resources : int
+        Number of resources
+    percentiles : sequence of float [default=(0, 50, 100)]
+        Percentiles of the loads recorded at each snapshot
+    num_bins : int [default=50]
+        Number of bins of the load histogram
+    figsize : tuple of float [default=(6.4, 6.4)]
+        Size of the figure in inches
+    dpi : int [default=100]
+        Resolution of the figure
+
+    Attributes
+    ----------
+    resource_loads : numpy.ndarray of float64
+        Current load of each resource
+    steps : list of int or float
+        Step (e.g., number of tasks mapped) of each snapshot
+    history : list of list of float
+        Percentiles of the loads at each snapshot
+
+    Example
+    -------
+    >>> monitor = LoadMonitor(100000)
+    >>> for mapping, task_loads in chunks:
+    ...     monitor.add_tasks(mapping, task_loads)
+    ...     monitor.record()
+    ...     monitor.render('loads.png')
+    """
+
+    __slots__ = ('num_resources', 'percentiles', 'num_bins',
+                 'resource_loads', 'steps', 'history', 'figure', 'canvas',
+                 '_lines', '_bars', '_axes')
+
+    def __init__(
+            self,
+            num_resources,
+            percentiles=(0, 50, 100),
+            num_bins=50,
+            figsize=(6.4, 6.4),
+            dpi=100):
+        self.num_resources = num_resources
+        self.percentiles = list(percentiles)
+        self.num_bins = num_bins
+        self.resource_loads = np.zeros(num_resources)
+        self.steps = []
+        self.history = []
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        # Artists are created at the first render
+        self._lines = None
+        self._bars = None
+        self._axes = None
+
+    def add_tasks(self, mapping, task_loads):
+        """Adds the loads of a chunk of mapped tasks.
+
+        Parameters
+        ----------
+        mapping : list or numpy.ndarray of int
+            Resource of each task of the chunk
+        task_loads : list or numpy.ndarray of int or float
+            Load of each task of the chunk
+        """
+        self.resource_loads += np.bincount(
+                np.asarray(mapping, dtype=np.int64),
+                weights=np.asarray(task_loads, dtype=np.float64),
+                minlength=self.num_resources)
+
+    def set_loads(self, resource_loads):
+        """Replaces the current resource loads.
+
+        Parameters
+        ----------
+        resource_loads : array_like of int or float
+            Load of each resource
+        """
+        self.resource_loads = np.asarray(resource_loads, dtype=np.float64)
+
+    def record(self, step=None):
+        """Records a snapshot of the percentiles of the current loads.
+
+        Parameters
+        ----------
+        step : int or float [default=None]
+            Position of the snapshot (None for the number of snapshots)
+        """
+        if step is None:
+            step = len(self.steps)
+        self.steps.append(step)
+        self.history.append(
+                np.percentile(self.resource_loads,
+                              self.percentiles).tolist())
+
+    def _create_artists(self):
+        """Creates the axes, lines and bars updated by each render."""
+        over_time, histogram = self.figure.subplots(2, 1)
+        self._lines = [over_time.plot([], [], label=f'P{percentile:g}')[0]
+                       for percentile in self.percentiles]
+        over_time.set_xlabel('Step')
+        over_time.set_ylabel('Load (a.u.)')
+        over_time.set_title('Load percentiles over time')
+        over_time.legend(loc='upper left')
+        self._bars = histogram.bar(np.arange(self.num_bins),
+                                   np.zeros(self.num_bins),
+                                   width=1.0, align='edge')
+        histogram.set_xlabel('Load (a.u.)')
+        histogram.set_ylabel('Resources')
+        histogram.set_title('Current load histogram')
+        self.figure.tight_layout()
+        self._axes = (over_time, histogram)
+
+    def render(self, filename):
+        """Updates the figure and saves it to a file.
+
+        Parameters
+        ----------
+        filename : string
+            Name of the file (its extension defines its format)
+        """
+        if self._axes is None:
+            self._create_artists()
+        over_time, histogram = self._axes
+        history = np.asarray(self.history).reshape(-1, len(self.percentiles))
+        for line, values in zip(self._lines, history.T):
+            line.set_data(self.steps, values)
+        counts, edges = np.histogram(self.resource_loads, bins=self.num_bins)
+        width = edges[1] - edges[0]
+        for bar, count, edge in zip(self._bars, counts, edges):
+            bar.set_x(edge)
+            bar.set_width(width)
+            bar.set_height(count)
+        for axes in self._axes:
+            axes.relim()
+            axes.autoscale_view()
+        self.figure.savefig(filename)
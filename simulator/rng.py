@@ -0,0 +1,149 @@
+"""Module containing random number generation helpers for the simulator.
+
+The functions in this module draw many random values in a single call
+while reproducing the values that the standard 'random' module would
+generate for the same seed.
+They use explicit generator objects (random.Random or
+numpy.random.Generator) instead of the global state of the 'random'
+module, so they can be called concurrently from several threads.
+"""
+
+import numpy as np  # for vectorized draws
+
+
+def _bit_generator_from(py_rng):
+    """Returns a NumPy MT19937 bit generator in the same state as py_rng.
+
+    Parameters
+    ----------
+    py_rng : random.Random
+        Random number generator to copy the state from
+
+    Returns
+    -------
+    numpy.random.MT19937
+        Bit generator producing the same 32-bit words as py_rng
+    """
+    internal_state = py_rng.getstate()[1]
+    bit_generator = np.random.MT19937()
+    bit_generator.state = {
+            'bit_generator': 'MT19937',
+            'state': {'key': np.array(internal_state[:-1], dtype=np.uint32),
+                      'pos': internal_state[-1]}}
+    return bit_generator
+
+
+def _sync_state(py_rng, bit_generator):
+    """Copies the state of a NumPy MT19937 bit generator to py_rng.
+
+    Parameters
+    ----------
+    py_rng : random.Random
+        Random number generator to update
+    bit_generator : numpy.random.MT19937
+        Bit generator to copy the state from
+    """
+    version, _, gauss_next = py_rng.getstate()
+    state = bit_generator.state['state']
+    internal_state = tuple(state['key'].tolist()) + (int(state['pos']),)
+    py_rng.setstate((version, internal_state, gauss_next))
+
+
+def randbelow(
+        py_rng,
+        n,
+        size):
+    """Returns an array of random integers in [0, n).
+
+    Parameters
+    ----------
+    py_rng : random.Random
+        Random number generator used (and advanced) by the draws
+    n : int
+        Exclusive upper boundary of the values
+    size : int
+        Number of values to draw
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Array of length 'size'
+
+    Notes
+    -----
+    The values and the final state of py_rng are the same as the ones
+    obtained by calling py_rng.randrange(n) 'size' times.
+    The standard library draws k=n.bit_length() bits from each 32-bit
+    word and rejects values larger than or equal to n. This function
+    draws the same words in blocks and applies the rejection to the
+    whole block at once.
+    """
+    if n <= 0:
+        raise ValueError(f'empty range for randbelow ({n})')
+    k = n.bit_length()
+    if k > 32:
+        # The standard library combines several words per value
+        return np.array([py_rng.randrange(n) for i in range(size)],
+                        dtype=np.int64)
+
+    values = np.empty(size, dtype=np.int64)
+    if size == 0:
+        return values
+    shift = np.uint64(32 - k)
+    # Fraction of the words that are accepted (at least one half)
+    acceptance = n / (1 << k)
+
+    bit_generator = _bit_generator_from(py_rng)
+    filled = 0
+    while filled < size:
+        missing = size - filled
+        # Draws slightly more words than expected to avoid extra rounds
+        block_size = int(missing / acceptance * 1.05) + 64
+        block_state = bit_generator.state
+        candidates = bit_generator.random_raw(block_size) >> shift
+        accepted = np.flatnonzero(candidates < n)[:missing]
+        values[filled:filled + len(accepted)] = candidates[accepted]
+        filled += len(accepted)
+    # Rewinds the bit generator to the last word actually consumed
+    bit_generator.state = block_state
+    bit_generator.random_raw(int(accepted[-1]) + 1)
+    _sync_state(py_rng, bit_generator)
+
+    return values
+
+
+def integers(
+        rng,
+        low,
+        high,
+        size):
+    """Returns an array of random integers in [low, high).
+
+    Parameters
+    ----------
+    rng : random.Random or numpy.random.Generator
+        Random number generator used (and advanced) by the draws
+    low : int
+        Inclusive lower boundary of the values
+    high : int
+        Exclusive upper boundary of the values
+    size : int
+        Number of values to draw
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Array of length 'size'
+
+    Notes
+    -----
+    With a random.Random, the values are the same as the ones obtained
+    by calling rng.randrange(low, high) 'size' times.
+    """
+    if isinstance(rng, np.random.Generator):
+        if high <= low:
+            raise ValueError(f'empty range for integers ({low}, {high})')
+        return rng.integers(low, high, size=size, dtype=np.int64)
+    values = randbelow(rng, high - low, size)
+    values += low
+    return values
@@ -4,13 +4,27 @@ Each scheduling algorithm receives a specific set of inputs and
 outputs a mapping.
 
 Implemented scheduling methods: round_robin, compact, uniformly_random,
-list_scheduler.
-Methods with interfaces but no implementation: lpt, lpt_with_limits,
-list_scheduler_for_uniform_resources.
+list_scheduler, lpt, lpt_with_limits, list_scheduler_for_uniform_resources,
+karmarkar_karp, multifit, complete_greedy.
+Optimal scheduling for small instances: branch_and_bound.
+Rebalancing of an existing mapping: refine.
+Online scheduling (tasks mapped as they arrive): OnlineListScheduler.
+Heap-based schedulers accept an 'instrumentation' parameter to collect
+counters, phase timings and sampled decisions (see
+simulator.instrumentation).
+Task loads and mappings can be given as lists, NumPy arrays or compact
+structures.Workload and structures.Mapping objects.
 """
 
-import random  # for random mappings
-import heapq   # for heaps (it implements only min-heaps)
+import random       # for random mappings
+import bisect       # for searches in sorted lists
+import heapq        # for heaps (it implements only min-heaps)
+import time         # for time budgets
+import numpy as np  # for sorting
+
+from simulator.rng import integers           # for vectorized random draws
+from simulator.instrumentation import phase  # for instrumented phases
+from simulator.structures import Workload    # for cached load orders
 
 
 def round_robin(
@@ -127,7 +141,8 @@ def uniformly_random(
         num_tasks,
         num_resources,
         rng_seed=None,
-        verbose=False):
+        verbose=False,
+        rng=None):
     """Random scheduling algorithm.
 
     Parameters
@@ -140,6 +155,9 @@ def uniformly_random(
         Seed for the random number generator
     verbose : bool [default=False]
         True if messages should be printed during scheduling
+    rng : random.Random or numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one seeded
+        with 'rng_seed'
 
     Returns
     -------
@@ -149,24 +167,23 @@ def uniformly_random(
     Notes
     -----
     The random algorithm chooses resources uniformly at random for each task.
+    All resources are drawn in a single vectorized call, without using
+    the global random number generator.
     """
     if verbose:
         print(f'Random: starting with {num_tasks} tasks' +
               f' and {num_resources} resources.')
         if rng_seed is not None:
             print(f'- RNG seed is {rng_seed}.')
-    # Empty mapping
-    mapping = [None] * num_tasks
-
-    # Sets the RNG seed
-    random.seed(rng_seed)
+    # Independent random number generator
+    if rng is None:
+        rng = random.Random(rng_seed)
 
-    # Iterates mapping tasks to resources in order
-    for task in range(num_tasks):
-        resource = random.randrange(num_resources)
-        mapping[task] = resource
-        if verbose:
-            print(f'- Mapping task {task} to resource {resource}')
+    # Draws the resources of all tasks at once
+    mapping = integers(rng, 0, num_resources, num_tasks).tolist()
+    if verbose:
+        for task in range(num_tasks):
+            print(f'- Mapping task {task} to resource {mapping[task]}')
 
     return mapping
 
@@ -174,7 +191,8 @@ def uniformly_random(
 def list_scheduler(
         task_loads,
         num_resources,
-        verbose=False):
+        verbose=False,
+        instrumentation=None):
     """Basic list scheduling algorithm.
 
     Parameters
@@ -185,6 +203,9 @@ def list_scheduler(
         Number of resources
     verbose : bool [default=False]
         True if messages should be printed during scheduling
+    instrumentation : Instrumentation [default=None]
+        Collector of counters, phase timings and sampled decisions
+        (see simulator.instrumentation). None disables it.
 
     Returns
     -------
@@ -202,6 +223,7 @@ def list_scheduler(
     # Empty mapping
     num_tasks = len(task_loads)
     mapping = [None] * num_tasks
+    task_loads = _python_loads(task_loads)
 
     # Prepares the min-heap for the resources
     # Each item in the heap follows the convention (load, resource)
@@ -209,26 +231,240 @@ def list_scheduler(
     heapq.heapify(resource_heap)
 
     # Iterates over tasks mapping them to the least loaded resource
-    for task in range(num_tasks):
-        # Finds the least loaded resource
-        resource_load, resource = heapq.heappop(resource_heap)
-        mapping[task] = resource
-        if verbose:
-            print(f'- Mapping task {task} to resource {resource}')
-        # Load of this task
-        load = task_loads[task]
-        # Updates the heap
-        heapq.heappush(resource_heap, (resource_load + load, resource))
+    with phase(instrumentation, 'assign'):
+        for task in range(num_tasks):
+            # Finds the least loaded resource
+            resource_load, resource = heapq.heappop(resource_heap)
+            mapping[task] = resource
+            if verbose:
+                print(f'- Mapping task {task} to resource {resource}')
+            # Load of this task
+            load = task_loads[task]
+            # Updates the heap
+            heapq.heappush(resource_heap, (resource_load + load, resource))
 
+    if instrumentation is not None:
+        _instrument(instrumentation, 'list_scheduler', range(num_tasks),
+                    mapping, task_loads, num_tasks, num_tasks)
     return mapping
 
 
+def _instrument(
+        instrumentation,
+        name,
+        order,
+        mapping,
+        task_loads,
+        heap_pops,
+        heap_pushes):
+    """Adds the counters and sampled decisions of a heap scheduler.
+
+    Parameters
+    ----------
+    instrumentation : Instrumentation
+        Collector of the measurements
+    name : string
+        Name of the scheduler
+    order : array_like of int
+        Tasks in the order in which they were mapped
+    mapping : list of int
+        Mapping of tasks to resources
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    heap_pops : int
+        Number of heap pops (a heapreplace counts as a pop and a push)
+    heap_pushes : int
+        Number of heap pushes
+    """
+    instrumentation.count('tasks', len(mapping))
+    instrumentation.count('heap_pops', heap_pops)
+    instrumentation.count('heap_pushes', heap_pushes)
+    instrumentation.record_decisions(name, order, mapping, task_loads)
+
+
+class OnlineListScheduler:
+    """Online version of the basic list scheduling algorithm.
+
+    Tasks are mapped one at a time as they arrive, using the same
+    min-heap of (load, resource) as list_scheduler. Mapping the tasks
+    of a list with this class results in the same mapping as calling
+    list_scheduler with the whole list.
+
+    Parameters
+    ----------
+    num_resources : int
+        Number of resources
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Attributes
+    ----------
+    num_resources : int
+        Number of resources
+    num_tasks : int
+        Number of tasks mapped so far
+    total_load : int or float
+        Sum of the loads of the tasks mapped so far
+    makespan : int or float
+        Maximum resource load
+
+    Notes
+    -----
+    Memory usage is proportional to the number of resources only.
+    Metrics are updated at each assignment, so reading them never
+    requires going over the tasks mapped so far.
+
+    Example
+    -------
+    >>> scheduler = OnlineListScheduler(3)
+    >>> scheduler.assign(5)
+    0
+    >>> scheduler.assign_many([3, 2, 7])
+    [1, 2, 2]
+    """
+
+    __slots__ = ('num_resources', 'num_tasks', 'total_load', 'makespan',
+                 'verbose', '_resource_heap')
+
+    def __init__(self, num_resources, verbose=False):
+        self.num_resources = num_resources
+        self.num_tasks = 0
+        self.total_load = 0
+        self.makespan = 0
+        self.verbose = verbose
+        # Each item in the heap follows the convention (load, resource)
+        self._resource_heap = [(0, resource)
+                               for resource in range(num_resources)]
+        heapq.heapify(self._resource_heap)
+        if verbose:
+            print(f'Online List Scheduler: starting with {num_resources}' +
+                  ' resources.')
+
+    def assign(self, load):
+        """Maps a task to the least loaded resource.
+
+        Parameters
+        ----------
+        load : int or float
+            Load of the task
+
+        Returns
+        -------
+        int
+            Resource of the task
+        """
+        resource_heap = self._resource_heap
+        resource_load, resource = resource_heap[0]
+        resource_load += load
+        heapq.heapreplace(resource_heap, (resource_load, resource))
+        if resource_load > self.makespan:
+            self.makespan = resource_load
+        self.total_load += load
+        if self.verbose:
+            print(f'- Mapping task {self.num_tasks} to resource {resource}')
+        self.num_tasks += 1
+        return resource
+
+    def assign_many(self, task_loads):
+        """Maps a sequence of tasks, one at a time.
+
+        Parameters
+        ----------
+        task_loads : iterable of int or float
+            Load of the tasks (e.g., a list, a NumPy array or a generator)
+
+        Returns
+        -------
+        list of int
+            Resource of each task
+        """
+        if self.verbose:
+            return [self.assign(load) for load in task_loads]
+        task_loads = _python_loads(task_loads)
+        resource_heap = self._resource_heap
+        heapreplace = heapq.heapreplace
+        resources = []
+        append = resources.append
+        makespan = self.makespan
+        total_load = self.total_load
+        for load in task_loads:
+            resource_load, resource = resource_heap[0]
+            resource_load += load
+            heapreplace(resource_heap, (resource_load, resource))
+            if resource_load > makespan:
+                makespan = resource_load
+            total_load += load
+            append(resource)
+        self.makespan = makespan
+        self.total_load = total_load
+        self.num_tasks += len(resources)
+        return resources
+
+    @property
+    def imbalance(self):
+        """Load imbalance (maximum/average - 1) of the current mapping."""
+        if self.total_load == 0:
+            return 0.0
+        return self.makespan * self.num_resources / self.total_load - 1
+
+    def resource_loads(self):
+        """Returns the load of each resource.
+
+        Returns
+        -------
+        list of int or float
+            Load of the resources
+        """
+        resource_loads = [0] * self.num_resources
+        for resource_load, resource in self._resource_heap:
+            resource_loads[resource] = resource_load
+        return resource_loads
+
+
+def decreasing_load_order(task_loads):
+    """Returns the tasks sorted by decreasing load.
+
+    Parameters
+    ----------
+    task_loads : list, numpy.ndarray or Workload of int or float
+        Load of the tasks
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Task identifiers sorted by decreasing load
+
+    Notes
+    -----
+    Tasks with the same load keep their [lexicographical] order.
+    The sort is a stable numpy.argsort over the reversed loads, which
+    works for any numeric type (including unsigned integers).
+    The order of a Workload is cached, so it is sorted only once.
+    """
+    if isinstance(task_loads, Workload):
+        return task_loads.sorted_order()
+    task_loads = np.asarray(task_loads)
+    num_tasks = len(task_loads)
+    order = np.argsort(task_loads[::-1], kind='stable')
+    return (num_tasks - 1 - order)[::-1]
+
+
+def _python_loads(task_loads):
+    """Returns the loads as a sequence of Python numbers.
+
+    Python numbers are much faster than NumPy scalars inside loops.
+    """
+    if hasattr(task_loads, 'tolist'):
+        return task_loads.tolist()
+    return task_loads
+
+
 def lpt(
         task_loads,
         num_resources,
-        verbose=False):
+        verbose=False,
+        instrumentation=None):
     """Largest Processing Time list scheduling algorithm.
-    To implement.
 
     Parameters
     ----------
@@ -238,6 +474,9 @@ def lpt(
         Number of resources
     verbose : bool [default=False]
         True if messages should be printed during scheduling
+    instrumentation : Instrumentation [default=None]
+        Collector of counters, phase timings and sampled decisions
+        (see simulator.instrumentation). None disables it.
 
     Returns
     -------
@@ -248,6 +487,9 @@ def lpt(
     -----
     This list scheduling algorithm takes tasks in decreasing load order
     and maps them to the least loaded resources.
+    Tasks with the same load are taken in [lexicographical] order, and
+    ties between resources go to the smallest resource identifier, as
+    in list_scheduler.
     """
     if verbose:
         print(f'LPT: starting with {len(task_loads)} tasks' +
@@ -255,8 +497,32 @@ def lpt(
     # Empty mapping
     num_tasks = len(task_loads)
     mapping = [None] * num_tasks
-    # TODO
 
+    # Sorts the tasks by decreasing load
+    with phase(instrumentation, 'sort'):
+        order = decreasing_load_order(task_loads).tolist()
+    task_loads = _python_loads(task_loads)
+
+    # Prepares the min-heap for the resources
+    # Each item in the heap follows the convention (load, resource)
+    resource_heap = [(0, resource) for resource in range(num_resources)]
+    heapq.heapify(resource_heap)
+    heapreplace = heapq.heapreplace
+
+    # Iterates over tasks mapping them to the least loaded resource
+    with phase(instrumentation, 'assign'):
+        for task in order:
+            resource_load, resource = resource_heap[0]
+            mapping[task] = resource
+            if verbose:
+                print(f'- Mapping task {task} to resource {resource}')
+            # Updates the heap (pop and push in a single operation)
+            heapreplace(resource_heap,
+                        (resource_load + task_loads[task], resource))
+
+    if instrumentation is not None:
+        _instrument(instrumentation, 'lpt', order, mapping, task_loads,
+                    num_tasks, num_tasks)
     return mapping
 
 
@@ -264,10 +530,10 @@ def lpt_with_limits(
         task_loads,
         num_resources,
         task_limit,
-        verbose=False):
+        verbose=False,
+        instrumentation=None):
     """Largest Processing Time list scheduling algorithm with a
     constraint on the number of tasks per resource.
-    To implement.
 
     Parameters
     ----------
@@ -279,17 +545,27 @@ def lpt_with_limits(
         Maximum limit on the number of tasks per resource
     verbose : bool [default=False]
         True if messages should be printed during scheduling
+    instrumentation : Instrumentation [default=None]
+        Collector of counters, phase timings and sampled decisions
+        (see simulator.instrumentation). None disables it.
 
     Returns
     -------
     list of int
         Mapping of tasks to resources
 
+    Raises
+    ------
+    ValueError
+        If the tasks do not fit in the resources with this limit
+
     Notes
     -----
     This list scheduling algorithm takes tasks in decreasing load order
     and maps them to the least loaded resources while respecting the
     maximum limit on the number of tasks per resource.
+    A resource that reaches the limit is removed from the heap, so
+    full resources are never looked at again.
     """
     if verbose:
         print(f'LPT w/ limits: starting with {len(task_loads)} tasks' +
@@ -297,8 +573,43 @@ def lpt_with_limits(
     # Empty mapping
     num_tasks = len(task_loads)
     mapping = [None] * num_tasks
-    # TODO
+    if num_tasks > num_resources * task_limit:
+        raise ValueError(f'{num_tasks} tasks do not fit in {num_resources}' +
+                         f' resources with at most {task_limit} tasks each')
+
+    # Sorts the tasks by decreasing load
+    with phase(instrumentation, 'sort'):
+        order = decreasing_load_order(task_loads).tolist()
+    task_loads = _python_loads(task_loads)
+
+    # Prepares the min-heap for the resources
+    # Each item in the heap follows the convention (load, resource)
+    resource_heap = [(0, resource) for resource in range(num_resources)]
+    heapq.heapify(resource_heap)
+    tasks_per_resource = [0] * num_resources
 
+    # Iterates over tasks mapping them to the least loaded resource
+    with phase(instrumentation, 'assign'):
+        for task in order:
+            resource_load, resource = resource_heap[0]
+            mapping[task] = resource
+            if verbose:
+                print(f'- Mapping task {task} to resource {resource}')
+            tasks_per_resource[resource] += 1
+            if tasks_per_resource[resource] < task_limit:
+                heapq.heapreplace(resource_heap,
+                                  (resource_load + task_loads[task],
+                                   resource))
+            else:  # The resource is full
+                heapq.heappop(resource_heap)
+                if verbose:
+                    print(f'- Resource {resource} reached the limit')
+
+    if instrumentation is not None:
+        num_full = tasks_per_resource.count(task_limit)
+        _instrument(instrumentation, 'lpt_with_limits', order, mapping,
+                    task_loads, num_tasks, num_tasks - num_full)
+        instrumentation.count('full_resources', num_full)
     return mapping
 
 
@@ -306,10 +617,10 @@ def list_scheduler_for_uniform_resources(
         task_loads,
         num_resources,
         resource_speeds,
-        verbose=False):
+        verbose=False,
+        instrumentation=None):
     """Basic list scheduling algorithm used for uniform (or related)
     resources.
-    To implement.
 
     Parameters
     ----------
@@ -321,6 +632,9 @@ def list_scheduler_for_uniform_resources(
         Speed of each resource
     verbose : bool [default=False]
         True if messages should be printed during scheduling
+    instrumentation : Instrumentation [default=None]
+        Collector of counters, phase timings and sampled decisions
+        (see simulator.instrumentation). None disables it.
 
     Returns
     -------
@@ -333,6 +647,11 @@ def list_scheduler_for_uniform_resources(
     and maps them to the least loaded resources.
     The load of a uniform or related resource is equal to the load
     of its tasks divided by its speed.
+    Each task goes to the resource where it would finish first, i.e.,
+    the one with the smallest (load + task load) / speed. Ties go to
+    the smallest resource identifier.
+    Resources with the same speed share a min-heap of (load, resource),
+    so each task only compares the top of one heap per distinct speed.
     """
     if verbose:
         print(f'List Scheduler for Uniform Resources:' +
@@ -341,6 +660,673 @@ def list_scheduler_for_uniform_resources(
     # Empty mapping
     num_tasks = len(task_loads)
     mapping = [None] * num_tasks
-    # TODO
+    task_loads = _python_loads(task_loads)
+    resource_speeds = _python_loads(resource_speeds)
+
+    # Prepares one min-heap per distinct speed
+    # Each item in the heaps follows the convention (load, resource)
+    heaps_per_speed = {}
+    for resource in range(num_resources):
+        heaps_per_speed.setdefault(resource_speeds[resource], []).append(
+                (0, resource))
+    # Resources were added in order, so each list is already a heap
+    speed_heaps = list(heaps_per_speed.items())
+    heapreplace = heapq.heapreplace
+
+    # Iterates over tasks mapping them to the resource that finishes first
+    with phase(instrumentation, 'assign'):
+        for task in range(num_tasks):
+            load = task_loads[task]
+            best_finish = None
+            for speed, resource_heap in speed_heaps:
+                resource_load, resource = resource_heap[0]
+                finish = (resource_load + load) / speed
+                if (best_finish is None or finish < best_finish or
+                        (finish == best_finish and resource < best_resource)):
+                    best_finish = finish
+                    best_resource = resource
+                    best_load = resource_load
+                    best_heap = resource_heap
+            mapping[task] = best_resource
+            if verbose:
+                print(f'- Mapping task {task} to resource {best_resource}')
+            heapreplace(best_heap, (best_load + load, best_resource))
 
+    if instrumentation is not None:
+        _instrument(instrumentation, 'list_scheduler_for_uniform_resources',
+                    range(num_tasks), mapping, task_loads, num_tasks,
+                    num_tasks)
+        instrumentation.count('heap_peeks', num_tasks * len(speed_heaps))
     return mapping
+
+
+def karmarkar_karp(
+        task_loads,
+        num_resources,
+        verbose=False):
+    """Multi-way Karmarkar-Karp (largest differencing) algorithm.
+
+    Parameters
+    ----------
+    task_loads : list of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    list of int
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Each task starts as a partial mapping with its load on one resource
+    and no load on the others. A max-heap keeps the partial mappings by
+    their difference between maximum and minimum loads.
+    The two partial mappings with the largest differences are combined
+    by joining the most loaded group of one with the least loaded group
+    of the other, the second most loaded with the second least loaded,
+    etc. This is repeated until a single mapping is left.
+    Groups of tasks are kept as linked lists, so joining two of them
+    takes constant time. Empty groups are not stored, so combining two
+    partial mappings costs O(k log k), where k is the number of
+    non-empty groups in the result (at most m for m resources).
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Karmarkar-Karp: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    task_loads = _python_loads(task_loads)
+    mapping = [None] * num_tasks
+    if num_tasks == 0:
+        return mapping
+
+    # Next task in the same group (linked lists of tasks)
+    next_task = [-1] * num_tasks
+    # Each item in the heap follows the convention
+    # (-difference, counter, groups), where groups is a list of
+    # (load, first task, last task) sorted by decreasing load.
+    # Only the non-empty groups are stored: a partial mapping with k
+    # groups has num_resources - k implicit empty groups at its end.
+    partial_heap = [(-task_loads[task], task,
+                     [(task_loads[task], task, task)])
+                    for task in range(num_tasks)]
+    heapq.heapify(partial_heap)
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    counter = num_tasks
+
+    while len(partial_heap) > 1:
+        _, _, first_groups = heappop(partial_heap)
+        _, _, second_groups = heappop(partial_heap)
+        # Group i of the first mapping is joined with group
+        # num_resources - 1 - i of the second one (padded with empty
+        # groups), so only groups from both sides in the overlap of
+        # their non-empty ranges are actually joined
+        num_first = len(first_groups)
+        num_second = len(second_groups)
+        overlap_start = num_resources - num_second
+        if num_first <= overlap_start:
+            groups = first_groups + second_groups
+        else:
+            groups = first_groups[:overlap_start]
+            for index in range(max(overlap_start, 0), num_first):
+                load_a, head_a, tail_a = first_groups[index]
+                load_b, head_b, tail_b = second_groups[
+                        num_resources - 1 - index]
+                next_task[tail_a] = head_b
+                groups.append((load_a + load_b, head_a, tail_b))
+            groups.extend(second_groups[:num_resources - num_first])
+        groups.sort(reverse=True)
+        if len(groups) < num_resources:
+            difference = groups[0][0]
+        else:
+            difference = groups[0][0] - groups[-1][0]
+        heappush(partial_heap, (-difference, counter, groups))
+        counter += 1
+
+    # Each group of the final mapping goes to one resource
+    _, _, groups = partial_heap[0]
+    for resource, (_, task, _) in enumerate(groups):
+        while task != -1:
+            mapping[task] = resource
+            task = next_task[task]
+    if verbose:
+        loads = [group[0] for group in groups]
+        loads += [0] * (num_resources - len(groups))
+        print(f'- Final resource loads: {loads}')
+
+    return mapping
+
+
+def _first_fit_decreasing(
+        order,
+        task_loads,
+        num_resources,
+        capacity):
+    """Packs tasks in resources of a given capacity with First-Fit.
+
+    Parameters
+    ----------
+    order : list of int
+        Tasks in decreasing load order
+    task_loads : list of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources (bins)
+    capacity : int or float
+        Maximum load of each resource
+
+    Returns
+    -------
+    list of int or None
+        Mapping of tasks to resources, or None if the tasks do not fit
+
+    Notes
+    -----
+    A segment tree keeps the largest free capacity of each range of
+    resources, so the first resource with enough free capacity for a
+    task is found in O(log m).
+    """
+    size = 1
+    while size < num_resources:
+        size *= 2
+    # Leaves [size, size + num_resources) are the resources
+    free = [-1] * (2 * size)
+    for leaf in range(size, size + num_resources):
+        free[leaf] = capacity
+    for node in range(size - 1, 0, -1):
+        free[node] = max(free[2 * node], free[2 * node + 1])
+
+    mapping = [None] * len(task_loads)
+    for task in order:
+        load = task_loads[task]
+        if free[1] < load:
+            return None
+        # Descends to the leftmost resource where the task fits
+        node = 1
+        while node < size:
+            node *= 2
+            if free[node] < load:
+                node += 1
+        mapping[task] = node - size
+        free[node] -= load
+        node //= 2
+        while node >= 1:
+            free[node] = max(free[2 * node], free[2 * node + 1])
+            node //= 2
+
+    return mapping
+
+
+def multifit(
+        task_loads,
+        num_resources,
+        num_iterations=7,
+        verbose=False):
+    """MULTIFIT scheduling algorithm.
+
+    Parameters
+    ----------
+    task_loads : list of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    num_iterations : int [default=7]
+        Number of steps of the binary search on the makespan
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    list of int
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    MULTIFIT searches for the smallest capacity C such that the tasks,
+    taken in decreasing load order, fit in the resources with the
+    First-Fit bin packing heuristic.
+    The binary search starts between max(average load, largest task)
+    and the makespan of LPT, whose mapping is kept if no smaller
+    capacity works. So the result is never worse than LPT.
+    Each step costs O(n log m) for n tasks and m resources.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'MULTIFIT: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    best_mapping = lpt(task_loads, num_resources)
+    if num_tasks == 0:
+        return best_mapping
+    order = decreasing_load_order(task_loads).tolist()
+    task_loads = _python_loads(task_loads)
+    lower = max(sum(task_loads) / num_resources, task_loads[order[0]])
+    upper = _makespan(best_mapping, task_loads, num_resources)
+
+    for iteration in range(num_iterations):
+        if upper <= lower:
+            break
+        capacity = (lower + upper) / 2
+        mapping = _first_fit_decreasing(order, task_loads, num_resources,
+                                        capacity)
+        if verbose:
+            print(f'- Capacity {capacity}: ' +
+                  ('fits' if mapping is not None else 'does not fit'))
+        if mapping is None:
+            lower = capacity
+        else:
+            upper = capacity
+            best_mapping = mapping
+
+    return best_mapping
+
+
+def _makespan(mapping, task_loads, num_resources):
+    """Returns the maximum resource load of a mapping."""
+    resource_loads = [0] * num_resources
+    for task, resource in enumerate(mapping):
+        resource_loads[resource] += task_loads[task]
+    return max(resource_loads)
+
+
+def makespan_lower_bound(
+        task_loads,
+        num_resources):
+    """Returns a lower bound on the optimal makespan.
+
+    Parameters
+    ----------
+    task_loads : list of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+
+    Returns
+    -------
+    int or float
+        Largest of the following bounds:
+        - average resource load (rounded up for integer loads);
+        - largest task load;
+        - sum of the m-th and (m+1)-th largest loads for m resources
+        (two of the m+1 largest tasks share a resource).
+    """
+    task_loads = np.asarray(task_loads)
+    if len(task_loads) == 0:
+        return 0
+    total_load = task_loads.sum().item()
+    if np.issubdtype(task_loads.dtype, np.integer):
+        bound = -(-total_load // num_resources)
+    else:
+        bound = total_load / num_resources
+    bound = max(bound, task_loads.max().item())
+    if len(task_loads) > num_resources:
+        largest = np.partition(task_loads, len(task_loads) - num_resources - 1)
+        largest = np.sort(largest[len(task_loads) - num_resources - 1:])
+        bound = max(bound, (largest[0] + largest[1]).item())
+    return bound
+
+
+# Maximum number of states remembered by _search
+_MAX_STATES = 1 << 20
+
+
+def _search(
+        sorted_loads,
+        num_resources,
+        best_makespan,
+        lower_bound,
+        deadline,
+        memoize=False,
+        verbose=False):
+    """Depth-first search for mappings better than a given makespan.
+
+    Parameters
+    ----------
+    sorted_loads : list of int or float
+        Load of the tasks in decreasing order
+    num_resources : int
+        Number of resources
+    best_makespan : int or float
+        Makespan to improve on
+    lower_bound : int or float
+        Makespan at which the search can stop
+    deadline : float
+        Value of time.perf_counter() at which the search stops
+    memoize : bool [default=False]
+        True if explored states should be remembered
+    verbose : bool [default=False]
+        True if messages should be printed during the search
+
+    Returns
+    -------
+    tuple
+        (best makespan, resource of each sorted task or None if no
+        better mapping was found, True if the search space was exhausted)
+
+    Notes
+    -----
+    Tasks are mapped in order, trying the least loaded resources first.
+    A resource is skipped if the task would reach the best makespan, or
+    if another resource with the same load was already tried (mappings
+    that only differ by swapping such resources are equivalent).
+    With memoization, a state is the depth and the sorted resource
+    loads. A state seen before cannot lead to a better mapping, since
+    the best makespan only decreases. The memory of states is cleared
+    when it reaches _MAX_STATES entries.
+    """
+    num_tasks = len(sorted_loads)
+    resource_loads = [0] * num_resources
+    assignment = [0] * num_tasks  # resource of each sorted task
+    best_assignment = None
+    # Candidate resources still to try at each depth
+    candidates = [None] * num_tasks
+    depth = 0
+    candidates[0] = [0]  # all resources are empty at the start
+    seen_states = set()
+    nodes = 0
+
+    while depth >= 0 and best_makespan > lower_bound:
+        nodes += 1
+        if nodes % 1024 == 0 and time.perf_counter() > deadline:
+            break
+        if not candidates[depth]:
+            # Backtracks
+            depth -= 1
+            if depth >= 0:
+                resource_loads[assignment[depth]] -= sorted_loads[depth]
+            continue
+        resource = candidates[depth].pop()
+        if resource_loads[resource] + sorted_loads[depth] >= best_makespan:
+            # The best makespan decreased since the candidates were
+            # listed, and the remaining candidates are more loaded
+            candidates[depth] = []
+            continue
+        resource_loads[resource] += sorted_loads[depth]
+        assignment[depth] = resource
+        depth += 1
+        if depth == num_tasks:
+            # Complete mapping better than the best one so far
+            best_makespan = max(resource_loads)
+            best_assignment = list(assignment)
+            if verbose:
+                print(f'- Found a mapping with makespan {best_makespan}')
+            depth -= 1
+            resource_loads[resource] -= sorted_loads[depth]
+            continue
+        if memoize:
+            state = (depth, tuple(sorted(resource_loads)))
+            if state in seen_states:
+                candidates[depth] = []
+                continue
+            if len(seen_states) >= _MAX_STATES:
+                seen_states.clear()
+            seen_states.add(state)
+        # Resources where the next task fits, most loaded first (popped
+        # last), skipping resources with the same load
+        load = sorted_loads[depth]
+        next_candidates = []
+        seen_loads = set()
+        for resource_load, candidate in sorted(
+                zip(resource_loads, range(num_resources))):
+            if resource_load + load >= best_makespan:
+                break
+            if resource_load not in seen_loads:
+                seen_loads.add(resource_load)
+                next_candidates.append(candidate)
+        next_candidates.reverse()
+        candidates[depth] = next_candidates
+
+    exhausted = depth < 0 or best_makespan <= lower_bound
+    if verbose:
+        print(f'- Explored {nodes} nodes, makespan {best_makespan}' +
+              (' (optimal)' if exhausted else ''))
+    return best_makespan, best_assignment, exhausted
+
+
+def complete_greedy(
+        task_loads,
+        num_resources,
+        time_limit=1.0,
+        verbose=False):
+    """Complete Greedy Algorithm (CGA) with a time budget.
+
+    Parameters
+    ----------
+    task_loads : list of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    time_limit : float [default=1.0]
+        Maximum search time in seconds
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    list of int
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    The Complete Greedy Algorithm is a depth-first search that takes
+    tasks in decreasing load order and tries to map each one to every
+    resource, from the least to the most loaded. Its first complete
+    mapping is the one from LPT, and later mappings can only improve it.
+    Branches are pruned when a resource would reach the makespan of the
+    best mapping found so far, and resources with the same load are
+    tried only once. The search stops when the time limit is reached or
+    when the makespan reaches max(average load, largest task).
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Complete Greedy: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    deadline = time.perf_counter() + time_limit
+    best_mapping = lpt(task_loads, num_resources)
+    if num_tasks == 0:
+        return best_mapping
+    order = decreasing_load_order(task_loads).tolist()
+    task_loads = _python_loads(task_loads)
+    sorted_loads = [task_loads[task] for task in order]
+    lower_bound = max(sum(sorted_loads) / num_resources, sorted_loads[0])
+
+    _, assignment, _ = _search(
+            sorted_loads, num_resources,
+            _makespan(best_mapping, task_loads, num_resources),
+            lower_bound, deadline, False, verbose)
+    if assignment is not None:
+        for position, task in enumerate(order):
+            best_mapping[task] = assignment[position]
+    return best_mapping
+
+
+def branch_and_bound(
+        task_loads,
+        num_resources,
+        time_limit=10.0,
+        verbose=False):
+    """Branch-and-bound search for an optimal mapping.
+
+    Parameters
+    ----------
+    task_loads : list of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    time_limit : float [default=10.0]
+        Maximum search time in seconds
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    tuple
+        (mapping, lower_bound) where mapping is the best mapping found
+        (list of int) and lower_bound is a proven lower bound on the
+        optimal makespan. Both makespans are equal if the mapping is
+        proven optimal.
+
+    Notes
+    -----
+    The search starts from the better of the LPT and MULTIFIT mappings
+    (upper bound) and uses makespan_lower_bound as lower bound.
+    Tasks are mapped in decreasing load order. Resources with the same
+    load are tried only once (symmetry breaking), and states (depth and
+    sorted resource loads) already explored are skipped (memoization).
+    If the time limit is reached before the search space is exhausted,
+    the best mapping found so far is returned with the lower bound.
+    Intended for small instances (tens of tasks).
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Branch-and-Bound: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    deadline = time.perf_counter() + time_limit
+    lower_bound = makespan_lower_bound(task_loads, num_resources)
+    best_mapping = multifit(task_loads, num_resources)
+    if num_tasks == 0:
+        return best_mapping, lower_bound
+    order = decreasing_load_order(task_loads).tolist()
+    task_loads = _python_loads(task_loads)
+    sorted_loads = [task_loads[task] for task in order]
+
+    best_makespan, assignment, exhausted = _search(
+            sorted_loads, num_resources,
+            _makespan(best_mapping, task_loads, num_resources),
+            lower_bound, deadline, True, verbose)
+    if assignment is not None:
+        for position, task in enumerate(order):
+            best_mapping[task] = assignment[position]
+    if exhausted:
+        # The best mapping is optimal
+        lower_bound = best_makespan
+    return best_mapping, lower_bound
+
+
+def refine(
+        mapping,
+        task_loads,
+        num_resources,
+        max_migrations=None,
+        tolerance=1.05,
+        verbose=False):
+    """Refinement-based rebalancing of an existing mapping.
+
+    Parameters
+    ----------
+    mapping : list of int
+        Current mapping of tasks to resources
+    task_loads : list of int or float
+        Updated load of the tasks
+    num_resources : int
+        Number of resources
+    max_migrations : int [default=None]
+        Maximum number of tasks to migrate (None for no limit)
+    tolerance : float [default=1.05]
+        Resources with a load above 'tolerance' times the average load
+        are considered overloaded
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    tuple
+        (new_mapping, moves) where new_mapping is a list of int and
+        moves is a list of (task, source, destination) in the order in
+        which they were decided
+
+    Notes
+    -----
+    Instead of computing a mapping from scratch, tasks are only moved
+    away from overloaded resources.
+    A max-heap keeps the overloaded resources and a min-heap keeps the
+    resources below the threshold. At each step, the largest task of the
+    most overloaded resource that fits in the least loaded resource
+    without taking it above the threshold is migrated. Both heaps are
+    updated incrementally: outdated entries are skipped when popped.
+    An overloaded resource that cannot give any task to the least loaded
+    resource is left as is.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Refine: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    new_mapping = list(_python_loads(mapping))
+    moves = []
+    if max_migrations is None:
+        max_migrations = num_tasks
+    mapping_array = np.asarray(new_mapping, dtype=np.int64)
+    task_loads = _python_loads(task_loads)
+
+    # Computes the load per resource
+    resource_loads = np.bincount(mapping_array, weights=task_loads,
+                                 minlength=num_resources).tolist()
+    threshold = tolerance * sum(resource_loads) / num_resources
+
+    # Tasks grouped by resource
+    task_order = np.argsort(mapping_array, kind='stable')
+    group_bounds = np.searchsorted(mapping_array[task_order],
+                                   np.arange(num_resources + 1)).tolist()
+    task_order = task_order.tolist()
+
+    # Each item in the heaps follows the convention (load, resource),
+    # with negative loads in the max-heap of overloaded resources
+    overloaded_heap = [(-load, resource)
+                       for resource, load in enumerate(resource_loads)
+                       if load > threshold]
+    underloaded_heap = [(load, resource)
+                        for resource, load in enumerate(resource_loads)
+                        if load < threshold]
+    heapq.heapify(overloaded_heap)
+    heapq.heapify(underloaded_heap)
+    # Tasks of the overloaded resources as (load, task), sorted
+    donor_tasks = {}
+
+    while overloaded_heap and underloaded_heap and \
+            len(moves) < max_migrations:
+        donor_load, donor = heapq.heappop(overloaded_heap)
+        if -donor_load != resource_loads[donor]:
+            continue  # Outdated entry
+        receiver_load, receiver = underloaded_heap[0]
+        if receiver_load != resource_loads[receiver]:
+            heapq.heappop(underloaded_heap)  # Outdated entry
+            heapq.heappush(overloaded_heap, (donor_load, donor))
+            continue
+
+        if donor not in donor_tasks:
+            first, last = group_bounds[donor], group_bounds[donor + 1]
+            donor_tasks[donor] = sorted(
+                    (task_loads[task], task)
+                    for task in task_order[first:last])
+        tasks = donor_tasks[donor]
+        # Largest task that keeps the receiver below the threshold
+        position = bisect.bisect_right(
+                tasks, (threshold - receiver_load, num_tasks)) - 1
+        if position < 0 or tasks[position][0] <= 0:
+            if verbose:
+                print(f'- Resource {donor} cannot give tasks to' +
+                      f' resource {receiver}')
+            continue
+        load, task = tasks.pop(position)
+
+        # Migrates the task
+        new_mapping[task] = receiver
+        moves.append((task, donor, receiver))
+        if verbose:
+            print(f'- Migrating task {task} from resource {donor}' +
+                  f' to resource {receiver}')
+        resource_loads[donor] -= load
+        resource_loads[receiver] += load
+        heapq.heappop(underloaded_heap)
+        if resource_loads[receiver] < threshold:
+            heapq.heappush(underloaded_heap,
+                           (resource_loads[receiver], receiver))
+        if resource_loads[donor] > threshold:
+            heapq.heappush(overloaded_heap, (-resource_loads[donor], donor))
+        elif resource_loads[donor] < threshold:
+            heapq.heappush(underloaded_heap, (resource_loads[donor], donor))
+
+    return new_mapping, moves
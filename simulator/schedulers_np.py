@@ -0,0 +1,506 @@
+"""Module containing array-based versions of the scheduling algorithms.
+
+Each scheduling algorithm receives the same inputs as its counterpart
+in simulator.schedulers and outputs the same mapping, but stored in a
+NumPy array of int32 instead of a list.
+Mappings are built with vectorized operations whenever possible.
+
+Implemented scheduling methods: round_robin, compact, uniformly_random,
+list_scheduler.
+Approximate list scheduling (many tasks per step): block_list_scheduler.
+Batched scheduling methods (many instances per call, one mapping per
+row): batch_round_robin, batch_compact, batch_list_scheduler.
+"""
+
+import random       # for the reference random number generator
+import heapq        # for heaps (it implements only min-heaps)
+import numpy as np  # for arrays
+
+from simulator.rng import integers  # for vectorized random draws
+
+# Number of tasks processed at a time when writing to an output array
+_CHUNK_SIZE = 1 << 22
+
+
+def _output(out, num_tasks):
+    """Returns the array that receives a mapping."""
+    if out is None:
+        return np.empty(num_tasks, dtype=np.int32)
+    if len(out) != num_tasks:
+        raise ValueError(f'Output has {len(out)} values for {num_tasks} tasks')
+    return out
+
+
+def round_robin(
+        num_tasks,
+        num_resources,
+        verbose=False,
+        out=None):
+    """Round-Robin scheduling algorithm.
+
+    Parameters
+    ----------
+    num_tasks : int
+        Number of tasks
+    num_resources : int
+        Number of resources
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    out : numpy.ndarray of int [default=None]
+        Array that receives the mapping, e.g., a memory map from
+        simulator.storage.create_array (None for a new array)
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Same mapping as simulator.schedulers.round_robin, computed as the
+    task identifiers modulo the number of resources. With 'out', the
+    mapping is written in chunks.
+    """
+    if verbose:
+        print(f'Round-Robin (array): starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    if out is None:
+        mapping = np.arange(num_tasks, dtype=np.int32)
+        mapping %= num_resources
+        return mapping
+    mapping = _output(out, num_tasks)
+    for start in range(0, num_tasks, _CHUNK_SIZE):
+        stop = min(start + _CHUNK_SIZE, num_tasks)
+        mapping[start:stop] = np.arange(start, stop) % num_resources
+    return mapping
+
+
+def compact(
+        num_tasks,
+        num_resources,
+        verbose=False,
+        out=None):
+    """Compact scheduling algorithm.
+
+    Parameters
+    ----------
+    num_tasks : int
+        Number of tasks
+    num_resources : int
+        Number of resources
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    out : numpy.ndarray of int [default=None]
+        Array that receives the mapping, e.g., a memory map from
+        simulator.storage.create_array (None for a new array)
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Same mapping as simulator.schedulers.compact, computed by repeating
+    each resource identifier by the size of its group of tasks. With
+    'out', the mapping is written in chunks.
+    """
+    if verbose:
+        print(f'Compact (array): starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    # Size of partitions
+    partition_size = num_tasks // num_resources
+    # Number of resources that will have +1 tasks
+    leftover = num_tasks % num_resources
+    if verbose:
+        print(f'- Size of partitions = {partition_size}')
+        print(f'- Leftover = {leftover}')
+
+    resources = np.arange(num_resources, dtype=np.int32)
+    group_sizes = np.full(num_resources, partition_size, dtype=np.int64)
+    group_sizes[:leftover] += 1
+    if out is None:
+        return np.repeat(resources, group_sizes)
+    mapping = _output(out, num_tasks)
+    # First task of each resource
+    bounds = np.concatenate([[0], np.cumsum(group_sizes)[:-1]])
+    for start in range(0, num_tasks, _CHUNK_SIZE):
+        stop = min(start + _CHUNK_SIZE, num_tasks)
+        mapping[start:stop] = np.searchsorted(
+                bounds, np.arange(start, stop), side='right') - 1
+    return mapping
+
+
+def uniformly_random(
+        num_tasks,
+        num_resources,
+        rng_seed=None,
+        verbose=False,
+        rng=None):
+    """Random scheduling algorithm.
+
+    Parameters
+    ----------
+    num_tasks : int
+        Number of tasks
+    num_resources : int
+        Number of resources
+    rng_seed : int [default=None]
+        Seed for the random number generator
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    rng : random.Random or numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one seeded
+        with 'rng_seed'
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Same mapping as simulator.schedulers.uniformly_random for the same
+    seed or generator. All resources are drawn at once, with a NumPy
+    MT19937 generator reproducing the sequence of the standard 'random'
+    module when 'rng' is not a numpy.random.Generator.
+    """
+    if verbose:
+        print(f'Random (array): starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+        if rng_seed is not None:
+            print(f'- RNG seed is {rng_seed}.')
+    if rng is None:
+        rng = random.Random(rng_seed)
+    mapping = integers(rng, 0, num_resources, num_tasks)
+    return mapping.astype(np.int32)
+
+
+def list_scheduler(
+        task_loads,
+        num_resources,
+        verbose=False,
+        out=None):
+    """Basic list scheduling algorithm.
+
+    Parameters
+    ----------
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    out : numpy.ndarray of int [default=None]
+        Array that receives the mapping, e.g., a memory map from
+        simulator.storage.create_array (None for a new array)
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Same mapping as simulator.schedulers.list_scheduler.
+    Each decision depends on the previous ones, so the tasks are still
+    processed one at a time using a min-heap of (load, resource).
+    Loads are read and the mapping is written in chunks, so arrays
+    larger than the memory (memory maps) can be scheduled.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'List Scheduler (array): starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    mapping = _output(out, num_tasks)
+
+    resource_heap = [(0, resource) for resource in range(num_resources)]
+    heapq.heapify(resource_heap)
+    heappushpop = heapq.heappushpop
+
+    resource_load, resource = heapq.heappop(resource_heap)
+    for start in range(0, num_tasks, _CHUNK_SIZE):
+        # Python scalars are much faster than NumPy scalars inside the loop
+        chunk_loads = task_loads[start:start + _CHUNK_SIZE]
+        if isinstance(chunk_loads, np.ndarray):
+            chunk_loads = chunk_loads.tolist()
+        chunk_mapping = []
+        for load in chunk_loads:
+            chunk_mapping.append(resource)
+            # Pushes the updated resource and pops the least loaded one
+            resource_load, resource = heappushpop(
+                    resource_heap, (resource_load + load, resource))
+        mapping[start:start + len(chunk_mapping)] = chunk_mapping
+
+    return mapping
+
+
+def _water_level(sorted_loads, block_load):
+    """Finds the level reached by pouring a load over sorted resources.
+
+    Parameters
+    ----------
+    sorted_loads : numpy.ndarray of float64
+        Resource loads in increasing order
+    block_load : float
+        Load to distribute
+
+    Returns
+    -------
+    float
+        Level T such that the sum of max(0, T - load) over all resources
+        is equal to block_load
+    """
+    num_resources = len(sorted_loads)
+    counts = np.arange(1, num_resources + 1)
+    # Level if only the k least loaded resources were filled
+    levels = (np.cumsum(sorted_loads) + block_load) / counts
+    # The k least loaded resources are below their level for k = 1 up to
+    # the number of resources that are actually filled
+    filled = np.count_nonzero(levels >= sorted_loads)
+    return levels[filled - 1]
+
+
+def block_list_scheduler(
+        task_loads,
+        num_resources,
+        block_size=1 << 18,
+        verbose=False,
+        out=None):
+    """List scheduling algorithm processing blocks of tasks at a time.
+
+    Parameters
+    ----------
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    block_size : int [default=262144]
+        Number of tasks mapped at a time (1 gives the same mapping as
+        list_scheduler)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    out : numpy.ndarray of int [default=None]
+        Array that receives the mapping, e.g., a memory map from
+        simulator.storage.create_array (None for a new array)
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources
+
+    Notes
+    -----
+    Instead of one heap operation per task, each block of tasks is
+    mapped at once by water-filling: the load of the block is poured
+    over the resources, from the least loaded one, up to a common level
+    T. Each resource below T receives a capacity T - load. Tasks are
+    then laid out in [lexicographical] order over these capacities, and
+    each task goes to the resource where it starts. Each resource thus
+    receives a run of consecutive tasks, found with a searchsorted of
+    the capacities over the cumulative task loads. The cost per block
+    is O(block_size + m log m) array operations.
+
+    Bound: a resource that receives tasks in a block ends with a load of
+    at most T + p_max, where p_max is the largest task load, and T is
+    never above W / m (W: total load so far, m: number of resources).
+    Hence, for any block size,
+        makespan <= W / m + p_max <= LS + p_max,
+    where LS is the makespan of list_scheduler (which is at least
+    W / m). Exact list scheduling has makespan <= W / m + p_max too, so
+    both share the same worst-case guarantee.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Block List Scheduler: starting with {num_tasks} tasks,' +
+              f' {num_resources} resources and blocks of {block_size}.')
+    mapping = _output(out, num_tasks)
+    resource_loads = np.zeros(num_resources)
+
+    for start in range(0, num_tasks, block_size):
+        block_loads = np.asarray(task_loads[start:start + block_size],
+                                 dtype=np.float64)
+        stop = start + len(block_loads)
+        # Resources from the least to the most loaded one
+        order = np.argsort(resource_loads, kind='stable')
+        # Load poured before each task (and in total, at the end)
+        poured = np.zeros(len(block_loads) + 1)
+        np.cumsum(block_loads, out=poured[1:])
+        if poured[-1] == 0:
+            mapping[start:stop] = order[0]
+            continue
+        sorted_loads = resource_loads[order]
+        level = _water_level(sorted_loads, poured[-1])
+        capacities = np.cumsum(np.maximum(level - sorted_loads, 0))
+        # Tasks are laid out in order, so each resource receives a run of
+        # consecutive tasks: the ones starting inside its capacity
+        run_starts = np.zeros(num_resources + 1, dtype=np.int64)
+        run_starts[1:-1] = np.searchsorted(poured[:-1], capacities[:-1])
+        run_starts[-1] = len(block_loads)
+        mapping[start:stop] = np.repeat(order, np.diff(run_starts))
+        resource_loads[order] += np.diff(poured[run_starts])
+
+    return mapping
+
+
+def _instance_resources(num_resources, num_instances):
+    """Returns the number of resources of each instance of a batch.
+
+    Parameters
+    ----------
+    num_resources : int or array_like of int
+        Number of resources (shared or per instance)
+    num_instances : int or None
+        Number of instances in the batch (None for one instance per
+        entry of num_resources, or a single instance if it is an int)
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Number of resources of each instance
+    """
+    num_resources = np.asarray(num_resources, dtype=np.int64)
+    if num_instances is None:
+        num_instances = num_resources.size if num_resources.ndim > 0 else 1
+    return np.broadcast_to(num_resources, (num_instances,))
+
+
+def batch_round_robin(
+        num_tasks,
+        num_resources,
+        verbose=False,
+        num_instances=None):
+    """Round-Robin scheduling algorithm for a batch of instances.
+
+    Parameters
+    ----------
+    num_tasks : int
+        Number of tasks of each instance
+    num_resources : int or array_like of int
+        Number of resources (shared or per instance)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    num_instances : int [default=None]
+        Number of instances (None for one instance per entry of
+        num_resources, or a single instance if it is an int)
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources (instances x tasks)
+
+    Notes
+    -----
+    Row i is equal to round_robin(num_tasks, num_resources[i]).
+    """
+    num_resources = _instance_resources(num_resources, num_instances)
+    num_instances = len(num_resources)
+    if verbose:
+        print(f'Batch Round-Robin: starting with {num_instances} instances' +
+              f' of {num_tasks} tasks.')
+    tasks = np.arange(num_tasks, dtype=np.int64)
+    mapping = tasks[np.newaxis, :] % num_resources[:, np.newaxis]
+    return mapping.astype(np.int32)
+
+
+def batch_compact(
+        num_tasks,
+        num_resources,
+        verbose=False,
+        num_instances=None):
+    """Compact scheduling algorithm for a batch of instances.
+
+    Parameters
+    ----------
+    num_tasks : int
+        Number of tasks of each instance
+    num_resources : int or array_like of int
+        Number of resources (shared or per instance)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+    num_instances : int [default=None]
+        Number of instances (None for one instance per entry of
+        num_resources, or a single instance if it is an int)
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources (instances x tasks)
+
+    Notes
+    -----
+    Row i is equal to compact(num_tasks, num_resources[i]).
+    The first 'leftover' resources receive groups of size
+    'partition_size + 1', so the resource of a task follows directly
+    from its identifier.
+    """
+    num_resources = _instance_resources(num_resources, num_instances)
+    num_instances = len(num_resources)
+    if verbose:
+        print(f'Batch Compact: starting with {num_instances} instances' +
+              f' of {num_tasks} tasks.')
+    partition_size = (num_tasks // num_resources)[:, np.newaxis]
+    leftover = (num_tasks % num_resources)[:, np.newaxis]
+    tasks = np.arange(num_tasks, dtype=np.int64)[np.newaxis, :]
+
+    # Tasks belonging to the larger groups
+    large_tasks = leftover * (partition_size + 1)
+    in_large_group = tasks < large_tasks
+    # Avoids divisions by zero when there are more resources than tasks
+    safe_size = np.maximum(partition_size, 1)
+    mapping = np.where(in_large_group,
+                       tasks // (partition_size + 1),
+                       leftover + (tasks - large_tasks) // safe_size)
+    return mapping.astype(np.int32)
+
+
+def batch_list_scheduler(
+        task_loads,
+        num_resources,
+        verbose=False):
+    """Basic list scheduling algorithm for a batch of instances.
+
+    Parameters
+    ----------
+    task_loads : array_like of int or float
+        Load of the tasks (instances x tasks)
+    num_resources : int or array_like of int
+        Number of resources (shared or per instance)
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    numpy.ndarray of int32
+        Mapping of tasks to resources (instances x tasks)
+
+    Notes
+    -----
+    Row i is equal to list_scheduler(task_loads[i], num_resources[i]).
+    Tasks are still taken in order, but each step maps the current task
+    of all instances at once: the least loaded resource of every
+    instance is found with a single argmin over a matrix of resource
+    loads (instances x resources). Ties go to the resource with the
+    smallest identifier, as in the min-heap of (load, resource).
+    Instances with fewer resources are padded with infinite loads.
+    """
+    task_loads = np.asarray(task_loads)
+    num_instances, num_tasks = task_loads.shape
+    if verbose:
+        print(f'Batch List Scheduler: starting with {num_instances}' +
+              f' instances of {num_tasks} tasks.')
+    num_resources = _instance_resources(num_resources, num_instances)
+    max_resources = int(num_resources.max()) if num_instances > 0 else 0
+
+    resource_loads = np.zeros((num_instances, max_resources))
+    padding = np.arange(max_resources) >= num_resources[:, np.newaxis]
+    resource_loads[padding] = np.inf
+    mapping = np.empty((num_instances, num_tasks), dtype=np.int32)
+    instances = np.arange(num_instances)
+
+    for task in range(num_tasks):
+        resources = resource_loads.argmin(axis=1)
+        mapping[:, task] = resources
+        resource_loads[instances, resources] += task_loads[:, task]
+
+    return mapping
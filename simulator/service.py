@@ -0,0 +1,571 @@
+"""Module containing a scheduling service for live task placement.
+
+The service keeps the state of an OnlineListScheduler (the load of each
+resource) and answers placement requests from local clients over a Unix
+socket or a loopback TCP socket. Messages are JSON objects, one per line
+(newline-delimited JSON). Each request may carry an 'id', which is
+copied to its response.
+
+Requests:
+    - {"op": "assign", "loads": [5, 3], "policy": "list"}
+    Maps tasks to resources and returns {"resources": [0, 1]}. Policy
+    'list' (default) maps the tasks in the given order, as
+    list_scheduler; policy 'lpt' maps them in decreasing load order,
+    as lpt. In both cases, the current resource loads are taken into
+    account.
+    - {"op": "metrics", "resource_loads": false}
+    Returns the live metrics of the service (number of tasks, total
+    load, makespan, imbalance, requests, batches, pending requests and
+    assignment rate), and the load of each resource if requested.
+Errors are reported as {"error": "message"}.
+
+Requests from all connections go through a single bounded queue and
+are processed by one worker, in arrival order:
+    - batching: the worker takes all queued requests (up to max_batch)
+    at once, and consecutive 'list' assignments are mapped by a single
+    assign_many call;
+    - backpressure: when the queue is full, connections stop reading
+    from their sockets until the worker catches up, and the worker
+    waits for slow clients to receive their responses.
+
+Example
+-------
+From a shell:
+$ python3 -m simulator.service --resources 64 --unix /tmp/scheduler.sock
+
+From Python (inside a coroutine):
+>>> client = await ServiceClient.connect(path='/tmp/scheduler.sock')
+>>> await client.assign([5, 3, 8], policy='lpt')
+[1, 2, 0]
+>>> await client.metrics()
+"""
+
+import argparse   # for the command line
+import asyncio    # for the server
+import ipaddress  # for checking loopback addresses
+import json       # for messages
+import math       # for checking loads
+import os         # for Unix socket files
+import sys        # for exit codes
+import time       # for rates
+
+import simulator.schedulers as schedulers  # for scheduling policies
+
+POLICIES = ('list', 'lpt')
+# Maximum length of a message (in bytes)
+MAX_LINE = 1 << 24
+
+
+def _check_host(host):
+    """Raises ValueError if a host is not a loopback address."""
+    if host == 'localhost':
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError('The service only listens on loopback ' +
+                         f'addresses, received {host}')
+
+
+def _check_loads(loads):
+    """Raises ValueError if loads are not a list of non-negative numbers.
+
+    Invalid loads (including booleans, NaN and infinite values) are
+    rejected before any task is mapped, so a bad request never leaves
+    the scheduler partially updated.
+    """
+    if not isinstance(loads, list):
+        raise ValueError("'loads' must be a list of numbers")
+    for load in loads:
+        if isinstance(load, bool) or not isinstance(load, (int, float)):
+            raise ValueError("'loads' must be a list of numbers")
+        if isinstance(load, float) and not math.isfinite(load):
+            raise ValueError('Loads must be finite')
+        if load < 0:
+            raise ValueError('Loads must be non-negative')
+
+
+class SchedulingService:
+    """Asyncio server mapping tasks to resources for local clients.
+
+    Parameters
+    ----------
+    num_resources : int
+        Number of resources
+    max_batch : int [default=1024]
+        Maximum number of requests processed at once
+    max_pending : int [default=4096]
+        Maximum number of queued requests (backpressure threshold)
+    verbose : bool [default=False]
+        True if messages should be printed by the service
+
+    Attributes
+    ----------
+    scheduler : schedulers.OnlineListScheduler
+        State of the resources
+    num_requests : int
+        Number of requests processed
+    num_batches : int
+        Number of batches processed
+    """
+
+    __slots__ = ('scheduler', 'max_batch', 'max_pending', 'verbose',
+                 'num_requests', 'num_batches', '_connections', '_queue',
+                 '_server', '_worker', '_path', '_start_time')
+
+    def __init__(
+            self,
+            num_resources,
+            max_batch=1024,
+            max_pending=4096,
+            verbose=False):
+        self.scheduler = schedulers.OnlineListScheduler(num_resources)
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.verbose = verbose
+        self.num_requests = 0
+        self.num_batches = 0
+        # Writer -> task reading the requests of each open connection
+        self._connections = {}
+        self._queue = None
+        self._server = None
+        self._worker = None
+        self._path = None
+        self._start_time = time.perf_counter()
+
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """Starts listening for clients.
+
+        Parameters
+        ----------
+        path : string [default=None]
+            Unix socket file (None to use TCP)
+        host : string [default='127.0.0.1']
+            Loopback address for TCP
+        port : int [default=0]
+            TCP port (0 for any free port)
+
+        Returns
+        -------
+        string or tuple
+            Socket file or (host, port) where the service listens
+
+        Raises
+        ------
+        ValueError
+            If host is not a loopback address
+        """
+        self._queue = asyncio.Queue(self.max_pending)
+        self._worker = asyncio.create_task(self._process())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                    self._handle, path, limit=MAX_LINE)
+            self._path = path
+            address = path
+        else:
+            _check_host(host)
+            self._server = await asyncio.start_server(
+                    self._handle, host, port, limit=MAX_LINE)
+            address = self._server.sockets[0].getsockname()[:2]
+        self._start_time = time.perf_counter()
+        if self.verbose:
+            print('Scheduling service: starting with ' +
+                  f'{self.scheduler.num_resources} resources on {address}.')
+        return address
+
+    @property
+    def num_connections(self):
+        """Number of open connections."""
+        return len(self._connections)
+
+    async def close(self):
+        """Stops the service (pending requests are dropped)."""
+        if self._server is not None:
+            self._server.close()
+            # Ends the connections while the worker still runs, so their
+            # tasks can finish queueing their last requests
+            for writer in list(self._connections):
+                writer.close()
+            await asyncio.gather(*self._connections.values())
+            await self._server.wait_closed()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        if self._path is not None and os.path.exists(self._path):
+            os.remove(self._path)
+        self._server = self._worker = self._path = None
+
+    async def serve_forever(self, path=None, host='127.0.0.1', port=0):
+        """Starts the service and runs it until it is cancelled."""
+        await self.start(path, host, port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    def metrics(self, resource_loads=False):
+        """Returns the live metrics of the service.
+
+        Parameters
+        ----------
+        resource_loads : bool [default=False]
+            True to include the load of each resource
+
+        Returns
+        -------
+        dict
+            Metrics (JSON serializable)
+        """
+        scheduler = self.scheduler
+        uptime = time.perf_counter() - self._start_time
+        metrics = {'num_resources': scheduler.num_resources,
+                   'num_tasks': scheduler.num_tasks,
+                   'total_load': scheduler.total_load,
+                   'makespan': scheduler.makespan,
+                   'imbalance': scheduler.imbalance,
+                   'requests': self.num_requests,
+                   'batches': self.num_batches,
+                   'pending': self._queue.qsize() if self._queue else 0,
+                   'connections': self.num_connections,
+                   'uptime': uptime,
+                   'assignments_per_second':
+                       scheduler.num_tasks / uptime if uptime > 0 else 0.0}
+        if resource_loads:
+            metrics['resource_loads'] = scheduler.resource_loads()
+        return metrics
+
+    async def _handle(self, reader, writer):
+        """Reads the requests of a connection into the queue."""
+        self._connections[writer] = asyncio.current_task()
+        queue = self._queue
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Message longer than MAX_LINE: the stream is lost
+                    error = ValueError(f'Messages are limited to {MAX_LINE}'
+                                       ' bytes')
+                    await queue.put((error, writer))
+                    break
+                if not line:
+                    break
+                # Waits while the queue is full (backpressure)
+                await queue.put((line, writer))
+        except ConnectionError:
+            pass
+        finally:
+            # Closes the connection after its pending requests
+            await queue.put((None, writer))
+            del self._connections[writer]
+
+    def _assign_lpt(self, loads):
+        """Maps tasks in decreasing load order and returns their resources."""
+        order = schedulers.decreasing_load_order(loads).tolist()
+        assigned = self.scheduler.assign_many([loads[task]
+                                               for task in order])
+        resources = [0] * len(loads)
+        for task, resource in zip(order, assigned):
+            resources[task] = resource
+        return resources
+
+    def _answer(self, request):
+        """Returns the response to a request other than a 'list' assign."""
+        op = request.get('op')
+        if op == 'assign':
+            policy = request.get('policy', 'list')
+            if policy not in POLICIES:
+                raise ValueError(f'Unknown policy: {policy}')
+            loads = request.get('loads')
+            _check_loads(loads)
+            return {'resources': self._assign_lpt(loads)}
+        if op == 'metrics':
+            return self.metrics(bool(request.get('resource_loads')))
+        raise ValueError(f'Unknown operation: {op}')
+
+    def _run_batch(self, items):
+        """Processes a batch of requests.
+
+        Parameters
+        ----------
+        items : list of tuple
+            (line, writer) of each request, where line is the message
+            (bytes), an error found while reading it, or None once the
+            connection has no more requests
+
+        Returns
+        -------
+        list of tuple
+            (writer, response as bytes, or None to close the writer)
+        """
+        self.num_requests += sum(line is not None for line, _ in items)
+        self.num_batches += 1
+        responses = []
+        # Consecutive 'list' assignments waiting to be mapped together
+        run = []
+
+        def flush():
+            if not run:
+                return
+            assigned = self.scheduler.assign_many(
+                    [load for _, _, loads in run for load in loads])
+            start = 0
+            for writer, request_id, loads in run:
+                stop = start + len(loads)
+                response = {'resources': assigned[start:stop]}
+                if request_id is not None:
+                    response['id'] = request_id
+                responses.append((writer, response))
+                start = stop
+            run.clear()
+
+        for line, writer in items:
+            if line is None:
+                flush()
+                responses.append((writer, None))
+                continue
+            request_id = None
+            try:
+                if isinstance(line, ValueError):
+                    raise line
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('Requests must be JSON objects')
+                request_id = request.get('id')
+                if (request.get('op') == 'assign' and
+                        request.get('policy', 'list') == 'list'):
+                    _check_loads(request.get('loads'))
+                    run.append((writer, request_id, request['loads']))
+                    continue
+                flush()
+                response = self._answer(request)
+            except Exception as error:
+                # Any failure (e.g., RecursionError for deeply nested
+                # JSON) only affects its own request
+                flush()
+                response = {'error': str(error) or type(error).__name__}
+            if request_id is not None:
+                response['id'] = request_id
+            responses.append((writer, response))
+        flush()
+        return [(writer, None if response is None else
+                 (json.dumps(response) + '\n').encode())
+                for writer, response in responses]
+
+    async def _process(self):
+        """Processes the queued requests in batches."""
+        queue = self._queue
+        while True:
+            items = [await queue.get()]
+            while len(items) < self.max_batch and not queue.empty():
+                items.append(queue.get_nowait())
+            try:
+                await self._respond(items)
+            except Exception as error:
+                # The worker serves every connection, so it never stops
+                if self.verbose:
+                    print(f'Service: failed batch ({error!r})')
+            finally:
+                for _ in items:
+                    queue.task_done()
+
+    async def _respond(self, items):
+        """Processes a batch of requests and sends the responses."""
+        try:
+            outputs = self._run_batch(items)
+        except Exception as error:
+            data = (json.dumps({'error': str(error) or
+                                type(error).__name__}) + '\n').encode()
+            outputs = [(writer, None if line is None else data)
+                       for line, writer in items]
+        writers = []
+        for writer, data in outputs:
+            if writer.is_closing():
+                continue
+            if data is None:
+                writer.close()
+                continue
+            writer.write(data)
+            if writer not in writers:
+                writers.append(writer)
+        # Waits for slow clients (backpressure)
+        for writer in writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                writer.close()
+
+
+class ServiceClient:
+    """Client of a SchedulingService.
+
+    Use ServiceClient.connect to create a client.
+
+    Example
+    -------
+    >>> client = await ServiceClient.connect(host='127.0.0.1', port=8000)
+    >>> await client.assign([5, 3, 8])
+    [0, 1, 2]
+    >>> await client.close()
+    """
+
+    __slots__ = ('reader', 'writer', '_next_id')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, path=None, host='127.0.0.1', port=None):
+        """Connects to a service.
+
+        Parameters
+        ----------
+        path : string [default=None]
+            Unix socket file (None to use TCP)
+        host : string [default='127.0.0.1']
+            Address of the service for TCP
+        port : int [default=None]
+            Port of the service for TCP
+
+        Returns
+        -------
+        ServiceClient
+            Connected client
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(
+                    path, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(
+                    host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def close(self):
+        """Closes the connection."""
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def requests(self, messages):
+        """Sends requests without waiting and returns their responses.
+
+        Parameters
+        ----------
+        messages : list of dict
+            Requests (an 'id' is added to each one)
+
+        Returns
+        -------
+        list of dict
+            Response to each request, in the same order
+
+        Raises
+        ------
+        ValueError
+            If the service reports an error
+        """
+        first_id = self._next_id
+        self._next_id += len(messages)
+        self.writer.write(b''.join(
+                (json.dumps(dict(message, id=first_id + index)) +
+                 '\n').encode()
+                for index, message in enumerate(messages)))
+        await self.writer.drain()
+        responses = []
+        for _ in messages:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError('The service closed the connection')
+            response = json.loads(line)
+            if 'error' in response:
+                raise ValueError(response['error'])
+            responses.append(response)
+        return responses
+
+    async def assign(self, loads, policy='list'):
+        """Maps tasks to resources.
+
+        Parameters
+        ----------
+        loads : list of int or float
+            Load of the tasks
+        policy : string [default='list']
+            'list' (tasks in the given order) or 'lpt' (decreasing load
+            order)
+
+        Returns
+        -------
+        list of int
+            Resource of each task
+        """
+        request = {'op': 'assign', 'loads': list(loads), 'policy': policy}
+        return (await self.requests([request]))[0]['resources']
+
+    async def metrics(self, resource_loads=False):
+        """Returns the live metrics of the service.
+
+        Parameters
+        ----------
+        resource_loads : bool [default=False]
+            True to include the load of each resource
+
+        Returns
+        -------
+        dict
+            Metrics of the service (see SchedulingService.metrics)
+        """
+        request = {'op': 'metrics', 'resource_loads': resource_loads}
+        response = (await self.requests([request]))[0]
+        del response['id']
+        return response
+
+
+def main(arguments=None):
+    """Runs the scheduling service from the command line.
+
+    Parameters
+    ----------
+    arguments : list of str [default=None]
+        Command line arguments (None for sys.argv)
+
+    Returns
+    -------
+    int
+        Exit status
+    """
+    parser = argparse.ArgumentParser(
+            prog='python3 -m simulator.service',
+            description='Scheduling service for local clients.')
+    parser.add_argument('--resources', type=int, required=True,
+                        help='number of resources')
+    parser.add_argument('--unix', metavar='PATH',
+                        help='Unix socket file (default: TCP)')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='loopback address for TCP (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='TCP port (default: 8765)')
+    parser.add_argument('--max-batch', type=int, default=1024,
+                        help='requests processed at once (default: 1024)')
+    parser.add_argument('--max-pending', type=int, default=4096,
+                        help='queued requests before backpressure'
+                        ' (default: 4096)')
+    options = parser.parse_args(arguments)
+
+    service = SchedulingService(options.resources, options.max_batch,
+                                options.max_pending, verbose=True)
+    try:
+        asyncio.run(service.serve_forever(options.unix, options.host,
+                                          options.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,557 @@
+"""Module containing a discrete-event simulation of task execution.
+
+The functions in simulator.schedulers only compute how much load each
+resource receives. The simulation in this module replays a mapping over
+time: each resource executes its tasks one at a time, in the order they
+become ready, at its own speed. Tasks may have arrival times and
+dependencies (a directed acyclic graph), and idle resources may steal
+ready tasks from other resources.
+
+Dynamic scheduling (mappings that change during execution):
+work_stealing_scheduler.
+"""
+
+import random       # for victim selection
+import collections  # for task queues
+import heapq        # for the event queue (a min-heap)
+import numpy as np  # for arrays
+
+
+class SimulationResult:
+    """Outcome of a simulation.
+
+    Attributes
+    ----------
+    num_resources : int
+        Number of resources
+    start_times : numpy.ndarray of float64
+        Time at which each task started
+    finish_times : numpy.ndarray of float64
+        Time at which each task finished
+    resources : numpy.ndarray of int64
+        Resource that executed each task (it differs from the mapping
+        for stolen tasks)
+    makespan : float
+        Time at which the last task finished
+    """
+
+    __slots__ = ('num_resources', 'start_times', 'finish_times',
+                 'resources', 'makespan')
+
+    def __init__(
+            self,
+            num_resources,
+            start_times,
+            finish_times,
+            resources):
+        self.num_resources = num_resources
+        self.start_times = start_times
+        self.finish_times = finish_times
+        self.resources = resources
+        if len(finish_times) > 0:
+            self.makespan = float(finish_times.max())
+        else:
+            self.makespan = 0.0
+
+    def __repr__(self):
+        return (f'SimulationResult(num_tasks={len(self.finish_times)}, ' +
+                f'num_resources={self.num_resources}, ' +
+                f'makespan={self.makespan})')
+
+    def busy_times(self):
+        """Returns the time each resource spent executing tasks.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Busy time of each resource
+        """
+        return np.bincount(self.resources,
+                           weights=self.finish_times - self.start_times,
+                           minlength=self.num_resources)
+
+    def utilization(self):
+        """Returns the fraction of the makespan each resource was busy.
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Utilization of each resource (between 0 and 1)
+        """
+        if self.makespan == 0:
+            return np.zeros(self.num_resources)
+        return self.busy_times() / self.makespan
+
+    def idle_periods(self, resource):
+        """Returns the periods in which a resource was idle.
+
+        Parameters
+        ----------
+        resource : int
+            Resource identifier
+
+        Returns
+        -------
+        list of tuple
+            (start, end) of each idle period between time 0 and the
+            makespan
+        """
+        tasks = np.flatnonzero(self.resources == resource)
+        tasks = tasks[np.argsort(self.start_times[tasks], kind='stable')]
+        ends = np.concatenate([[0.0], self.finish_times[tasks]])
+        starts = np.concatenate([self.start_times[tasks], [self.makespan]])
+        idle = starts > ends
+        return list(zip(ends[idle].tolist(), starts[idle].tolist()))
+
+    def utilization_timeline(self, num_bins=100):
+        """Returns the utilization of each resource over time.
+
+        Parameters
+        ----------
+        num_bins : int [default=100]
+            Number of time intervals between 0 and the makespan
+
+        Returns
+        -------
+        numpy.ndarray of float64
+            Matrix (resources x num_bins) with the fraction of each time
+            interval in which each resource was busy
+
+        Notes
+        -----
+        Vectorized over tasks: each execution adds its partial overlap
+        to its first and last intervals, and full intervals in between
+        are filled with a difference array.
+        """
+        timeline = np.zeros((self.num_resources, num_bins + 1))
+        if self.makespan == 0:
+            return timeline[:, :num_bins]
+        width = self.makespan / num_bins
+        starts = self.start_times
+        finishes = self.finish_times
+        first = np.minimum((starts / width).astype(np.int64), num_bins - 1)
+        last = np.minimum((finishes / width).astype(np.int64), num_bins - 1)
+        rows = self.resources * (num_bins + 1)
+        flat = timeline.ravel()
+        same = first == last
+        # Executions within a single interval
+        np.add.at(flat, rows[same] + first[same],
+                  finishes[same] - starts[same])
+        # Executions over several intervals: partial first and last ones
+        spread = ~same
+        np.add.at(flat, rows[spread] + first[spread],
+                  (first[spread] + 1) * width - starts[spread])
+        np.add.at(flat, rows[spread] + last[spread],
+                  finishes[spread] - last[spread] * width)
+        # Full intervals in between (difference array)
+        full = spread & (last > first + 1)
+        coverage = np.zeros_like(timeline)
+        flat_coverage = coverage.ravel()
+        np.add.at(flat_coverage, rows[full] + first[full] + 1, width)
+        np.add.at(flat_coverage, rows[full] + last[full], -width)
+        timeline += np.cumsum(coverage, axis=1)
+        return timeline[:, :num_bins] / width
+
+
+def _successors(dependencies, num_tasks):
+    """Builds the successors of each task from a list of dependencies.
+
+    Parameters
+    ----------
+    dependencies : tuple of array_like of int
+        (predecessors, successors): task successors[i] can only start
+        after task predecessors[i] finishes
+    num_tasks : int
+        Number of tasks
+
+    Returns
+    -------
+    tuple
+        (indptr, indices, num_predecessors) with the successors of task
+        t in indices[indptr[t]:indptr[t + 1]]
+    """
+    predecessors = np.asarray(dependencies[0], dtype=np.int64)
+    successors = np.asarray(dependencies[1], dtype=np.int64)
+    order = np.argsort(predecessors, kind='stable')
+    indptr = np.zeros(num_tasks + 1, dtype=np.int64)
+    np.cumsum(np.bincount(predecessors, minlength=num_tasks), out=indptr[1:])
+    num_predecessors = np.bincount(successors, minlength=num_tasks)
+    return indptr, successors[order], num_predecessors
+
+
+def simulate(
+        mapping,
+        task_loads,
+        num_resources,
+        arrival_times=None,
+        dependencies=None,
+        resource_speeds=None,
+        work_stealing=False,
+        verbose=False):
+    """Simulates the execution of a mapping over time.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    arrival_times : list or numpy.ndarray of float [default=None]
+        Time at which each task arrives (None for all at time 0)
+    dependencies : tuple of array_like of int [default=None]
+        (predecessors, successors) edges of a directed acyclic graph:
+        task successors[i] can only start after task predecessors[i]
+        finishes
+    resource_speeds : list or numpy.ndarray of float [default=None]
+        Speed of each resource (None for unit speeds). A task takes
+        load / speed time units to execute.
+    work_stealing : bool [default=False]
+        True if idle resources should steal ready tasks from the
+        resource with the most ready tasks
+    verbose : bool [default=False]
+        True if messages should be printed during the simulation
+
+    Returns
+    -------
+    SimulationResult
+        Start time, finish time and executing resource of each task
+
+    Notes
+    -----
+    A task is ready once it has arrived and all its predecessors have
+    finished. Each resource executes its ready tasks in the order they
+    became ready (ties in [lexicographical] order), without preemption.
+    Stolen tasks are taken from the end of the victim's queue (the
+    longest queue, found in a lazy max-heap of queue lengths).
+    Finish events are kept in a min-heap of (time, counter, resource,
+    task). Arrivals are sorted once and merged with the heap, so they
+    never go through it.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Simulation: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+    mapping = np.asarray(mapping, dtype=np.int64).tolist()
+    task_loads = np.asarray(task_loads, dtype=np.float64).tolist()
+    if resource_speeds is None:
+        resource_speeds = [1.0] * num_resources
+    else:
+        resource_speeds = np.asarray(resource_speeds,
+                                     dtype=np.float64).tolist()
+    if arrival_times is None:
+        arrival_times = np.zeros(num_tasks)
+    arrival_times = np.asarray(arrival_times, dtype=np.float64)
+    arrival_order = np.argsort(arrival_times, kind='stable')
+    sorted_arrivals = arrival_times[arrival_order].tolist()
+    arrival_order = arrival_order.tolist()
+    if dependencies is None:
+        successor_indptr = [0] * (num_tasks + 1)
+        successor_indices = []
+        missing = [0] * num_tasks
+    else:
+        successor_indptr, successor_indices, missing = _successors(
+                dependencies, num_tasks)
+        successor_indptr = successor_indptr.tolist()
+        successor_indices = successor_indices.tolist()
+        missing = missing.tolist()
+
+    start_times = [0.0] * num_tasks
+    finish_times = [0.0] * num_tasks
+    executed_on = list(mapping)
+    queues = [collections.deque() for resource in range(num_resources)]
+    idle = [True] * num_resources
+    # Idle resources (a min-heap with outdated entries skipped when popped)
+    idle_heap = list(range(num_resources))
+    # Lengths of the non-empty queues, as a max-heap of (-length,
+    # resource). Entries are pushed whenever a length changes, outdated
+    # entries are skipped when popped, and the heap is rebuilt when it
+    # grows beyond twice the number of resources.
+    queue_heap = []
+    arrived = [False] * num_tasks
+    # Each item in the heap follows the convention
+    # (finish time, resource, task). A resource runs one task at a time,
+    # so ties are broken by the resource with the lowest index.
+    event_heap = []
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    num_steals = 0
+    num_queued = 0
+
+    def start(resource, task, now):
+        finish = now + task_loads[task] / resource_speeds[resource]
+        start_times[task] = now
+        finish_times[task] = finish
+        executed_on[task] = resource
+        idle[resource] = False
+        heappush(event_heap, (finish, resource, task))
+
+    def queue_changed(resource):
+        nonlocal queue_heap
+        length = len(queues[resource])
+        if length:
+            heappush(queue_heap, (-length, resource))
+        if len(queue_heap) > 2 * num_resources:
+            queue_heap = [(-len(queue), victim)
+                          for victim, queue in enumerate(queues) if queue]
+            heapq.heapify(queue_heap)
+
+    def make_ready(task, now):
+        nonlocal num_queued, num_steals
+        resource = mapping[task]
+        if idle[resource]:
+            start(resource, task, now)
+            return
+        if work_stealing:
+            # The idle resource with the lowest index takes the task
+            while idle_heap:
+                thief = heappop(idle_heap)
+                if idle[thief]:
+                    start(thief, task, now)
+                    num_steals += 1
+                    return
+        queues[resource].append(task)
+        num_queued += 1
+        if work_stealing:
+            queue_changed(resource)
+
+    next_arrival = 0
+    while next_arrival < num_tasks or event_heap:
+        # Arrivals up to the next finish event
+        next_finish = event_heap[0][0] if event_heap else np.inf
+        while next_arrival < num_tasks and \
+                sorted_arrivals[next_arrival] <= next_finish:
+            task = arrival_order[next_arrival]
+            arrived[task] = True
+            if missing[task] == 0:
+                make_ready(task, sorted_arrivals[next_arrival])
+            next_arrival += 1
+            if event_heap:
+                next_finish = event_heap[0][0]
+        if not event_heap:
+            continue
+
+        # Finish event
+        now, resource, task = heappop(event_heap)
+        if dependencies is not None:
+            for successor in successor_indices[successor_indptr[task]:
+                                               successor_indptr[task + 1]]:
+                missing[successor] -= 1
+                if missing[successor] == 0 and arrived[successor]:
+                    make_ready(successor, now)
+        queue = queues[resource]
+        if queue:
+            # Same as start(resource, queue.popleft(), now), inlined
+            task = queue.popleft()
+            num_queued -= 1
+            finish = now + task_loads[task] / resource_speeds[resource]
+            start_times[task] = now
+            finish_times[task] = finish
+            heappush(event_heap, (finish, resource, task))
+            if work_stealing:
+                queue_changed(resource)
+        elif work_stealing and num_queued > 0:
+            # Steals from the end of the longest queue
+            length, victim = heappop(queue_heap)
+            while -length != len(queues[victim]):
+                length, victim = heappop(queue_heap)
+            start(resource, queues[victim].pop(), now)
+            queue_changed(victim)
+            num_queued -= 1
+            num_steals += 1
+        else:
+            idle[resource] = True
+            if work_stealing:
+                heappush(idle_heap, resource)
+
+    result = SimulationResult(
+            num_resources,
+            np.array(start_times),
+            np.array(finish_times),
+            np.array(executed_on, dtype=np.int64))
+    if verbose:
+        print(f'- Makespan: {result.makespan}')
+        if work_stealing:
+            print(f'- Number of steals: {num_steals}')
+    return result
+
+
+def _steal_distance(thief, victim, group_sizes):
+    """Returns the lowest level (from 1) at which two resources share a group.
+
+    Parameters
+    ----------
+    thief : int
+        First resource
+    victim : int
+        Second resource
+    group_sizes : list of int
+        Number of resources per group at each distance, from the
+        innermost level (e.g., cores of a socket) to the whole system
+
+    Returns
+    -------
+    int
+        Distance between the resources
+    """
+    for distance, size in enumerate(group_sizes, 1):
+        if thief // size == victim // size:
+            return distance
+    return len(group_sizes)
+
+
+def work_stealing_scheduler(
+        mapping,
+        task_loads,
+        num_resources,
+        victim_selection='random',
+        levels=None,
+        granularity=1,
+        steal_latency=0.0,
+        resource_speeds=None,
+        rng_seed=None,
+        verbose=False):
+    """Dynamic scheduling by work stealing, starting from a static mapping.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Initial mapping of tasks to resources (e.g., from compact or
+        round_robin)
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    victim_selection : string [default='random']
+        'random' chooses victims uniformly among all other resources.
+        'hierarchical' chooses victims in the thief's innermost group
+        first and widens the group after each failed attempt.
+    levels : list of int [default=None]
+        Number of children per level of the resources (e.g., [nodes,
+        sockets, cores]) as in simulator.hierarchical. Required for
+        hierarchical victim selection. None for a flat system.
+    granularity : int or float [default=1]
+        Tasks taken by a successful steal: a number of tasks (int) or a
+        fraction of the victim's queue (float, e.g., 0.5 to steal half)
+    steal_latency : float or list of float [default=0.0]
+        Time taken by a steal attempt. A list gives the latency for each
+        distance between thief and victim, from the innermost level to
+        the whole system (one value per level).
+    resource_speeds : list or numpy.ndarray of float [default=None]
+        Speed of each resource (None for unit speeds)
+    rng_seed : int [default=None]
+        Seed for the random number generator
+    verbose : bool [default=False]
+        True if messages should be printed during scheduling
+
+    Returns
+    -------
+    tuple
+        (mapping, num_steals, makespan) with the resource that executed
+        each task (numpy.ndarray of int32), the number of successful
+        steals of each resource (numpy.ndarray of int64) and the time at
+        which the last task finished
+
+    Notes
+    -----
+    Each resource executes the tasks of its queue in order. A resource
+    with an empty queue becomes a thief: it chooses a victim and, after
+    the steal latency, takes tasks from the end of the victim's queue
+    (the task being executed cannot be stolen). A failed attempt is
+    followed by another one. Thieves stop once no queued tasks remain.
+    Events are kept in a min-heap of (time, resource, victim), with
+    victim -1 for the end of a task.
+    """
+    num_tasks = len(task_loads)
+    if verbose:
+        print(f'Work Stealing: starting with {num_tasks} tasks' +
+              f' and {num_resources} resources.')
+        if rng_seed is not None:
+            print(f'- RNG seed is {rng_seed}.')
+    if victim_selection not in ('random', 'hierarchical'):
+        raise ValueError(f'Unknown victim selection: {victim_selection}')
+    if levels is None:
+        if victim_selection == 'hierarchical':
+            raise ValueError('Hierarchical victim selection needs levels')
+        levels = [num_resources]
+    # Resources per group, from the innermost level to the whole system
+    group_sizes = [int(np.prod(levels[level:]))
+                   for level in range(len(levels) - 1, -1, -1)]
+    if isinstance(steal_latency, (int, float)):
+        steal_latency = [steal_latency] * len(group_sizes)
+    steal_latency = list(steal_latency)
+    if resource_speeds is None:
+        resource_speeds = [1.0] * num_resources
+    else:
+        resource_speeds = np.asarray(resource_speeds,
+                                     dtype=np.float64).tolist()
+    task_loads = np.asarray(task_loads, dtype=np.float64).tolist()
+    mapping = np.asarray(mapping, dtype=np.int64)
+    rng = random.Random(rng_seed)
+
+    queues = [collections.deque(tasks.tolist()) for tasks in
+              np.split(np.argsort(mapping, kind='stable'),
+                       np.cumsum(np.bincount(mapping,
+                                             minlength=num_resources))[:-1])]
+    num_queued = num_tasks
+    executed_on = mapping.tolist()
+    num_steals = [0] * num_resources
+    # Distance at which each thief looks for its next victim
+    distances = [1] * num_resources
+    finish_times = [0.0] * num_resources
+    # Each item in the heap follows the convention (time, resource, victim)
+    event_heap = [(0.0, resource, -1) for resource in range(num_resources)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    while event_heap:
+        now, resource, victim = heappop(event_heap)
+        queue = queues[resource]
+        if victim >= 0:
+            # Steal attempt reaches the victim
+            victim_queue = queues[victim]
+            if victim_queue:
+                if isinstance(granularity, float):
+                    amount = max(1, int(len(victim_queue) * granularity))
+                else:
+                    amount = min(granularity, len(victim_queue))
+                stolen = [victim_queue.pop() for _ in range(amount)]
+                queue.extend(reversed(stolen))
+                num_steals[resource] += 1
+                distances[resource] = 1
+            elif victim_selection == 'hierarchical':
+                distances[resource] = min(distances[resource] + 1,
+                                          len(group_sizes))
+        if queue:
+            # Runs the next task
+            task = queue.popleft()
+            num_queued -= 1
+            executed_on[task] = resource
+            finish = now + task_loads[task] / resource_speeds[resource]
+            finish_times[resource] = finish
+            heappush(event_heap, (finish, resource, -1))
+        elif num_queued > 0 and num_resources > 1:
+            # Chooses a victim among the other resources of its group
+            if victim_selection == 'random':
+                distance = len(group_sizes)
+            else:
+                distance = distances[resource]
+                while group_sizes[distance - 1] == 1:
+                    distance += 1
+            size = group_sizes[distance - 1]
+            first = resource - resource % size
+            victim = first + rng.randrange(size - 1)
+            if victim >= resource:
+                victim += 1
+            if victim_selection == 'random':
+                distance = _steal_distance(resource, victim, group_sizes)
+            heappush(event_heap,
+                     (now + steal_latency[distance - 1], resource, victim))
+
+    makespan = max(finish_times) if num_resources > 0 else 0.0
+    if verbose:
+        print(f'- Makespan: {makespan}')
+        print(f'- Number of steals: {sum(num_steals)}')
+    return (np.array(executed_on, dtype=np.int32),
+            np.array(num_steals, dtype=np.int64), makespan)
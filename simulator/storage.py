@@ -0,0 +1,190 @@
+"""Module containing a binary file format for large instances.
+
+Task loads, resource speeds and mappings can be stored in files and
+opened as numpy.memmap arrays, so instances larger than the memory
+(e.g., 10^9 tasks) are read from disk on demand. Memory maps are NumPy
+arrays: they can be given directly to the functions in
+simulator.support and simulator.schedulers_np without being copied.
+
+File format (little-endian):
+    - header of 64 bytes:
+        - magic string (8 bytes): b'LBARRAY\\x00'
+        - format version (uint32)
+        - kind of array (16 bytes of ASCII): 'loads', 'speeds' or 'mapping'
+        - NumPy data type (8 bytes of ASCII), e.g., '<f8' or '<i4'
+        - number of values (uint64)
+        - padding (zeros)
+    - values, stored contiguously after the header.
+
+Example
+-------
+>>> import simulator.storage as storage
+>>> import simulator.schedulers_np as schedulers_np
+>>> import simulator.support as support
+>>> loads = storage.create_array('loads.bin', 10**9, 'loads', 'float32')
+>>> # ... fill 'loads' in chunks, then loads.flush()
+>>> mapping = storage.create_array('mapping.bin', 10**9, 'mapping')
+>>> schedulers_np.round_robin(10**9, 1000, out=mapping)
+>>> metrics = support.compute_metrics(mapping, loads, 1000)
+"""
+
+import os           # for file sizes
+import struct       # for the header
+import numpy as np  # for arrays
+
+MAGIC = b'LBARRAY\x00'
+VERSION = 1
+HEADER_SIZE = 64
+# Kinds of arrays and their default data types
+KINDS = {'loads': np.float64, 'speeds': np.float64, 'mapping': np.int32}
+
+_HEADER = struct.Struct('<8sI16s8sQ')
+
+
+def _encode_header(kind, dtype, length):
+    """Returns the header of a file as bytes."""
+    header = _HEADER.pack(MAGIC, VERSION, kind.encode('ascii'),
+                          dtype.str.encode('ascii'), length)
+    return header.ljust(HEADER_SIZE, b'\x00')
+
+
+def _check_dtype(kind, dtype):
+    """Returns the little-endian data type of a kind of array.
+
+    Raises
+    ------
+    ValueError
+        If the kind is unknown or the data type is not numeric
+    """
+    if kind not in KINDS:
+        raise ValueError(f'Unknown kind of array: {kind}')
+    if dtype is None:
+        dtype = KINDS[kind]
+    dtype = np.dtype(dtype)
+    if dtype.kind not in 'iuf':
+        raise ValueError(f'Unsupported data type: {dtype}')
+    return dtype.newbyteorder('<')
+
+
+def read_header(filename):
+    """Reads the header of an array file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the file
+
+    Returns
+    -------
+    dict
+        'version', 'kind', 'dtype' (numpy.dtype) and 'length' of the
+        array
+
+    Raises
+    ------
+    ValueError
+        If the file is not an array file or its size does not match
+        its header
+    """
+    with open(filename, 'rb') as array_file:
+        data = array_file.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+        raise ValueError(f'Not an array file: {filename}')
+    magic, version, kind, dtype, length = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f'Unsupported format version: {version}')
+    header = {'version': version,
+              'kind': kind.rstrip(b'\x00').decode('ascii'),
+              'dtype': np.dtype(dtype.rstrip(b'\x00').decode('ascii')),
+              'length': length}
+    expected_size = HEADER_SIZE + length * header['dtype'].itemsize
+    if os.path.getsize(filename) != expected_size:
+        raise ValueError(f'Truncated or corrupted array file: {filename}')
+    return header
+
+
+def create_array(filename, length, kind, dtype=None):
+    """Creates an array file and opens it for writing.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the file (overwritten if it exists)
+    length : int
+        Number of values
+    kind : string
+        'loads', 'speeds' or 'mapping'
+    dtype : numpy data type [default=None]
+        Type of the values (None for float64 loads and speeds and int32
+        mappings)
+
+    Returns
+    -------
+    numpy.memmap
+        Writable array filled with zeros. Call flush() to make sure
+        the values are written to the file.
+    """
+    dtype = _check_dtype(kind, dtype)
+    with open(filename, 'wb') as array_file:
+        array_file.write(_encode_header(kind, dtype, length))
+        # Reserves the space for the values (sparse file)
+        array_file.truncate(HEADER_SIZE + length * dtype.itemsize)
+    return open_array(filename, 'r+')
+
+
+def write_array(filename, values, kind, dtype=None):
+    """Writes an array of values to a file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the file (overwritten if it exists)
+    values : list or numpy.ndarray of int or float
+        Values to store
+    kind : string
+        'loads', 'speeds' or 'mapping'
+    dtype : numpy data type [default=None]
+        Type of the values (None to keep the type of a NumPy array, or
+        the default type of the kind for lists)
+    """
+    if dtype is None and isinstance(values, np.ndarray):
+        dtype = values.dtype
+    dtype = _check_dtype(kind, dtype)
+    values = np.asarray(values, dtype=dtype)
+    with open(filename, 'wb') as array_file:
+        array_file.write(_encode_header(kind, dtype, len(values)))
+        values.tofile(array_file)
+
+
+def open_array(filename, mode='r', kind=None):
+    """Opens an array file as a memory map.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the file
+    mode : string [default='r']
+        'r' for read-only, 'r+' for reading and writing, 'c' for
+        copy-on-write (changes are not written to the file)
+    kind : string [default=None]
+        Expected kind of array (None accepts any kind)
+
+    Returns
+    -------
+    numpy.memmap
+        Array backed by the file
+
+    Raises
+    ------
+    ValueError
+        If the file is invalid or holds another kind of array
+    """
+    header = read_header(filename)
+    if kind is not None and header['kind'] != kind:
+        raise ValueError(f'Expected {kind}, found {header["kind"]}' +
+                         f' in {filename}')
+    if header['length'] == 0:
+        # Empty memory maps are not supported by NumPy
+        return np.zeros(0, dtype=header['dtype'])
+    return np.memmap(filename, dtype=header['dtype'], mode=mode,
+                     offset=HEADER_SIZE, shape=(header['length'],))
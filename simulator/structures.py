@@ -0,0 +1,395 @@
+"""Module containing compact containers for workloads and mappings.
+
+Workload and Mapping store task loads and resources in typed NumPy
+arrays instead of lists of Python numbers: a mapping of 10^7 tasks
+takes 40 MB instead of hundreds of MB. Both classes can be given to
+every function in simulator.schedulers and simulator.support, as they
+behave like sequences (len, indexing, iteration, tolist) and like
+arrays (numpy.asarray returns their data without copying it).
+
+Derived data (e.g., the total load, the decreasing load order, the
+number of tasks and the load of each resource) is computed on first
+use and cached. Changing a value (item assignment, append, extend)
+invalidates the cache. The arrays returned by the 'loads' and
+'resources' properties are read-only, and arrays wrapped without a
+copy become read-only, so the cache cannot become outdated without
+the containers noticing. Containers copy read-only data before their
+first change (copy-on-write).
+
+Example
+-------
+>>> from simulator.structures import Workload, Mapping
+>>> import simulator.schedulers as schedulers
+>>> import simulator.support as support
+>>> workload = Workload(support.generate_uniform_loads(10**6))
+>>> mapping = Mapping(schedulers.lpt(workload, 100), 100)
+>>> mapping.resource_loads(workload)
+"""
+
+import numpy as np  # for arrays
+
+
+def _read_only(array):
+    """Returns a read-only view of an array."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _wrap(array, copy):
+    """Returns a one-dimensional array to be stored in a container.
+
+    Arrays used without a copy become read-only, so they cannot change
+    without the container noticing.
+    """
+    if not copy:
+        array.flags.writeable = False
+    return array.reshape(-1)
+
+
+def _writable(array):
+    """Returns an array, copied if it is read-only."""
+    if not array.flags.writeable:
+        return array.copy()
+    return array
+
+
+def _grow(array, size, new_size):
+    """Returns an array with room for at least new_size values.
+
+    The capacity doubles when it is exceeded, so appending n values one
+    at a time costs O(n) copies in total.
+    """
+    if new_size <= len(array):
+        return array
+    grown = np.zeros(max(new_size, 2 * len(array)), dtype=array.dtype)
+    grown[:size] = array[:size]
+    return grown
+
+
+class Workload:
+    """Loads of a set of tasks stored in a typed array.
+
+    Parameters
+    ----------
+    task_loads : iterable of int or float [default=()]
+        Load of the tasks (a list, a NumPy array or another Workload)
+    dtype : numpy data type [default=None]
+        Type of the loads (None to keep the type of NumPy arrays of
+        integers or floats, and int64 or float64 otherwise). Smaller
+        types (e.g., 'uint32' or 'float32') save memory.
+    copy : bool [default=True]
+        False to use a NumPy array of the right type without copying it.
+        The array becomes read-only, and the workload copies it before
+        its first change.
+
+    Attributes
+    ----------
+    loads : numpy.ndarray
+        Read-only view of the loads
+    """
+
+    __slots__ = ('_loads', '_size', '_version', '_cache')
+
+    def __init__(self, task_loads=(), dtype=None, copy=True):
+        loads = np.asarray(task_loads)
+        if dtype is None:
+            if loads.dtype.kind in 'iuf':
+                dtype = loads.dtype
+            else:
+                dtype = np.float64
+        self._loads = _wrap(np.array(loads, dtype=dtype, copy=copy), copy)
+        self._size = len(self._loads)
+        self._version = 0
+        self._cache = {}
+
+    def __repr__(self):
+        return (f'Workload(num_tasks={self._size}, ' +
+                f'dtype={self._loads.dtype})')
+
+    def _changed(self):
+        """Invalidates the cache after a mutation."""
+        self._version += 1
+        self._cache.clear()
+
+    @property
+    def loads(self):
+        return _read_only(self._loads[:self._size])
+
+    @property
+    def dtype(self):
+        return self._loads.dtype
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the loads."""
+        return self._size * self._loads.itemsize
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        values = self.loads[index]
+        if np.ndim(values) == 0:
+            return values.item()
+        return _read_only(values)
+
+    def __setitem__(self, index, value):
+        self._loads = _writable(self._loads)
+        self._loads[:self._size][index] = value
+        self._changed()
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.loads
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
+        if copy:
+            array = array.copy()
+        return array
+
+    def tolist(self):
+        """Returns the loads as a list of Python numbers."""
+        return self._loads[:self._size].tolist()
+
+    def append(self, load):
+        """Adds one task at the end of the workload."""
+        self._loads = _grow(self._loads, self._size, self._size + 1)
+        self._loads[self._size] = load
+        self._size += 1
+        self._changed()
+
+    def extend(self, task_loads):
+        """Adds tasks at the end of the workload."""
+        task_loads = np.asarray(task_loads).reshape(-1)
+        new_size = self._size + len(task_loads)
+        self._loads = _grow(self._loads, self._size, new_size)
+        self._loads[self._size:new_size] = task_loads
+        self._size = new_size
+        self._changed()
+
+    @property
+    def total_load(self):
+        """Sum of the loads of all tasks (cached)."""
+        if 'total_load' not in self._cache:
+            self._cache['total_load'] = self.loads.sum().item()
+        return self._cache['total_load']
+
+    @property
+    def max_load(self):
+        """Largest load of a task (cached, 0 without tasks)."""
+        if 'max_load' not in self._cache:
+            loads = self.loads
+            self._cache['max_load'] = loads.max().item() if len(loads) else 0
+        return self._cache['max_load']
+
+    def sorted_order(self):
+        """Returns the tasks sorted by decreasing load (cached).
+
+        Returns
+        -------
+        numpy.ndarray of int64
+            Read-only array of task identifiers, in the same order as
+            schedulers.decreasing_load_order
+        """
+        if 'sorted_order' not in self._cache:
+            order = np.argsort(self.loads[::-1], kind='stable')
+            self._cache['sorted_order'] = _read_only(
+                    (self._size - 1 - order)[::-1])
+        return self._cache['sorted_order']
+
+
+class Mapping:
+    """Mapping of tasks to resources stored in an int32 array.
+
+    Parameters
+    ----------
+    mapping : iterable of int [default=()]
+        Resource of each task (a list, a NumPy array or another Mapping)
+    num_resources : int [default=None]
+        Number of resources (None for the largest resource plus one)
+    copy : bool [default=True]
+        False to use an int32 NumPy array (e.g., from
+        simulator.schedulers_np) without copying it. The array becomes
+        read-only, and the mapping copies it before its first change.
+
+    Attributes
+    ----------
+    resources : numpy.ndarray of int32
+        Read-only view of the resource of each task
+    num_resources : int
+        Number of resources
+
+    Raises
+    ------
+    ValueError
+        If a resource is outside [0, num_resources)
+    """
+
+    __slots__ = ('_resources', '_size', '_version', '_cache',
+                 'num_resources')
+
+    def __init__(self, mapping=(), num_resources=None, copy=True):
+        resources = _wrap(np.array(mapping, dtype=np.int32, copy=copy),
+                          copy)
+        if num_resources is None:
+            num_resources = int(resources.max()) + 1 if len(resources) else 0
+        self.num_resources = num_resources
+        self._check(resources)
+        self._resources = resources
+        self._size = len(resources)
+        self._version = 0
+        self._cache = {}
+
+    def __repr__(self):
+        return (f'Mapping(num_tasks={self._size}, ' +
+                f'num_resources={self.num_resources})')
+
+    def _check(self, resources):
+        """Checks that all resources are valid."""
+        resources = np.asarray(resources)
+        if resources.size > 0 and (resources.min() < 0 or
+                                   resources.max() >= self.num_resources):
+            raise ValueError('Resources must be between 0 and ' +
+                             f'{self.num_resources - 1}')
+
+    def _changed(self):
+        """Invalidates the cache after a mutation."""
+        self._version += 1
+        self._cache.clear()
+
+    @property
+    def resources(self):
+        return _read_only(self._resources[:self._size])
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the mapping."""
+        return self._size * self._resources.itemsize
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        values = self.resources[index]
+        if np.ndim(values) == 0:
+            return values.item()
+        return _read_only(values)
+
+    def __setitem__(self, index, resource):
+        self._check(resource)
+        self._resources = _writable(self._resources)
+        self._resources[:self._size][index] = resource
+        self._changed()
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.resources
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
+        if copy:
+            array = array.copy()
+        return array
+
+    def tolist(self):
+        """Returns the mapping as a list of Python ints."""
+        return self._resources[:self._size].tolist()
+
+    def append(self, resource):
+        """Maps one more task (at the end of the mapping)."""
+        self._check(resource)
+        self._resources = _grow(self._resources, self._size, self._size + 1)
+        self._resources[self._size] = resource
+        self._size += 1
+        self._changed()
+
+    def extend(self, mapping):
+        """Maps more tasks (at the end of the mapping)."""
+        mapping = np.asarray(mapping).reshape(-1)
+        self._check(mapping)
+        new_size = self._size + len(mapping)
+        self._resources = _grow(self._resources, self._size, new_size)
+        self._resources[self._size:new_size] = mapping
+        self._size = new_size
+        self._changed()
+
+    def task_counts(self):
+        """Returns the number of tasks mapped to each resource (cached).
+
+        Returns
+        -------
+        numpy.ndarray of int64
+            Read-only array with the number of tasks of each resource
+        """
+        if 'task_counts' not in self._cache:
+            self._cache['task_counts'] = _read_only(np.bincount(
+                    self.resources, minlength=self.num_resources))
+        return self._cache['task_counts']
+
+    def tasks_of(self, resource):
+        """Returns the tasks mapped to a resource.
+
+        Parameters
+        ----------
+        resource : int
+            Resource identifier
+
+        Returns
+        -------
+        numpy.ndarray of int64
+            Read-only array of task identifiers in increasing order
+
+        Notes
+        -----
+        The tasks of all resources are grouped by a single stable sort
+        on first use, so later calls only slice the cached order.
+        """
+        if 'task_order' not in self._cache:
+            self._cache['task_order'] = _read_only(
+                    np.argsort(self.resources, kind='stable'))
+            self._cache['offsets'] = np.concatenate(
+                    [[0], np.cumsum(self.task_counts())])
+        offsets = self._cache['offsets']
+        return self._cache['task_order'][offsets[resource]:
+                                         offsets[resource + 1]]
+
+    def resource_loads(self, task_loads):
+        """Returns the load of each resource.
+
+        Parameters
+        ----------
+        task_loads : Workload, list or numpy.ndarray of int or float
+            Load of the tasks
+
+        Returns
+        -------
+        numpy.ndarray
+            Read-only array with the load of each resource (int64 for
+            integer loads, float64 otherwise)
+
+        Notes
+        -----
+        Loads of a Workload are cached until either the mapping or the
+        workload changes. Other loads are computed at each call.
+        """
+        cached = self._cache.get('resource_loads')
+        if (cached is not None and cached[0] is task_loads and
+                cached[1] == task_loads._version):
+            return cached[2]
+        loads = np.asarray(task_loads)
+        if len(loads) != self._size:
+            raise ValueError(f'Expected {self._size} task loads, ' +
+                             f'received {len(loads)}')
+        resource_loads = np.bincount(self.resources, weights=loads,
+                                     minlength=self.num_resources)
+        if np.issubdtype(loads.dtype, np.integer):
+            resource_loads = np.rint(resource_loads).astype(np.int64)
+        resource_loads = _read_only(resource_loads)
+        if isinstance(task_loads, Workload):
+            self._cache['resource_loads'] = (task_loads, task_loads._version,
+                                             resource_loads)
+        return resource_loads
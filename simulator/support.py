@@ -1,15 +1,24 @@
 """Module containing supporting classes and methods for the simulator."""
 
-import random                    # for random numbers
-import statistics                # for metrics
-import matplotlib.pyplot as plt  # for plotting
+import random       # for random numbers
+import numpy as np  # for metrics
+
+import simulator.schedulers as schedulers    # for optimal makespans
+from simulator.rng import integers           # for vectorized random draws
+from simulator.instrumentation import phase  # for instrumented phases
+from simulator.structures import Mapping     # for cached resource loads
+
+# Number of tasks processed at a time when computing resource loads
+_CHUNK_SIZE = 1 << 22
 
 
 def generate_uniform_loads(
         size=10,
         low=1,
         high=10,
-        rng_seed=None):
+        rng_seed=None,
+        rng=None,
+        as_array=False):
     """Returns a list of loads from a uniform distribution.
 
     Parameters
@@ -22,34 +31,426 @@ def generate_uniform_loads(
         Upper boundary of the load interval.
     rng_seed : int [default=None]
         Random number generator seed.
+    rng : random.Random or numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one seeded
+        with 'rng_seed'.
+    as_array : bool [default=False]
+        True if the loads should be returned as a NumPy array.
 
     Returns
     -------
-    list of int
+    list of int or numpy.ndarray of int64
         List of loads of length 'size'
+
+    Notes
+    -----
+    All loads are drawn in a single vectorized call.
+    For the same seed, the loads are the same as the ones from
+    random.seed(rng_seed) followed by 'size' calls to
+    random.randrange(low, high). The global random number generator is
+    not used, so concurrent calls do not interfere with each other.
+    """
+    if rng is None:
+        rng = random.Random(rng_seed)
+    loads = integers(rng, low, high, size)
+    if as_array:
+        return loads
+    return loads.tolist()
+
+
+class MappingMetrics:
+    """Statistics of a task mapping.
+
+    Attributes
+    ----------
+    num_tasks : int
+        Number of tasks
+    num_resources : int
+        Number of resources
+    resource_loads : numpy.ndarray
+        Load of the resources
+    tasks_per_resource : numpy.ndarray of int64
+        Number of tasks mapped to each resource
+    average : float
+        Average resource load
+    median : float
+        Median resource load
+    makespan : int or float
+        Maximum resource load
+    minimum : int or float
+        Minimum resource load
+    stdev : float
+        Load standard deviation (sample standard deviation)
+    imbalance : float
+        Load imbalance (maximum/average - 1)
+    """
+
+    __slots__ = ('num_tasks', 'num_resources', 'resource_loads',
+                 'tasks_per_resource', 'average', 'median', 'makespan',
+                 'minimum', 'stdev', 'imbalance')
+
+    def __init__(
+            self,
+            num_tasks,
+            num_resources,
+            resource_loads,
+            tasks_per_resource,
+            average,
+            median,
+            makespan,
+            minimum,
+            stdev,
+            imbalance):
+        self.num_tasks = num_tasks
+        self.num_resources = num_resources
+        self.resource_loads = resource_loads
+        self.tasks_per_resource = tasks_per_resource
+        self.average = average
+        self.median = median
+        self.makespan = makespan
+        self.minimum = minimum
+        self.stdev = stdev
+        self.imbalance = imbalance
+
+    def __repr__(self):
+        return (f'MappingMetrics(num_tasks={self.num_tasks}, ' +
+                f'num_resources={self.num_resources}, ' +
+                f'makespan={self.makespan}, ' +
+                f'imbalance={self.imbalance})')
+
+    def report(self, max_items=10):
+        """Returns a text report of the metrics.
+
+        Parameters
+        ----------
+        max_items : int [default=10]
+            Maximum number of values shown for each per-resource list
+
+        Returns
+        -------
+        str
+            Multi-line report
+        """
+        lines = [
+            f'- Number of tasks: {self.num_tasks}',
+            f'- Number of resources: {self.num_resources}',
+            '- Tasks per resource: ' +
+            summarize(self.tasks_per_resource, max_items),
+            '- Resources\' load: ' +
+            summarize(self.resource_loads, max_items),
+            '* Metrics *',
+            f'- Average resource load: {self.average}',
+            f'- Median resource load: {self.median}',
+            f'- Maximum resource load: {self.makespan}',
+            f'- Minimum resource load: {self.minimum}',
+            f'- Load standard deviation: {self.stdev}',
+            f'- Load imbalance: {self.imbalance}']
+        return '\n'.join(lines)
+
+
+def summarize(values, max_items=10):
+    """Returns a short text representation of a sequence of values.
+
+    Parameters
+    ----------
+    values : list or numpy.ndarray
+        Values to represent
+    max_items : int [default=10]
+        Maximum number of values shown
+
+    Returns
+    -------
+    str
+        All values if there are at most 'max_items' of them, or the
+        first and last values and the total length otherwise
+    """
+    num_values = len(values)
+    if num_values <= max_items:
+        return str(np.asarray(values).tolist())
+    head = np.asarray(values[:(max_items + 1) // 2]).tolist()
+    tail = np.asarray(values[num_values - max_items // 2:]).tolist()
+    return (str(head)[:-1] + ', ..., ' + str(tail)[1:] +
+            f' ({num_values} values)')
+
+
+def _resource_totals(mapping, task_loads, num_resources):
+    """Computes the load and the number of tasks of each resource.
+
+    Parameters
+    ----------
+    mapping : numpy.ndarray of int
+        Mapping of tasks to resources
+    task_loads : numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (resource_loads, tasks_per_resource)
+
+    Notes
+    -----
+    Tasks are processed in chunks, so memory maps are read sequentially
+    and temporary arrays (e.g., loads converted to float64 by bincount)
+    stay small for any number of tasks.
+    """
+    integer_loads = np.issubdtype(task_loads.dtype, np.integer)
+    resource_loads = np.zeros(num_resources,
+                              dtype=np.int64 if integer_loads else np.float64)
+    tasks_per_resource = np.zeros(num_resources, dtype=np.int64)
+    for start in range(0, len(task_loads), _CHUNK_SIZE):
+        stop = start + _CHUNK_SIZE
+        chunk = mapping[start:stop]
+        chunk_loads = np.bincount(chunk, weights=task_loads[start:stop],
+                                  minlength=num_resources)
+        if integer_loads:
+            chunk_loads = np.rint(chunk_loads).astype(np.int64)
+        resource_loads += chunk_loads
+        tasks_per_resource += np.bincount(chunk, minlength=num_resources)
+    return resource_loads, tasks_per_resource
+
+
+def compute_metrics(
+        mapping,
+        task_loads,
+        num_resources):
+    """Computes the statistics of a task mapping.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+
+    Returns
+    -------
+    MappingMetrics
+        Statistics of the mapping
+
+    Notes
+    -----
+    Resource loads and task counts are computed with numpy.bincount.
+    Integer task loads result in integer resource loads.
+    Arrays (including memory maps from simulator.storage) are used
+    without being copied. The resource loads and task counts of a
+    structures.Mapping are cached, so they are computed only once for
+    the same mapping and Workload.
+    """
+    num_tasks = len(task_loads)
+    # Computes the load per resource (and the number of tasks per resource)
+    if (isinstance(mapping, Mapping) and
+            mapping.num_resources == num_resources):
+        resource_loads = mapping.resource_loads(task_loads).copy()
+        tasks_per_resource = mapping.task_counts().copy()
+    else:
+        resource_loads, tasks_per_resource = _resource_totals(
+                np.asarray(mapping), np.asarray(task_loads), num_resources)
+
+    # Computes metrics
+    avg_load = float(resource_loads.mean())
+    max_load = resource_loads.max().item()
+    if num_resources > 1:
+        stdev_load = float(resource_loads.std(ddof=1))
+    else:
+        stdev_load = 0.0
+    if avg_load > 0:
+        load_imbalance = max_load/avg_load - 1
+    else:
+        load_imbalance = 0.0
+
+    return MappingMetrics(
+            num_tasks,
+            num_resources,
+            resource_loads,
+            tasks_per_resource,
+            avg_load,
+            float(np.median(resource_loads)),
+            max_load,
+            resource_loads.min().item(),
+            stdev_load,
+            load_imbalance)
+
+
+def compute_batch_metrics(
+        mappings,
+        task_loads,
+        num_resources):
+    """Computes the statistics of a batch of task mappings.
+
+    Parameters
+    ----------
+    mappings : array_like of int
+        Mapping of tasks to resources of each instance (instances x tasks)
+    task_loads : array_like of int or float
+        Load of the tasks of each instance (instances x tasks)
+    num_resources : int or array_like of int
+        Number of resources (shared or per instance)
+
+    Returns
+    -------
+    MappingMetrics
+        Statistics of the mappings, with one entry per instance in each
+        metric. 'resource_loads' and 'tasks_per_resource' are matrices
+        (instances x resources) padded with zeros for instances with
+        fewer resources.
+
+    Notes
+    -----
+    All instances are evaluated by a single numpy.bincount call: the
+    resources of instance i are shifted by i times the maximum number
+    of resources.
     """
-    random.seed(rng_seed)
-    loads = [random.randrange(low, high) for i in range(size)]
-    return loads
+    mappings = np.asarray(mappings)
+    task_loads = np.asarray(task_loads)
+    num_instances, num_tasks = task_loads.shape
+    num_resources = np.broadcast_to(
+            np.asarray(num_resources, dtype=np.int64), (num_instances,))
+    max_resources = int(num_resources.max())
+    num_bins = num_instances * max_resources
+
+    # Computes the load per resource (and the number of tasks per resource)
+    offsets = np.arange(num_instances, dtype=np.int64) * max_resources
+    bins = (mappings + offsets[:, np.newaxis]).ravel()
+    resource_loads = np.bincount(bins, weights=task_loads.ravel(),
+                                 minlength=num_bins)
+    resource_loads = resource_loads.reshape(num_instances, max_resources)
+    tasks_per_resource = np.bincount(bins, minlength=num_bins).reshape(
+            num_instances, max_resources)
+
+    # Computes metrics ignoring padded resources
+    padding = np.arange(max_resources) >= num_resources[:, np.newaxis]
+    padded_loads = np.where(padding, np.nan, resource_loads)
+    avg_load = np.nanmean(padded_loads, axis=1)
+    max_load = np.nanmax(padded_loads, axis=1)
+    squared_deviations = np.nansum(
+            (padded_loads - avg_load[:, np.newaxis])**2, axis=1)
+    stdev_load = np.sqrt(squared_deviations /
+                         np.maximum(num_resources - 1, 1))
+    safe_avg = np.where(avg_load > 0, avg_load, 1.0)
+    load_imbalance = np.where(avg_load > 0, max_load/safe_avg - 1, 0.0)
+    if np.issubdtype(task_loads.dtype, np.integer):
+        resource_loads = np.rint(resource_loads).astype(np.int64)
+
+    return MappingMetrics(
+            num_tasks,
+            num_resources,
+            resource_loads,
+            tasks_per_resource,
+            avg_load,
+            np.nanmedian(padded_loads, axis=1),
+            max_load,
+            np.nanmin(padded_loads, axis=1),
+            stdev_load,
+            load_imbalance)
+
+
+def compute_level_metrics(
+        mapping,
+        task_loads,
+        levels):
+    """Computes the statistics of a mapping at each level of a hierarchy.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources (leaves of the hierarchy)
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    levels : list of int
+        Number of children per level (e.g., [nodes, sockets, cores])
+
+    Returns
+    -------
+    list of MappingMetrics
+        Statistics of the mapping of tasks to the groups of each level
+        (e.g., to nodes, to sockets and to cores)
+
+    Notes
+    -----
+    The group of a resource at level k is the resource divided by the
+    number of leaves under each group of that level.
+    """
+    mapping = np.asarray(mapping)
+    level_metrics = []
+    for level in range(len(levels)):
+        num_groups = int(np.prod(levels[:level + 1]))
+        leaves_per_group = int(np.prod(levels[level + 1:]))
+        level_metrics.append(compute_metrics(
+                mapping // leaves_per_group, task_loads, num_groups))
+    return level_metrics
+
+
+def compute_communication(
+        mapping,
+        graph,
+        num_resources):
+    """Computes the communication between resources caused by a mapping.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources
+    graph : graphs.TaskGraph
+        Communication between tasks
+    num_resources : int
+        Number of resources
+
+    Returns
+    -------
+    tuple
+        (edge_cut, resource_volumes) where edge_cut is the total weight
+        of the edges between tasks on different resources and
+        resource_volumes (numpy.ndarray) is the weight of such edges
+        for each resource
+
+    Notes
+    -----
+    Vectorized over all edges of the graph. Each cut edge counts once
+    in the edge cut and once in the volume of each of its resources.
+    """
+    mapping = np.asarray(mapping)
+    source_resources = mapping[graph.edge_sources()]
+    cut = source_resources != mapping[graph.indices]
+    cut_weights = graph.weights[cut]
+    resource_volumes = np.bincount(source_resources[cut],
+                                   weights=cut_weights,
+                                   minlength=num_resources)
+    edge_cut = cut_weights.sum().item() / 2
+    if np.issubdtype(graph.weights.dtype, np.integer):
+        resource_volumes = np.rint(resource_volumes).astype(np.int64)
+        edge_cut = int(edge_cut)
+    return edge_cut, resource_volumes
 
 
 def evaluate_mapping(
         mapping,
         task_loads,
         num_resources,
-        verbose=True):
+        verbose=True,
+        max_items=10,
+        instrumentation=None):
     """Provides basic statistics from a task mapping.
 
     Parameters
     ----------
-    mapping : list of int
+    mapping : list or numpy.ndarray of int
         Mapping of tasks to resources
-    task_loads : list of int or float
+    task_loads : list or numpy.ndarray of int or float
         Load of the tasks
     num_resources : int
         Number of resources
     verbose : bool [default=True]
         True if messages should be printed
+    max_items : int [default=10]
+        Maximum number of values printed for each list
+    instrumentation : Instrumentation [default=None]
+        Collector of the time spent in the 'evaluate' phase (see
+        simulator.instrumentation). None disables it.
 
     Returns
     -------
@@ -65,44 +466,63 @@ def evaluate_mapping(
     - minimum resource load
     - load standard deviation
     - load imbalance (maximum/average - 1)
+
+    Use compute_metrics to get all metrics without printing them.
     """
-    # Number of tasks
-    num_tasks = len(task_loads)
-    # Computes the load per resource (and the number of tasks per resource)
-    resource_loads = [0] * num_resources
-    tasks_per_resource = [0] * num_resources
-    for task in range(num_tasks):
-        resource = mapping[task]
-        resource_loads[resource] += task_loads[task]
-        tasks_per_resource[resource] += 1
+    with phase(instrumentation, 'evaluate'):
+        metrics = compute_metrics(mapping, task_loads, num_resources)
 
     # Prints information if verbose
     if verbose:
-        # Computes metrics
-        avg_load = statistics.mean(resource_loads)
-        median_load = statistics.median(resource_loads)
-        max_load = max(resource_loads)
-        min_load = min(resource_loads)
-        stdev_load = statistics.stdev(resource_loads)
-        load_imbalance = max_load/avg_load - 1
-        # Prints metrics
         print('** Mapping report **')
-        print(f'- Number of tasks: {num_tasks}')
-        print(f'- Number of resources: {num_resources}')
-        print(f'- Task loads: {task_loads}')
-        print(f'- Task mapping: {mapping}')
-        print(f'- Tasks per resource: {tasks_per_resource}')
-        print(f'- Resources\' load: {resource_loads}')
-        print(f'* Metrics *')
-        print(f'- Average resource load: {avg_load}')
-        print(f'- Median resource load: {median_load}')
-        print(f'- Maximum resource load: {max_load}')
-        print(f'- Minimum resource load: {min_load}')
-        print(f'- Load standard deviation: {stdev_load}')
-        print(f'- Load imbalance: {load_imbalance}')
+        print(f'- Task loads: {summarize(task_loads, max_items)}')
+        print(f'- Task mapping: {summarize(mapping, max_items)}')
+        print(metrics.report(max_items))
         print('** End of report **')
 
-    return resource_loads
+    return metrics.resource_loads.tolist()
+
+
+def approximation_ratio(
+        mapping,
+        task_loads,
+        num_resources,
+        optimal_makespan=None,
+        time_limit=1.0):
+    """Returns the ratio between the makespan of a mapping and the optimal.
+
+    Parameters
+    ----------
+    mapping : list or numpy.ndarray of int
+        Mapping of tasks to resources
+    task_loads : list or numpy.ndarray of int or float
+        Load of the tasks
+    num_resources : int
+        Number of resources
+    optimal_makespan : int or float [default=None]
+        Optimal makespan, or None to compute it with
+        schedulers.branch_and_bound
+    time_limit : float [default=1.0]
+        Maximum search time of schedulers.branch_and_bound
+
+    Returns
+    -------
+    float
+        Makespan of the mapping divided by the optimal makespan
+
+    Notes
+    -----
+    If branch_and_bound cannot prove optimality within the time limit,
+    its lower bound is used, so the result is an upper bound on the
+    actual ratio.
+    """
+    if optimal_makespan is None:
+        _, optimal_makespan = schedulers.branch_and_bound(
+                task_loads, num_resources, time_limit)
+    makespan = compute_metrics(mapping, task_loads, num_resources).makespan
+    if optimal_makespan == 0:
+        return 1.0
+    return makespan / optimal_makespan
 
 
 def plot_mapping(
@@ -126,24 +546,10 @@ def plot_mapping(
     Notes
     -----
     The bar plot represents each resource in the horizontal axis and
-    its load in the vertical axis.
+    its load in the vertical axis. Matplotlib is only imported when
+    this function is called (see simulator.plotting, which also offers
+    headless rendering of many mappings).
     """
-    # Compute the resource loads
-    resource_loads = evaluate_mapping(
-            mapping,
-            task_loads,
-            num_resources,
-            False)
-
-    # Plots
-    plt.bar(range(num_resources), resource_loads)
-    plt.ylabel('Load (a.u.)')
-    plt.xlabel('Resources')
-    plt.title('Resources\' load')
-
-    # Saves the plot in a file if a filename is given
-    if filename is not None:
-        plt.savefig(filename, bbox_inches='tight')
+    import simulator.plotting as plotting  # for plots (lazy import)
 
-    # Shows plot
-    plt.show()
+    plotting.plot_mapping(mapping, task_loads, num_resources, filename)
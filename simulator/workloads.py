@@ -0,0 +1,321 @@
+"""Module containing generators of task loads.
+
+Each generator returns a NumPy array with the loads of 'size' tasks,
+drawn in a single vectorized call. The random number generator is a
+numpy.random.Generator, either given through 'rng' or created from
+'rng_seed'.
+
+Any generator can also produce its loads in fixed-size blocks with
+iter_loads, so workloads larger than the available memory can be
+processed one block at a time.
+
+Available generators: uniform_loads, exponential_loads, pareto_loads,
+bimodal_loads, zipf_loads, trace_loads.
+"""
+
+import numpy as np  # for arrays and random numbers
+
+
+def _generator(rng_seed, rng):
+    """Returns 'rng' or a new generator seeded with 'rng_seed'."""
+    if rng is None:
+        return np.random.default_rng(rng_seed)
+    return rng
+
+
+def uniform_loads(
+        size=10,
+        low=1,
+        high=10,
+        rng_seed=None,
+        rng=None):
+    """Returns loads from a discrete uniform distribution.
+
+    Parameters
+    ----------
+    size : int [default=10]
+        Number of loads to generate
+    low : int [default=1]
+        Lower boundary of the load interval (inclusive)
+    high : int [default=10]
+        Upper boundary of the load interval (exclusive)
+    rng_seed : int [default=None]
+        Random number generator seed
+    rng : numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Array of loads of length 'size'
+    """
+    rng = _generator(rng_seed, rng)
+    return rng.integers(low, high, size=size, dtype=np.int64)
+
+
+def exponential_loads(
+        size=10,
+        mean=1.0,
+        rng_seed=None,
+        rng=None):
+    """Returns loads from an exponential distribution.
+
+    Parameters
+    ----------
+    size : int [default=10]
+        Number of loads to generate
+    mean : float [default=1.0]
+        Average load
+    rng_seed : int [default=None]
+        Random number generator seed
+    rng : numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one
+
+    Returns
+    -------
+    numpy.ndarray of float64
+        Array of loads of length 'size'
+    """
+    rng = _generator(rng_seed, rng)
+    return rng.exponential(mean, size=size)
+
+
+def pareto_loads(
+        size=10,
+        shape=1.5,
+        minimum=1.0,
+        rng_seed=None,
+        rng=None):
+    """Returns loads from a Pareto (heavy-tailed) distribution.
+
+    Parameters
+    ----------
+    size : int [default=10]
+        Number of loads to generate
+    shape : float [default=1.5]
+        Shape (tail index) of the distribution. Smaller values lead to
+        heavier tails (infinite variance for shape <= 2)
+    minimum : float [default=1.0]
+        Minimum load (scale of the distribution)
+    rng_seed : int [default=None]
+        Random number generator seed
+    rng : numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one
+
+    Returns
+    -------
+    numpy.ndarray of float64
+        Array of loads of length 'size'
+
+    Notes
+    -----
+    numpy.random.Generator.pareto draws from the Lomax distribution,
+    which is shifted by one to get the classical Pareto distribution.
+    """
+    rng = _generator(rng_seed, rng)
+    loads = rng.pareto(shape, size=size)
+    loads += 1.0
+    loads *= minimum
+    return loads
+
+
+def bimodal_loads(
+        size=10,
+        low_mean=1.0,
+        high_mean=10.0,
+        high_fraction=0.1,
+        spread=0.1,
+        rng_seed=None,
+        rng=None):
+    """Returns loads from a mixture of two normal distributions.
+
+    Parameters
+    ----------
+    size : int [default=10]
+        Number of loads to generate
+    low_mean : float [default=1.0]
+        Average load of the light tasks
+    high_mean : float [default=10.0]
+        Average load of the heavy tasks
+    high_fraction : float [default=0.1]
+        Probability of a task being heavy
+    spread : float [default=0.1]
+        Standard deviation of each mode relative to its average
+    rng_seed : int [default=None]
+        Random number generator seed
+    rng : numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one
+
+    Returns
+    -------
+    numpy.ndarray of float64
+        Array of loads of length 'size'
+
+    Notes
+    -----
+    Negative draws are clipped to zero.
+    """
+    rng = _generator(rng_seed, rng)
+    means = np.where(rng.random(size) < high_fraction, high_mean, low_mean)
+    loads = rng.standard_normal(size)
+    loads *= spread
+    loads += 1.0
+    loads *= means
+    np.maximum(loads, 0.0, out=loads)
+    return loads
+
+
+def zipf_loads(
+        size=10,
+        exponent=2.0,
+        max_load=None,
+        rng_seed=None,
+        rng=None):
+    """Returns loads from a Zipf distribution.
+
+    Parameters
+    ----------
+    size : int [default=10]
+        Number of loads to generate
+    exponent : float [default=2.0]
+        Exponent of the distribution (must be larger than 1)
+    max_load : int [default=None]
+        Maximum load (larger draws are clipped to it), or None for no limit
+    rng_seed : int [default=None]
+        Random number generator seed
+    rng : numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one
+
+    Returns
+    -------
+    numpy.ndarray of int64
+        Array of loads of length 'size'
+    """
+    rng = _generator(rng_seed, rng)
+    loads = rng.zipf(exponent, size=size)
+    if max_load is not None:
+        np.minimum(loads, max_load, out=loads)
+    return loads
+
+
+def read_trace(filename):
+    """Returns the loads stored in a trace file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of a .npy file or of a text file with one load per line
+
+    Returns
+    -------
+    numpy.ndarray
+        Loads of the trace (memory-mapped for .npy files)
+    """
+    if str(filename).endswith('.npy'):
+        return np.load(filename, mmap_mode='r')
+    return np.loadtxt(filename, ndmin=1)
+
+
+def trace_loads(
+        trace,
+        size=None,
+        offset=0,
+        rng_seed=None,
+        rng=None):
+    """Returns loads replayed from a trace.
+
+    Parameters
+    ----------
+    trace : string or numpy.ndarray
+        Name of a trace file (see read_trace) or loads of the trace
+    size : int [default=None]
+        Number of loads to generate, or None for the whole trace
+    offset : int [default=0]
+        Position in the trace of the first load
+    rng_seed : int [default=None]
+        Unused (accepted for compatibility with the other generators)
+    rng : numpy.random.Generator [default=None]
+        Unused (accepted for compatibility with the other generators)
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of loads of length 'size'
+
+    Raises
+    ------
+    ValueError
+        If loads are requested from an empty trace
+
+    Notes
+    -----
+    The trace is replayed from the start again if it is shorter than
+    'offset + size'.
+    """
+    if not isinstance(trace, np.ndarray):
+        trace = read_trace(trace)
+    trace_size = len(trace)
+    if trace_size == 0:
+        if size:
+            raise ValueError(f'Cannot replay {size} loads from an ' +
+                             'empty trace')
+        return np.array(trace)
+    offset %= trace_size
+    if size is None:
+        size = trace_size - offset
+    if offset + size <= trace_size:
+        return np.array(trace[offset:offset + size])
+    positions = np.arange(offset, offset + size) % trace_size
+    return np.asarray(trace[positions])
+
+
+def iter_loads(
+        generator,
+        size,
+        chunk_size=1 << 20,
+        rng_seed=None,
+        rng=None,
+        **params):
+    """Yields the loads of a workload in fixed-size blocks.
+
+    Parameters
+    ----------
+    generator : function
+        One of the generators in this module
+    size : int
+        Total number of loads to generate
+    chunk_size : int [default=1048576]
+        Number of loads per block (the last block may be smaller)
+    rng_seed : int [default=None]
+        Random number generator seed
+    rng : numpy.random.Generator [default=None]
+        Random number generator to use instead of a new one
+    **params
+        Other parameters of the generator
+
+    Yields
+    ------
+    numpy.ndarray
+        Block of at most 'chunk_size' loads
+
+    Notes
+    -----
+    The same random number generator is used for all blocks, so the
+    workload is reproducible for the same seed and block size.
+    For trace_loads, pass the trace as the 'trace' keyword (and the
+    position of the first load as 'offset'). Only the current block of
+    a .npy trace is kept in memory.
+    """
+    rng = _generator(rng_seed, rng)
+    if generator is trace_loads:
+        # Reads (or maps) the trace only once
+        trace = params.pop('trace')
+        if not isinstance(trace, np.ndarray):
+            trace = read_trace(trace)
+        offset = params.pop('offset', 0)
+    for start in range(0, size, chunk_size):
+        block_size = min(chunk_size, size - start)
+        if generator is trace_loads:
+            yield trace_loads(trace, block_size, offset + start, **params)
+        else:
+            yield generator(block_size, rng=rng, **params)
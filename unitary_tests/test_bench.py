@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import simulator.bench as bench                           # noqa
+
+
+def result(benchmark, seconds, peak_memory=1000):
+    return {'benchmark': benchmark, 'distribution': 'uniform',
+            'num_tasks': 100, 'num_resources': 4, 'seconds': seconds,
+            'peak_memory': peak_memory, 'tasks_per_second': 100 / seconds}
+
+
+class BenchTest(unittest.TestCase):
+    def test_run_benchmarks(self):
+        results = bench.run_benchmarks(
+                ['lpt', 'compact_np', 'evaluate_mapping'], [100, 10],
+                [2, 4], ['uniform', 'pareto'], repeat=1)
+        self.assertEqual(len(results), 3 * 2 * 2 * 2)
+        self.assertEqual(bench._key(results[0]),
+                         ('lpt', 'uniform', 10, 2))
+        for entry in results:
+            self.assertGreater(entry['seconds'], 0)
+            self.assertGreaterEqual(entry['peak_memory'], 0)
+            self.assertAlmostEqual(entry['tasks_per_second'],
+                                   entry['num_tasks'] / entry['seconds'])
+
+    def test_time_limit(self):
+        results = bench.run_benchmarks(['lpt'], [10, 20, 30], [2],
+                                       repeat=1, memory=False, time_limit=0)
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0]['peak_memory'])
+
+    def test_compare(self):
+        baseline = [result('lpt', 0.01), result('multifit', 0.01),
+                    result('compact', 0.0001)]
+        results = [result('lpt', 0.011), result('multifit', 0.02),
+                   result('compact', 0.0005), result('karmarkar_karp', 1.0)]
+        regressions = bench.compare(results, baseline, threshold=0.2)
+        self.assertEqual([(new['benchmark'], reason)
+                          for new, old, reason in regressions],
+                         [('multifit', 'time')])
+        results = [result('lpt', 0.01, peak_memory=2000)]
+        regressions = bench.compare(results, baseline)
+        self.assertEqual(regressions[0][2], 'memory')
+        # Both regressions are reported
+        results = [result('lpt', 0.02, peak_memory=2000)]
+        regressions = bench.compare(results, baseline)
+        self.assertEqual([reason for _, _, reason in regressions],
+                         ['time', 'memory'])
+
+    def test_baseline_and_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'baseline.json')
+            arguments = ['--benchmarks', 'compact', 'list_scheduler_np',
+                         '--tasks', '50', '--resources', '3',
+                         '--repeat', '1']
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                status = bench.main(arguments + ['--save', filename])
+            self.assertEqual(status, 0)
+            self.assertIn('list_scheduler_np', output.getvalue())
+            baseline = bench.load_baseline(filename)
+            self.assertEqual([entry['benchmark'] for entry in baseline],
+                             ['compact', 'list_scheduler_np'])
+            # Timings below the clock resolution (1 ms) are not compared,
+            # even against a much faster baseline
+            for entry in baseline:
+                entry['seconds'] = 1e-9
+            bench.save_baseline(filename, baseline)
+            with contextlib.redirect_stdout(io.StringIO()):
+                status = bench.main(arguments + ['--compare', filename,
+                                                 '--threshold', '0'])
+            self.assertEqual(status, 0)
+            # A baseline that used less memory makes the comparison fail
+            for entry in baseline:
+                entry['peak_memory'] = 0
+            bench.save_baseline(filename, baseline)
+            with contextlib.redirect_stdout(io.StringIO()):
+                status = bench.main(arguments + ['--compare', filename])
+            self.assertEqual(status, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
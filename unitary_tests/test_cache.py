@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import unittest
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+import simulator.schedulers as schedulers                 # noqa
+import simulator.schedulers_np as schedulers_np           # noqa
+from simulator.cache import ResultCache, fingerprint      # noqa
+from simulator.structures import Workload                 # noqa
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_contents_and_parameters(self):
+        loads = np.arange(10)
+        key = fingerprint('lpt', loads, 4)
+        self.assertEqual(key, fingerprint('lpt', loads.copy(), 4))
+        self.assertEqual(key, fingerprint('lpt', Workload(loads), 4))
+        self.assertEqual(key, fingerprint('lpt', loads[::-1][::-1], 4))
+        self.assertNotEqual(key, fingerprint('lpt', loads, 5))
+        self.assertNotEqual(key, fingerprint('compact', loads, 4))
+        self.assertNotEqual(key, fingerprint('lpt', loads.astype(float), 4))
+        self.assertNotEqual(key, fingerprint('lpt', loads[:-1], 4))
+        self.assertNotEqual(fingerprint('compact', 10, 4),
+                            fingerprint('compact', 11, 4))
+        self.assertNotEqual(
+                fingerprint('u', loads, 4, {'resource_speeds': [1, 2]}),
+                fingerprint('u', loads, 4, {'resource_speeds': [2, 1]}))
+        # Non-contiguous arrays are hashed in chunks
+        self.assertEqual(fingerprint('lpt', loads[::2], 4),
+                         fingerprint('lpt', loads[::2].copy(), 4))
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.task_loads = np.random.default_rng(1).integers(1, 100, 500)
+
+    def test_hits(self):
+        cache = ResultCache()
+        mapping, metrics = cache.schedule(schedulers.lpt, self.task_loads, 8)
+        self.assertEqual(mapping.tolist(),
+                         schedulers.lpt(self.task_loads, 8))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cached_mapping, cached_metrics = cache.schedule(
+                schedulers.lpt, self.task_loads.copy(), 8)
+        self.assertIs(cached_mapping, mapping)
+        self.assertIs(cached_metrics, metrics)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertFalse(mapping.flags.writeable)
+        # Other parameters are other problems
+        cache.schedule(schedulers.lpt, self.task_loads, 9)
+        cache.schedule(schedulers.lpt_with_limits, self.task_loads, 8,
+                       task_limit=70)
+        self.assertEqual(cache.misses, 3)
+
+    def test_num_tasks_schedulers(self):
+        cache = ResultCache()
+        for scheduler in [schedulers.compact, schedulers_np.round_robin]:
+            mapping, metrics = cache.schedule(scheduler, self.task_loads, 3)
+            self.assertEqual(mapping.tolist(),
+                             list(scheduler(len(self.task_loads), 3)))
+            self.assertEqual(metrics.num_tasks, len(self.task_loads))
+        # Other loads with the same number of tasks share the mapping
+        other_loads = self.task_loads[::-1] * 2
+        mapping, metrics = cache.schedule(schedulers.compact, other_loads, 3)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(metrics.resource_loads.tolist(),
+                         np.bincount(mapping, weights=other_loads).tolist())
+        self.assertEqual(metrics.makespan, max(metrics.resource_loads))
+        cache.schedule(schedulers.compact, self.task_loads[:-1], 3)
+        self.assertEqual(cache.misses, 3)
+        with tempfile.TemporaryDirectory() as directory:
+            ResultCache(directory=directory).schedule(
+                    schedulers.compact, self.task_loads, 3)
+            other = ResultCache(directory=directory)
+            mapping, metrics = other.schedule(
+                    schedulers.compact, other_loads, 3)
+            self.assertEqual(other.disk_hits, 1)
+            self.assertEqual(sum(metrics.resource_loads), other_loads.sum())
+
+    def test_eviction(self):
+        cache = ResultCache(max_bytes=6000)
+        cache.schedule(schedulers.lpt, self.task_loads, 2)
+        cache.schedule(schedulers.lpt, self.task_loads, 3)
+        cache.schedule(schedulers.lpt, self.task_loads, 2)
+        # Evicts the least recently used result (3 resources)
+        cache.schedule(schedulers.lpt, self.task_loads, 4)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.current_bytes, 6000)
+        cache.schedule(schedulers.lpt, self.task_loads, 2)
+        self.assertEqual(cache.hits, 2)
+        cache.schedule(schedulers.lpt, self.task_loads, 3)
+        self.assertEqual(cache.misses, 4)
+        # Results larger than the cache are not kept
+        cache = ResultCache(max_bytes=100)
+        cache.schedule(schedulers.lpt, self.task_loads, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_disk_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory=directory)
+            mapping, metrics = cache.schedule(
+                    schedulers.list_scheduler, self.task_loads, 5)
+            other = ResultCache(directory=directory)
+            cached_mapping, cached_metrics = other.schedule(
+                    schedulers.list_scheduler, self.task_loads, 5)
+            self.assertEqual((other.disk_hits, other.misses), (1, 0))
+            self.assertEqual(cached_mapping.tolist(), mapping.tolist())
+            self.assertEqual(cached_metrics.resource_loads.tolist(),
+                             metrics.resource_loads.tolist())
+            self.assertEqual(cached_metrics.makespan, metrics.makespan)
+            self.assertIsInstance(cached_metrics.makespan, int)
+            self.assertEqual(cached_metrics.imbalance, metrics.imbalance)
+            # The result is now in memory as well
+            other.schedule(schedulers.list_scheduler, self.task_loads, 5)
+            self.assertEqual(other.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
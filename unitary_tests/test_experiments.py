@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+from simulator.experiments import run_experiments, load_results  # noqa
+from simulator.experiments import experiment_grid, FIELDS         # noqa
+
+
+GRID = dict(schedulers=['round_robin', 'uniformly_random', 'list_scheduler'],
+            num_tasks=[20, 50],
+            num_resources=[3, 4],
+            load_generators=['uniform'],
+            seeds=[1, 2])
+
+
+class ExperimentsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def results(self, name, num_workers):
+        filename = os.path.join(self.directory.name, name)
+        num_run = run_experiments(filename, num_workers=num_workers,
+                                  chunk_size=5, **GRID)
+        self.assertEqual(num_run, 24)
+        columns = load_results(filename)
+        del columns['scheduling_time']
+        return columns
+
+    def test_grid(self):
+        grid = experiment_grid(**GRID)
+        self.assertEqual(len(grid), 24)
+        self.assertEqual(grid[0], ('round_robin', 'uniform', 20, 3, 1))
+
+    def test_same_results_for_any_number_of_workers(self):
+        serial = self.results('serial.csv', 1)
+        parallel = self.results('parallel.csv', 2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(serial['makespan']), 24)
+
+    def test_resume(self):
+        filename = os.path.join(self.directory.name, 'resume.csv')
+        run_experiments(filename, num_workers=1, **dict(GRID, seeds=[1]))
+        # Simulates an interruption in the middle of a row
+        with open(filename, 'a') as results_file:
+            results_file.write('list_scheduler,uniform,50,4,2,1')
+        num_run = run_experiments(filename, num_workers=1, **GRID)
+        self.assertEqual(num_run, 12)
+        columns = load_results(filename)
+        self.assertEqual(len(columns['seed']), 24)
+        self.assertEqual(list(columns), FIELDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
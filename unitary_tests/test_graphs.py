@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import unittest
+import itertools
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+from simulator.graphs import TaskGraph, graph_partition   # noqa
+from simulator.support import compute_communication       # noqa
+from simulator.support import compute_metrics             # noqa
+
+
+def two_cliques(size):
+    """Two cliques of 'size' tasks, interleaved and linked by one edge."""
+    edges = []
+    for clique in range(2):
+        tasks = range(clique, 2 * size, 2)
+        edges += list(itertools.combinations(tasks, 2))
+    edges.append((0, 1))
+    sources, destinations = zip(*edges)
+    return TaskGraph.from_edges(2 * size, sources, destinations)
+
+
+class TaskGraphTest(unittest.TestCase):
+    def test_from_edges(self):
+        graph = TaskGraph.from_edges(4, [0, 1, 2, 1, 3], [1, 2, 0, 0, 3],
+                                     [1, 2, 3, 4, 5])
+        self.assertEqual(graph.indptr.tolist(), [0, 2, 4, 6, 6])
+        self.assertEqual(graph.indices.tolist(), [1, 2, 0, 2, 0, 1])
+        self.assertEqual(graph.weights.tolist(), [5, 3, 5, 2, 3, 2])
+        self.assertEqual(graph.num_edges, 3)
+        self.assertEqual(graph.edge_sources().tolist(), [0, 0, 1, 1, 2, 2])
+
+    def test_communication(self):
+        graph = TaskGraph.from_edges(4, [0, 1, 2], [1, 2, 3], [1, 2, 3])
+        edge_cut, volumes = compute_communication([0, 0, 1, 1], graph, 3)
+        self.assertEqual(edge_cut, 2)
+        self.assertEqual(volumes.tolist(), [2, 2, 0])
+        edge_cut, volumes = compute_communication([0, 1, 0, 1], graph, 2)
+        self.assertEqual(edge_cut, 6)
+        self.assertEqual(volumes.tolist(), [6, 6])
+
+
+class GraphPartitionTest(unittest.TestCase):
+    def test_two_cliques(self):
+        graph = two_cliques(10)
+        task_loads = np.ones(20)
+        mapping = graph_partition(task_loads, 2, graph)
+        edge_cut, _ = compute_communication(mapping, graph, 2)
+        self.assertEqual(edge_cut, 1)
+        metrics = compute_metrics(mapping, task_loads, 2)
+        self.assertEqual(metrics.tasks_per_resource.tolist(), [10, 10])
+
+    def test_grid(self):
+        side = 40
+        tasks = np.arange(side * side).reshape(side, side)
+        graph = TaskGraph.from_edges(
+                side * side,
+                np.concatenate([tasks[:, :-1].ravel(), tasks[:-1].ravel()]),
+                np.concatenate([tasks[:, 1:].ravel(), tasks[1:].ravel()]))
+        task_loads = np.random.default_rng(2).integers(1, 10, side * side)
+        mapping = graph_partition(task_loads, 4, graph)
+        edge_cut, _ = compute_communication(mapping, graph, 4)
+        # Random mappings cut about 3/4 of the edges
+        self.assertLess(edge_cut, graph.num_edges / 10)
+        self.assertLess(compute_metrics(mapping, task_loads, 4).imbalance,
+                        0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+import simulator.heterogeneous as heterogeneous           # noqa
+from simulator.support import compute_metrics             # noqa
+
+COSTS = [[1, 4], [2, 3], [5, 6]]
+
+
+class HeuristicsTest(unittest.TestCase):
+    def test_min_min(self):
+        mapping = heterogeneous.min_min(COSTS)
+        self.assertEqual(mapping.dtype, np.int32)
+        self.assertEqual(mapping.tolist(), [0, 0, 1])
+
+    def test_max_min(self):
+        self.assertEqual(heterogeneous.max_min(COSTS).tolist(), [1, 0, 0])
+
+    def test_sufferage(self):
+        self.assertEqual(heterogeneous.sufferage(COSTS).tolist(), [0, 0, 1])
+
+    def test_heft(self):
+        self.assertEqual(heterogeneous.heft(COSTS).tolist(), [1, 0, 0])
+
+    def test_task_costs(self):
+        self.assertEqual(heterogeneous.task_costs([1, 0, 0], COSTS).tolist(),
+                         [4, 2, 5])
+        self.assertEqual(heterogeneous.task_costs([2, 0, 1], COSTS,
+                                                  [0, 1, 1]).tolist(),
+                         [4, 2, 6])
+
+    def test_resource_types(self):
+        rng = np.random.default_rng(2)
+        type_costs = rng.uniform(1, 10, (300, 3))
+        resource_types = np.array([0, 0, 1, 1, 1, 2, 2, 0])
+        full_costs = type_costs[:, resource_types]
+        for heuristic in [heterogeneous.min_min, heterogeneous.max_min,
+                          heterogeneous.sufferage, heterogeneous.heft]:
+            mapping = heuristic(type_costs, resource_types)
+            self.assertEqual(mapping.tolist(),
+                             heuristic(full_costs).tolist())
+            loads = heterogeneous.task_costs(mapping, full_costs)
+            makespan = compute_metrics(mapping, loads, 8).makespan
+            # Never worse than running every task on its best resource
+            self.assertLessEqual(makespan, full_costs.min(axis=1).sum())
+
+    def test_affinity(self):
+        # Each task is fast only on its own resource
+        costs = np.full((4, 4), 100.0)
+        costs[np.arange(4), [2, 0, 3, 1]] = 1.0
+        for heuristic in [heterogeneous.min_min, heterogeneous.max_min,
+                          heterogeneous.sufferage, heterogeneous.heft]:
+            self.assertEqual(heuristic(costs).tolist(), [2, 0, 3, 1])
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            heterogeneous.min_min([1, 2, 3])
+        with self.assertRaises(ValueError):
+            heterogeneous.heft(COSTS, [0, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                           # noqa
+import simulator.schedulers as schedulers                    # noqa
+from simulator.hierarchical import hierarchical_scheduler    # noqa
+from simulator.support import compute_level_metrics          # noqa
+
+
+class HierarchicalTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.task_loads = rng.integers(1, 100, 2000)
+
+    def test_single_level(self):
+        mapping = hierarchical_scheduler(self.task_loads, [8])
+        self.assertEqual(mapping.tolist(), schedulers.lpt(self.task_loads, 8))
+
+    def test_round_robin_levels(self):
+        mapping = hierarchical_scheduler(
+                np.ones(12), [2, 3], schedulers.round_robin)
+        # Nodes get tasks alternately, then cores in each node
+        self.assertEqual(mapping.tolist(),
+                         [0, 3, 1, 4, 2, 5, 0, 3, 1, 4, 2, 5])
+
+    def test_levels(self):
+        levels = [4, 2, 8]
+        mapping = hierarchical_scheduler(
+                self.task_loads, levels,
+                [schedulers.lpt, schedulers.karmarkar_karp,
+                 schedulers.list_scheduler])
+        self.assertEqual(sorted(set(mapping.tolist())), list(range(64)))
+        level_metrics = compute_level_metrics(mapping, self.task_loads,
+                                              levels)
+        self.assertEqual([metrics.num_resources for metrics in level_metrics],
+                         [4, 8, 64])
+        for metrics in level_metrics:
+            self.assertEqual(metrics.resource_loads.sum(),
+                             self.task_loads.sum())
+            self.assertLess(metrics.imbalance, 0.1)
+
+    def test_parallel(self):
+        serial = hierarchical_scheduler(self.task_loads, [4, 16])
+        parallel = hierarchical_scheduler(self.task_loads, [4, 16],
+                                          num_workers=2)
+        self.assertEqual(serial.tolist(), parallel.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
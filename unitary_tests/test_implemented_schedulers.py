@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import unittest
+import random
 import sys
 # Add the parent directory to the path so we can import
 # code from our simulator
@@ -8,6 +9,7 @@ sys.path.append('../')
 
 from simulator.schedulers import round_robin, compact              # noqa
 from simulator.schedulers import uniformly_random, list_scheduler  # noqa
+from simulator.schedulers import OnlineListScheduler               # noqa
 
 
 class RRTest(unittest.TestCase):
@@ -75,6 +77,14 @@ class RandomTest(unittest.TestCase):
         self.assertEqual(mapping[3], 1)
         self.assertEqual(mapping[4], 0)
 
+    def test_generator(self):
+        rng = random.Random(1)
+        mapping = uniformly_random(5, 3, rng=rng)
+        self.assertEqual(mapping, uniformly_random(5, 3, 1))
+        # The generator is advanced by the draws
+        self.assertEqual(uniformly_random(5, 3, rng=rng),
+                         uniformly_random(10, 3, 1)[5:])
+
 
 class LSTest(unittest.TestCase):
     def test_five_tasks(self):
@@ -103,5 +113,23 @@ class LSTest(unittest.TestCase):
         self.assertEqual(mapping[9], 0)
 
 
+class OnlineLSTest(unittest.TestCase):
+    def test_same_as_list_scheduler(self):
+        task_loads = [5, 3, 2, 7, 4, 1, 9, 3, 2, 7]
+        scheduler = OnlineListScheduler(5)
+        mapping = [scheduler.assign(load) for load in task_loads[:4]]
+        mapping += scheduler.assign_many(iter(task_loads[4:]))
+        self.assertEqual(mapping, list_scheduler(task_loads, 5))
+
+    def test_metrics(self):
+        scheduler = OnlineListScheduler(3)
+        scheduler.assign_many([5, 3, 2, 7, 4])
+        self.assertEqual(scheduler.num_tasks, 5)
+        self.assertEqual(scheduler.total_load, 21)
+        self.assertEqual(scheduler.resource_loads(), [5, 7, 9])
+        self.assertEqual(scheduler.makespan, 9)
+        self.assertAlmostEqual(scheduler.imbalance, 9/7 - 1)
+
+
 if __name__ == '__main__':
     unittest.main()
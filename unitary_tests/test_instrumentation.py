@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+import simulator.schedulers as schedulers                 # noqa
+from simulator.instrumentation import Instrumentation     # noqa
+from simulator.support import evaluate_mapping            # noqa
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_counters_and_phases(self):
+        instrumentation = Instrumentation()
+        task_loads = [3, 5, 1, 4, 2]
+        mapping = schedulers.lpt(task_loads, 2,
+                                 instrumentation=instrumentation)
+        self.assertEqual(mapping, schedulers.lpt(task_loads, 2))
+        self.assertEqual(instrumentation.counters,
+                         {'tasks': 5, 'heap_pops': 5, 'heap_pushes': 5})
+        self.assertEqual(set(instrumentation.timings), {'sort', 'assign'})
+        self.assertEqual(instrumentation.traces, {})
+        evaluate_mapping(mapping, task_loads, 2, verbose=False,
+                         instrumentation=instrumentation)
+        self.assertIn('evaluate', instrumentation.timings)
+        self.assertIn('- heap_pops: 5', instrumentation.report())
+
+    def test_decision_trace(self):
+        instrumentation = Instrumentation(sample_rate=1)
+        task_loads = [3, 5, 1, 4, 2]
+        schedulers.list_scheduler(task_loads, 2,
+                                  instrumentation=instrumentation)
+        # Task 0 -> 0, 1 -> 1, 2 -> 0 (3), 3 -> 0 (4), 4 -> 1 (5)
+        self.assertEqual(instrumentation.traces['list_scheduler'],
+                         [(0, 0, 0, 0), (1, 1, 1, 0), (2, 2, 0, 3),
+                          (3, 3, 0, 4), (4, 4, 1, 5)])
+        instrumentation = Instrumentation(sample_rate=0.5)
+        schedulers.lpt(task_loads, 2, instrumentation=instrumentation)
+        # Order 1, 3, 0, 4, 2 -> resources 0, 1, 1, 0, 0
+        self.assertEqual(instrumentation.traces['lpt'],
+                         [(0, 1, 0, 0), (2, 0, 1, 4), (4, 2, 0, 7)])
+
+    def test_trace_matches_heap_loads(self):
+        task_loads = np.random.default_rng(3).integers(1, 50, 500)
+        instrumentation = Instrumentation(sample_rate=1)
+        mapping = schedulers.list_scheduler(task_loads, 7,
+                                            instrumentation=instrumentation)
+        trace = instrumentation.traces['list_scheduler']
+        resource_loads = [0] * 7
+        for step, task, resource, load in trace:
+            self.assertEqual(mapping[task], resource)
+            self.assertEqual(resource_loads[resource], load)
+            # List scheduling always picks the least loaded resource
+            self.assertEqual(load, min(resource_loads))
+            resource_loads[resource] += task_loads[task]
+
+    def test_other_schedulers(self):
+        instrumentation = Instrumentation(sample_rate=0.1)
+        task_loads = list(range(1, 21))
+        schedulers.lpt_with_limits(task_loads, 4, 5,
+                                   instrumentation=instrumentation)
+        self.assertEqual(instrumentation.counters['full_resources'], 4)
+        self.assertEqual(instrumentation.counters['heap_pushes'], 16)
+        schedulers.list_scheduler_for_uniform_resources(
+                task_loads, 4, [1, 1, 2, 2], instrumentation=instrumentation)
+        self.assertEqual(instrumentation.counters['tasks'], 40)
+        self.assertEqual(instrumentation.counters['heap_peeks'], 40)
+        self.assertEqual(len(instrumentation.traces['lpt_with_limits']), 2)
+
+    def test_callbacks(self):
+        events = []
+        instrumentation = Instrumentation(
+                sample_rate=1, callbacks=[lambda *event: events.append(event)])
+        schedulers.lpt([2, 1], 2, instrumentation=instrumentation)
+        self.assertEqual([event[:2] for event in events],
+                         [('phase', 'sort'), ('phase', 'assign'),
+                          ('count', 'tasks'), ('count', 'heap_pops'),
+                          ('count', 'heap_pushes'), ('trace', 'lpt')])
+        self.assertEqual(events[-1][2], [(0, 0, 0, 0), (1, 1, 1, 0)])
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            Instrumentation(sample_rate=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
 
 import unittest
+import itertools
 import sys
+import numpy as np
 # Add the parent directory to the path so we can import
 # code from our simulator
 sys.path.append('../')
 
 from simulator.schedulers import lpt, lpt_with_limits                  # noqa
 from simulator.schedulers import list_scheduler_for_uniform_resources  # noqa
+from simulator.schedulers import karmarkar_karp, multifit              # noqa
+from simulator.schedulers import complete_greedy, branch_and_bound     # noqa
+from simulator.schedulers import makespan_lower_bound, refine          # noqa
+
+
+def makespan(mapping, task_loads, num_resources):
+    resource_loads = [0] * num_resources
+    for task, resource in enumerate(mapping):
+        resource_loads[resource] += task_loads[task]
+    return max(resource_loads)
+
+
+def optimal_makespan(task_loads, num_resources):
+    return min(makespan(mapping, task_loads, num_resources)
+               for mapping in itertools.product(range(num_resources),
+                                                repeat=len(task_loads)))
 
 
 class LPTTest(unittest.TestCase):
@@ -36,6 +54,11 @@ class LPTTest(unittest.TestCase):
         self.assertEqual(mapping[8], 2)
         self.assertEqual(mapping[9], 0)
 
+    def test_ties_and_arrays(self):
+        task_loads = np.array([2, 4, 2, 4, 2], dtype=np.uint32)
+        mapping = lpt(task_loads, 2)
+        self.assertEqual(mapping, [0, 0, 1, 1, 0])
+
 
 class LPTWithLimitsTest(unittest.TestCase):
     def test_five_tasks(self):
@@ -57,6 +80,15 @@ class LPTWithLimitsTest(unittest.TestCase):
         self.assertEqual(max(tasks_per_resource), 2)
         self.assertEqual(min(tasks_per_resource), 1)
 
+    def test_same_as_lpt_without_limits(self):
+        task_loads = [5, 3, 2, 7, 4, 1, 9, 6, 8, 10]
+        self.assertEqual(lpt_with_limits(task_loads, 5, 10),
+                         lpt(task_loads, 5))
+
+    def test_infeasible(self):
+        with self.assertRaises(ValueError):
+            lpt_with_limits([1, 1, 1, 5, 6], 2, 2)
+
 
 class LSForUniformTest(unittest.TestCase):
     def test_five_tasks(self):
@@ -74,5 +106,107 @@ class LSForUniformTest(unittest.TestCase):
         self.assertEqual(mapping[4], 1)
 
 
+class PartitioningTest(unittest.TestCase):
+    def test_karmarkar_karp(self):
+        task_loads = [8, 7, 6, 5, 4]
+        mapping = karmarkar_karp(task_loads, 2)
+        self.assertEqual(makespan(mapping, task_loads, 2), 16)
+        task_loads = [5, 3, 2, 7, 4, 1, 9, 6, 8, 10]
+        mapping = karmarkar_karp(task_loads, 3)
+        self.assertEqual(sorted(set(mapping)), [0, 1, 2])
+        self.assertLessEqual(makespan(mapping, task_loads, 3),
+                             makespan(lpt(task_loads, 3), task_loads, 3))
+
+    def test_multifit(self):
+        task_loads = [4, 4, 3, 3, 2, 2, 2]
+        self.assertEqual(makespan(lpt(task_loads, 2), task_loads, 2), 11)
+        mapping = multifit(task_loads, 2)
+        self.assertEqual(makespan(mapping, task_loads, 2), 10)
+
+    def test_complete_greedy(self):
+        task_loads = [8, 7, 6, 5, 4]
+        mapping = complete_greedy(task_loads, 2)
+        self.assertEqual(makespan(mapping, task_loads, 2), 15)
+        task_loads = [3, 3, 2, 2, 2]
+        mapping = complete_greedy(task_loads, 2)
+        self.assertEqual(makespan(mapping, task_loads, 2), 6)
+
+    def test_complete_greedy_exhaustive(self):
+        rng = np.random.default_rng(9)
+        for _ in range(40):
+            num_resources = int(rng.integers(2, 4))
+            task_loads = rng.integers(1, 60, int(rng.integers(1, 9)))
+            task_loads = task_loads.tolist()
+            mapping = complete_greedy(task_loads, num_resources)
+            self.assertEqual(makespan(mapping, task_loads, num_resources),
+                             optimal_makespan(task_loads, num_resources))
+
+
+class BranchAndBoundTest(unittest.TestCase):
+    def test_lower_bound(self):
+        self.assertEqual(makespan_lower_bound([5, 3, 2, 7, 4], 3), 7)
+        self.assertEqual(makespan_lower_bound([5, 5, 5, 5], 3), 10)
+        self.assertEqual(makespan_lower_bound([1, 1, 1, 1, 1], 2), 3)
+        self.assertEqual(makespan_lower_bound([1.0, 1.0, 1.0], 2), 2.0)
+
+    def test_optimal(self):
+        # Worst case of LPT for 3 resources (makespan 11 instead of 9)
+        task_loads = [5, 5, 4, 4, 3, 3, 3]
+        self.assertEqual(makespan(lpt(task_loads, 3), task_loads, 3), 11)
+        mapping, lower_bound = branch_and_bound(task_loads, 3)
+        self.assertEqual(makespan(mapping, task_loads, 3), 9)
+        self.assertEqual(lower_bound, 9)
+
+    def test_exhaustive(self):
+        task_loads = [35, 56, 24, 36, 28, 47, 17, 53]
+        mapping, lower_bound = branch_and_bound(task_loads, 3)
+        self.assertEqual(makespan(mapping, task_loads, 3), 100)
+        self.assertEqual(lower_bound, 100)
+        rng = np.random.default_rng(10)
+        for _ in range(40):
+            num_resources = int(rng.integers(2, 4))
+            task_loads = rng.integers(1, 60, int(rng.integers(1, 9)))
+            task_loads = task_loads.tolist()
+            optimum = optimal_makespan(task_loads, num_resources)
+            mapping, lower_bound = branch_and_bound(task_loads,
+                                                    num_resources)
+            self.assertEqual(makespan(mapping, task_loads, num_resources),
+                             optimum)
+            self.assertEqual(lower_bound, optimum)
+
+    def test_time_limit(self):
+        task_loads = [(task * 7919) % 1000 + 1 for task in range(60)]
+        mapping, lower_bound = branch_and_bound(task_loads, 7, 0.1)
+        self.assertEqual(len(mapping), 60)
+        self.assertLessEqual(lower_bound, makespan(mapping, task_loads, 7))
+        self.assertGreaterEqual(lower_bound, sum(task_loads) / 7)
+
+
+class RefineTest(unittest.TestCase):
+    def test_small_mapping(self):
+        task_loads = [4, 3, 3, 2, 1, 1]
+        mapping = [0, 0, 0, 0, 1, 2]
+        new_mapping, moves = refine(mapping, task_loads, 3, tolerance=1.0)
+        self.assertEqual(moves, [(2, 0, 1), (1, 0, 2)])
+        self.assertEqual(new_mapping, [0, 2, 1, 0, 1, 2])
+        self.assertEqual(mapping, [0, 0, 0, 0, 1, 2])
+
+    def test_migration_budget(self):
+        task_loads = [(task * 7919) % 100 + 1 for task in range(1000)]
+        mapping = [task % 10 for task in range(1000)]
+        for task in range(0, 1000, 10):
+            task_loads[task] *= 3  # resource 0 gets heavier
+        new_mapping, moves = refine(mapping, task_loads, 10,
+                                    max_migrations=5)
+        self.assertEqual(len(moves), 5)
+        changed = [task for task in range(1000)
+                   if new_mapping[task] != mapping[task]]
+        self.assertEqual(sorted(changed), sorted(move[0] for move in moves))
+        _, moves = refine(mapping, task_loads, 10)
+        self.assertLess(len(moves), 100)
+        self.assertLess(makespan(new_mapping, task_loads, 10),
+                        makespan(mapping, task_loads, 10))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import subprocess
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+import simulator.plotting as plotting                     # noqa
+import simulator.schedulers_np as schedulers_np           # noqa
+from simulator.simulation import simulate                 # noqa
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_support_without_matplotlib(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ('import sys, simulator.support, simulator.schedulers;' +
+                'print("matplotlib" in sys.modules)')
+        output = subprocess.run([sys.executable, '-c', code], cwd=root,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+
+
+class DownsampleTest(unittest.TestCase):
+    def test_groups(self):
+        starts, minimum, mean, maximum = plotting.downsample(
+                [1, 5, 2, 2, 9, 3, 4], 3)
+        self.assertEqual(starts.tolist(), [0, 2, 4])
+        self.assertEqual(minimum.tolist(), [1, 2, 3])
+        self.assertEqual(mean.tolist(), [3, 2, 16 / 3])
+        self.assertEqual(maximum.tolist(), [5, 2, 9])
+
+    def test_few_values(self):
+        starts, minimum, mean, maximum = plotting.downsample([3, 1], 10)
+        self.assertEqual(starts.tolist(), [0, 1])
+        self.assertEqual(mean.tolist(), [3, 1])
+        self.assertEqual(len(plotting.downsample([], 10)[0]), 0)
+
+
+class AggregatedViewsTest(unittest.TestCase):
+    def test_sorted_load_curve(self):
+        ranks, loads = plotting.sorted_load_curve([2, 7, 1, 5])
+        self.assertEqual(ranks.tolist(), [0, 1, 2, 3])
+        self.assertEqual(loads.tolist(), [7, 5, 2, 1])
+        ranks, loads = plotting.sorted_load_curve(np.arange(1000), 11)
+        self.assertEqual(ranks[[0, -1]].tolist(), [0, 999])
+        self.assertEqual(loads[[0, -1]].tolist(), [999, 0])
+        self.assertLessEqual(len(ranks), 11)
+
+    def test_percentile_bands(self):
+        resource_loads = np.random.default_rng(5).random(1003)
+        starts, bands = plotting.percentile_bands(
+                resource_loads, 10, (0, 30, 50, 100))
+        self.assertEqual(bands.shape, (4, 10))
+        groups = np.split(resource_loads, starts[1:])
+        expected = [np.percentile(group, [0, 30, 50, 100])
+                    for group in groups]
+        self.assertTrue(np.allclose(bands, np.transpose(expected)))
+
+    def test_group_rows(self):
+        starts, rows = plotting.group_rows(
+                [[1, 0], [0, 1], [1, 1], [0, 0], [1, 0]], 2)
+        self.assertEqual(starts.tolist(), [0, 2])
+        self.assertTrue(np.allclose(rows, [[0.5, 0.5], [2 / 3, 1 / 3]]))
+
+
+class RenderTest(unittest.TestCase):
+    def test_render_mappings(self):
+        num_tasks, num_resources = 1000, 10
+        task_loads = np.random.default_rng(2).integers(1, 10, num_tasks)
+        mappings = [schedulers_np.round_robin(num_tasks, num_resources),
+                    schedulers_np.list_scheduler(task_loads, num_resources)]
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name)
+                         for name in ['round_robin.png', 'list.png']]
+            plotting.render_mappings(mappings, task_loads, num_resources,
+                                     filenames, titles=['RR', 'LS'])
+            for filename in filenames:
+                with open(filename, 'rb') as image:
+                    self.assertEqual(image.read(4), b'\x89PNG')
+
+    def test_downsampled_render(self):
+        renderer = plotting.MappingRenderer(max_bars=100)
+        resource_loads = np.random.default_rng(3).random(100000)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'loads.png')
+            renderer.render_loads(resource_loads, filename)
+            self.assertGreater(os.path.getsize(filename), 0)
+            # The figure is reused
+            figure = renderer.figure
+            renderer.render_loads(resource_loads[:50], filename)
+            self.assertIs(renderer.figure, figure)
+            self.assertEqual(len(figure.axes), 1)
+
+    def test_overview_and_timeline(self):
+        renderer = plotting.MappingRenderer()
+        task_loads = np.random.default_rng(6).integers(1, 10, 5000)
+        mapping = schedulers_np.list_scheduler(task_loads, 1000)
+        result = simulate(mapping, task_loads, 1000)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'overview.png')
+            renderer.render_overview(result.busy_times(), filename)
+            self.assertGreater(os.path.getsize(filename), 0)
+            filename = os.path.join(directory, 'timeline.png')
+            renderer.render_timeline(result, filename, max_rows=100)
+            self.assertGreater(os.path.getsize(filename), 0)
+
+    def test_load_monitor(self):
+        monitor = plotting.LoadMonitor(4, num_bins=3)
+        monitor.add_tasks([0, 1, 1], [2, 3, 1])
+        monitor.record()
+        monitor.add_tasks([3], [6])
+        monitor.record(10)
+        self.assertEqual(monitor.resource_loads.tolist(), [2, 4, 0, 6])
+        self.assertEqual(monitor.steps, [0, 10])
+        self.assertEqual(monitor.history, [[0, 1, 4], [0, 3, 6]])
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'monitor.png')
+            monitor.render(filename)
+            bars = monitor.figure.axes[1].patches
+            monitor.set_loads([1, 1, 1, 1])
+            monitor.render(filename)
+            # The same bars are updated
+            self.assertIs(monitor.figure.axes[1].patches[0], bars[0])
+            self.assertEqual(sum(bar.get_height() for bar in bars), 4)
+
+    def test_invalid_filenames(self):
+        with self.assertRaises(ValueError):
+            plotting.render_mappings([[0]], [1], 1, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
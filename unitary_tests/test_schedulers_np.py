@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import unittest
+import random
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                                # noqa
+import simulator.schedulers as schedulers                         # noqa
+import simulator.schedulers_np as schedulers_np                   # noqa
+from simulator.rng import randbelow                               # noqa
+from simulator.support import compute_metrics, compute_batch_metrics  # noqa
+
+
+class RRArrayTest(unittest.TestCase):
+    def test_same_as_list(self):
+        for num_tasks, num_resources in [(5, 2), (5, 10), (1000, 7)]:
+            mapping = schedulers_np.round_robin(num_tasks, num_resources)
+            self.assertEqual(mapping.dtype, np.int32)
+            self.assertEqual(mapping.tolist(),
+                             schedulers.round_robin(num_tasks, num_resources))
+
+
+class CompactArrayTest(unittest.TestCase):
+    def test_same_as_list(self):
+        for num_tasks, num_resources in [(5, 2), (5, 10), (1000, 7)]:
+            mapping = schedulers_np.compact(num_tasks, num_resources)
+            self.assertEqual(mapping.dtype, np.int32)
+            self.assertEqual(mapping.tolist(),
+                             schedulers.compact(num_tasks, num_resources))
+
+
+class RandomArrayTest(unittest.TestCase):
+    def test_same_as_list(self):
+        for num_resources in [1, 3, 5, 1000, 2**20 + 1]:
+            for seed in [1, 2, 10]:
+                mapping = schedulers_np.uniformly_random(
+                        2000, num_resources, seed)
+                self.assertEqual(mapping.dtype, np.int32)
+                self.assertEqual(
+                        mapping.tolist(),
+                        schedulers.uniformly_random(2000, num_resources,
+                                                    seed))
+
+    def test_randbelow_state(self):
+        py_rng = random.Random(5)
+        ref_rng = random.Random(5)
+        values = randbelow(py_rng, 6, 100)
+        self.assertEqual(values.tolist(),
+                         [ref_rng.randrange(6) for i in range(100)])
+        self.assertEqual(py_rng.random(), ref_rng.random())
+
+
+class LSArrayTest(unittest.TestCase):
+    def test_same_as_list(self):
+        task_loads = [5, 3, 2, 7, 4, 1, 9, 3, 2, 7]
+        mapping = schedulers_np.list_scheduler(task_loads, 5)
+        self.assertEqual(mapping.dtype, np.int32)
+        self.assertEqual(mapping.tolist(),
+                         schedulers.list_scheduler(task_loads, 5))
+        mapping = schedulers_np.list_scheduler(np.array(task_loads), 3)
+        self.assertEqual(mapping.tolist(),
+                         schedulers.list_scheduler(task_loads, 3))
+
+
+class BlockLSTest(unittest.TestCase):
+    def test_single_block(self):
+        mapping = schedulers_np.block_list_scheduler([1] * 8, 2)
+        self.assertEqual(mapping.dtype, np.int32)
+        self.assertEqual(mapping.tolist(), [0, 0, 0, 0, 1, 1, 1, 1])
+        # First block: level 2, task 0 overflows resource 0 (loads 4, 0, 2)
+        # Second block: level 4, filled from resource 1 (loads 4, 4, 4)
+        mapping = schedulers_np.block_list_scheduler(
+                [4, 1, 1, 2, 2, 2, 2], 3, block_size=3)
+        self.assertEqual(mapping.tolist(), [0, 2, 2, 1, 1, 2, 0])
+
+    def test_block_of_one_is_list_scheduling(self):
+        task_loads = np.random.default_rng(5).integers(0, 20, 300)
+        mapping = schedulers_np.block_list_scheduler(task_loads, 7,
+                                                     block_size=1)
+        self.assertEqual(mapping.tolist(),
+                         schedulers.list_scheduler(task_loads.tolist(), 7))
+
+    def test_bound(self):
+        rng = np.random.default_rng(6)
+        for num_resources in [1, 3, 50, 1000]:
+            task_loads = rng.pareto(1.5, 20000) + 1
+            bound = task_loads.sum() / num_resources + task_loads.max()
+            for block_size in [1000, 1 << 18]:
+                mapping = schedulers_np.block_list_scheduler(
+                        task_loads, num_resources, block_size)
+                metrics = compute_metrics(mapping, task_loads, num_resources)
+                self.assertLessEqual(metrics.makespan, bound * (1 + 1e-12))
+                self.assertEqual(metrics.tasks_per_resource.sum(), 20000)
+
+    def test_zero_loads_and_output(self):
+        out = np.empty(5, dtype=np.int32)
+        result = schedulers_np.block_list_scheduler([0, 0, 3, 0, 0], 2,
+                                                    block_size=2, out=out)
+        self.assertIs(result, out)
+        self.assertEqual(out.tolist(), [0, 0, 0, 1, 1])
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.task_loads = rng.integers(1, 10, (50, 12))
+        self.num_resources = rng.integers(1, 16, 50)
+
+    def test_same_as_single_instances(self):
+        num_tasks = self.task_loads.shape[1]
+        ls_mapping = schedulers_np.batch_list_scheduler(
+                self.task_loads, self.num_resources)
+        rr_mapping = schedulers_np.batch_round_robin(
+                num_tasks, self.num_resources)
+        compact_mapping = schedulers_np.batch_compact(
+                num_tasks, self.num_resources)
+        for i in range(len(self.num_resources)):
+            num_resources = int(self.num_resources[i])
+            self.assertEqual(
+                    ls_mapping[i].tolist(),
+                    schedulers.list_scheduler(self.task_loads[i].tolist(),
+                                              num_resources))
+            self.assertEqual(
+                    rr_mapping[i].tolist(),
+                    schedulers.round_robin(num_tasks, num_resources))
+            self.assertEqual(
+                    compact_mapping[i].tolist(),
+                    schedulers.compact(num_tasks, num_resources))
+
+    def test_shared_num_resources(self):
+        rr_mapping = schedulers_np.batch_round_robin(10, 3, num_instances=4)
+        compact_mapping = schedulers_np.batch_compact(10, 3, num_instances=4)
+        self.assertEqual(rr_mapping.shape, (4, 10))
+        self.assertEqual(rr_mapping[3].tolist(),
+                         schedulers.round_robin(10, 3))
+        self.assertEqual(compact_mapping[3].tolist(),
+                         schedulers.compact(10, 3))
+        self.assertEqual(schedulers_np.batch_compact(10, 3).shape, (1, 10))
+
+    def test_batch_metrics(self):
+        mappings = schedulers_np.batch_list_scheduler(
+                self.task_loads, self.num_resources)
+        batch = compute_batch_metrics(
+                mappings, self.task_loads, self.num_resources)
+        for i in range(len(self.num_resources)):
+            num_resources = int(self.num_resources[i])
+            metrics = compute_metrics(
+                    mappings[i], self.task_loads[i], num_resources)
+            self.assertEqual(
+                    batch.resource_loads[i, :num_resources].tolist(),
+                    metrics.resource_loads.tolist())
+            self.assertEqual(batch.makespan[i], metrics.makespan)
+            self.assertEqual(batch.median[i], metrics.median)
+            self.assertAlmostEqual(batch.stdev[i], metrics.stdev)
+            self.assertAlmostEqual(batch.imbalance[i], metrics.imbalance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import simulator.schedulers as schedulers                 # noqa
+from simulator.service import SchedulingService           # noqa
+from simulator.service import ServiceClient               # noqa
+
+
+class SchedulingServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'service.sock')
+        self.service = SchedulingService(4, max_batch=16, max_pending=8)
+        await self.service.start(path=self.path)
+        self.client = await ServiceClient.connect(path=self.path)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.service.close()
+        self.assertFalse(os.path.exists(self.path))
+        self.directory.cleanup()
+
+    async def test_list_policy(self):
+        task_loads = [5, 3, 8, 1, 9, 2, 7]
+        resources = (await self.client.assign(task_loads[:3]) +
+                     await self.client.assign(task_loads[3:]))
+        self.assertEqual(resources,
+                         schedulers.list_scheduler(task_loads, 4))
+
+    async def test_lpt_policy(self):
+        task_loads = [5, 3, 8, 1, 9, 2, 7]
+        resources = await self.client.assign(task_loads, policy='lpt')
+        self.assertEqual(resources, schedulers.lpt(task_loads, 4))
+        # Later tasks take the current loads into account
+        self.assertEqual(await self.client.assign([4], policy='lpt'), [3])
+
+    async def test_metrics(self):
+        await self.client.assign([5, 3, 8, 1, 9])
+        metrics = await self.client.metrics(resource_loads=True)
+        self.assertEqual(metrics['num_tasks'], 5)
+        self.assertEqual(metrics['total_load'], 26)
+        self.assertEqual(metrics['resource_loads'], [5, 3, 8, 10])
+        self.assertEqual(metrics['makespan'], 10)
+        self.assertEqual(metrics['requests'], 2)
+        self.assertEqual(metrics['connections'], 1)
+        self.assertNotIn('resource_loads', await self.client.metrics())
+
+    async def test_errors(self):
+        for request in [{'op': 'assign', 'loads': [1, 'a']},
+                        {'op': 'assign', 'loads': [2, -1]},
+                        {'op': 'assign', 'loads': 3},
+                        {'op': 'assign', 'loads': [float('nan'), 1]},
+                        {'op': 'assign', 'loads': [float('inf')]},
+                        {'op': 'assign', 'loads': [True, 1]},
+                        {'op': 'assign', 'loads': [-float('inf')],
+                         'policy': 'lpt'},
+                        {'op': 'assign', 'loads': [1], 'policy': 'fifo'},
+                        {'op': 'stop'}]:
+            with self.assertRaises(ValueError):
+                await self.client.requests([request])
+        self.client.writer.write(b'not json\n[1, 2]\n' +
+                                 b'{"op": "assign", "loads": [1e400]}\n')
+        for _ in range(3):
+            response = json.loads(await self.client.reader.readline())
+            self.assertIn('error', response)
+        # Invalid requests do not change the state
+        metrics = await self.client.metrics()
+        self.assertEqual(metrics['num_tasks'], 0)
+        self.assertEqual(await self.client.assign([1]), [0])
+
+    async def test_nested_json(self):
+        # json.loads raises RecursionError, which must not stop the worker
+        self.client.writer.write(b'[' * 200000 + b']' * 200000 + b'\n')
+        response = json.loads(await self.client.reader.readline())
+        self.assertIn('error', response)
+        other = await ServiceClient.connect(path=self.path)
+        self.assertEqual(await asyncio.wait_for(other.assign([1, 2]), 5),
+                         [0, 1])
+        await other.close()
+        self.assertEqual(await self.client.assign([3]), [2])
+        self.assertFalse(self.service._worker.done())
+
+    async def test_batching_and_backpressure(self):
+        other = await ServiceClient.connect(path=self.path)
+        requests = [{'op': 'assign', 'loads': [1, 2]}] * 200
+        first, second = await asyncio.gather(
+                self.client.requests(requests), other.requests(requests))
+        await other.close()
+        self.assertEqual(len(first) + len(second), 400)
+        self.assertTrue(all(len(response['resources']) == 2
+                            for response in first + second))
+        # Responses keep the order of the requests
+        self.assertEqual([response['id'] for response in first],
+                         list(range(200)))
+        metrics = await self.client.metrics(resource_loads=True)
+        self.assertEqual(metrics['num_tasks'], 800)
+        self.assertEqual(sum(metrics['resource_loads']), 1200)
+        self.assertEqual(max(metrics['resource_loads']),
+                         metrics['makespan'])
+        # List scheduling bound: average load plus the largest task load
+        self.assertLessEqual(metrics['makespan'], 300 + 2)
+        self.assertLess(metrics['batches'], metrics['requests'])
+        self.assertEqual(metrics['pending'], 0)
+
+
+class TcpServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_loopback(self):
+        service = SchedulingService(2)
+        host, port = await service.start(host='127.0.0.1', port=0)
+        client = await ServiceClient.connect(host=host, port=port)
+        self.assertEqual(await client.assign([3, 2, 2]), [0, 1, 1])
+        await client.close()
+        await service.close()
+
+    async def test_only_loopback(self):
+        service = SchedulingService(2)
+        with self.assertRaises(ValueError):
+            await service.start(host='0.0.0.0')
+        await service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+from simulator.simulation import simulate                 # noqa
+from simulator.simulation import work_stealing_scheduler  # noqa
+from simulator.support import compute_metrics             # noqa
+import simulator.schedulers as schedulers                 # noqa
+
+
+class SimulateTest(unittest.TestCase):
+    def test_static_mapping(self):
+        task_loads = [3, 1, 2, 4, 5]
+        mapping = [0, 0, 1, 1, 0]
+        result = simulate(mapping, task_loads, 2)
+        self.assertEqual(result.start_times.tolist(), [0, 3, 0, 2, 4])
+        self.assertEqual(result.finish_times.tolist(), [3, 4, 2, 6, 9])
+        self.assertEqual(result.resources.tolist(), mapping)
+        self.assertEqual(result.makespan, 9)
+        self.assertEqual(result.utilization().tolist(), [1, 6 / 9])
+        self.assertEqual(result.idle_periods(0), [])
+        self.assertEqual(result.idle_periods(1), [(6, 9)])
+
+    def test_same_makespan_as_metrics(self):
+        task_loads = np.random.default_rng(4).integers(1, 100, 1000)
+        mapping = schedulers.lpt(task_loads, 7)
+        result = simulate(mapping, task_loads, 7)
+        metrics = compute_metrics(mapping, task_loads, 7)
+        self.assertEqual(result.makespan, metrics.makespan)
+        self.assertEqual(result.busy_times().tolist(),
+                         metrics.resource_loads.tolist())
+
+    def test_arrivals_and_speeds(self):
+        result = simulate([0, 0, 1], [4, 2, 6], 2,
+                          arrival_times=[1, 0, 5], resource_speeds=[2, 3])
+        self.assertEqual(result.start_times.tolist(), [1, 0, 5])
+        self.assertEqual(result.finish_times.tolist(), [3, 1, 7])
+        self.assertEqual(result.idle_periods(0), [(3, 7)])
+        self.assertEqual(result.idle_periods(1), [(0, 5)])
+
+    def test_dependencies(self):
+        # Diamond: 0 -> 1, 0 -> 2, 1 -> 3, 2 -> 3
+        result = simulate([0, 0, 1, 1], [2, 3, 1, 1], 2,
+                          dependencies=([0, 0, 1, 2], [1, 2, 3, 3]))
+        self.assertEqual(result.start_times.tolist(), [0, 2, 2, 5])
+        self.assertEqual(result.finish_times.tolist(), [2, 5, 3, 6])
+        self.assertEqual(result.idle_periods(1), [(0, 2), (3, 5)])
+
+    def test_work_stealing(self):
+        task_loads = [1] * 8
+        mapping = [0] * 8
+        result = simulate(mapping, task_loads, 2)
+        self.assertEqual(result.makespan, 8)
+        result = simulate(mapping, task_loads, 2, work_stealing=True)
+        self.assertEqual(result.makespan, 4)
+        self.assertEqual(np.bincount(result.resources).tolist(), [4, 4])
+        # Stolen tasks come from the end of the queue
+        self.assertEqual(result.resources[:2].tolist(), [0, 1])
+        self.assertEqual(result.resources[-1], 1)
+
+    def test_steal_from_longest_queue(self):
+        mapping = [0, 1, 2, 0, 1, 1, 1]
+        task_loads = [10, 10, 1, 1, 1, 1, 1]
+        arrival_times = [0, 0, 0, 0.5, 0.5, 0.5, 0.5]
+        result = simulate(mapping, task_loads, 3, arrival_times,
+                          work_stealing=True)
+        self.assertEqual(result.resources.tolist(), [0, 1, 2, 2, 2, 2, 2])
+        # Ties between queues go to the resource with the lowest index
+        self.assertEqual(result.start_times[3:].tolist(), [3, 4, 2, 1])
+
+    def test_utilization_timeline(self):
+        result = simulate([0, 0, 1], [1, 2, 1.5], 2)
+        timeline = result.utilization_timeline(3)
+        self.assertEqual(timeline.shape, (2, 3))
+        self.assertTrue(np.allclose(timeline, [[1, 1, 1], [1, 0.5, 0]]))
+        self.assertTrue(np.allclose(timeline.mean(axis=1),
+                                    result.utilization()))
+
+    def test_no_tasks(self):
+        result = simulate([], [], 3)
+        self.assertEqual(result.makespan, 0)
+        self.assertEqual(result.utilization().tolist(), [0, 0, 0])
+        self.assertEqual(result.utilization_timeline(4).shape, (3, 4))
+
+
+class WorkStealingSchedulerTest(unittest.TestCase):
+    def test_steal_one_task(self):
+        mapping, num_steals, makespan = work_stealing_scheduler(
+                [0] * 8, [1] * 8, 2)
+        self.assertEqual(mapping.tolist(), [0, 0, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(num_steals.tolist(), [0, 4])
+        self.assertEqual(makespan, 4)
+
+    def test_steal_half(self):
+        mapping, num_steals, makespan = work_stealing_scheduler(
+                [0] * 8, [1] * 8, 2, granularity=0.5)
+        self.assertEqual(mapping.tolist(), [0, 0, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(num_steals.tolist(), [0, 2])
+        self.assertEqual(makespan, 4)
+
+    def test_steal_latency(self):
+        mapping, num_steals, makespan = work_stealing_scheduler(
+                [0] * 8, [1] * 8, 2, steal_latency=1.0)
+        self.assertEqual(mapping.tolist(), [0, 0, 0, 0, 0, 0, 1, 1])
+        self.assertEqual(num_steals.tolist(), [0, 2])
+        self.assertEqual(makespan, 6)
+
+    def test_hierarchical(self):
+        # Remote steals are too slow to help: only the sibling steals
+        mapping, num_steals, makespan = work_stealing_scheduler(
+                [0] * 8, [1] * 8, 4, victim_selection='hierarchical',
+                levels=[2, 2], steal_latency=[0.0, 10.0])
+        self.assertEqual(set(mapping.tolist()), {0, 1})
+        self.assertEqual(num_steals.tolist(), [0, 4, 0, 0])
+        self.assertEqual(makespan, 4)
+
+    def test_better_than_static(self):
+        num_tasks, num_resources = 2000, 16
+        task_loads = np.random.default_rng(9).integers(1, 100, num_tasks)
+        static = schedulers.compact(num_tasks, num_resources)
+        for victim_selection in ['random', 'hierarchical']:
+            mapping, num_steals, makespan = work_stealing_scheduler(
+                    static, task_loads, num_resources, victim_selection,
+                    levels=[4, 4], steal_latency=[0.5, 2.0], rng_seed=0)
+            self.assertEqual(len(mapping), num_tasks)
+            self.assertLess(makespan, compute_metrics(
+                    static, task_loads, num_resources).makespan)
+            self.assertGreater(num_steals.sum(), 0)
+            self.assertLessEqual(compute_metrics(
+                    mapping, task_loads, num_resources).makespan, makespan)
+
+    def test_invalid_selection(self):
+        with self.assertRaises(ValueError):
+            work_stealing_scheduler([0], [1], 2, victim_selection='nearest')
+        with self.assertRaises(ValueError):
+            work_stealing_scheduler([0], [1], 2,
+                                    victim_selection='hierarchical')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+import simulator.storage as storage                       # noqa
+import simulator.schedulers as schedulers                 # noqa
+import simulator.schedulers_np as schedulers_np           # noqa
+from simulator.support import compute_metrics             # noqa
+from simulator.support import evaluate_mapping            # noqa
+
+
+class StorageTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_write_and_open(self):
+        filename = self.path('loads.bin')
+        storage.write_array(filename, [5, 1, 4], 'loads')
+        header = storage.read_header(filename)
+        self.assertEqual(header['kind'], 'loads')
+        self.assertEqual(header['dtype'], np.float64)
+        self.assertEqual(header['length'], 3)
+        self.assertEqual(os.path.getsize(filename), storage.HEADER_SIZE + 24)
+        loads = storage.open_array(filename, kind='loads')
+        self.assertIsInstance(loads, np.memmap)
+        self.assertEqual(loads.tolist(), [5, 1, 4])
+        with self.assertRaises(ValueError):
+            loads[0] = 2  # Read-only
+
+    def test_keep_dtype(self):
+        filename = self.path('loads.bin')
+        storage.write_array(filename, np.arange(10, dtype=np.uint16),
+                            'loads')
+        loads = storage.open_array(filename)
+        self.assertEqual(loads.dtype, np.uint16)
+        self.assertEqual(loads.tolist(), list(range(10)))
+
+    def test_create_array(self):
+        filename = self.path('mapping.bin')
+        mapping = storage.create_array(filename, 1000, 'mapping')
+        self.assertEqual(mapping.dtype, np.int32)
+        self.assertEqual(mapping.sum(), 0)
+        schedulers_np.round_robin(1000, 7, out=mapping)
+        mapping.flush()
+        del mapping
+        mapping = storage.open_array(filename, kind='mapping')
+        self.assertEqual(mapping.tolist(), schedulers.round_robin(1000, 7))
+
+    def test_invalid_files(self):
+        filename = self.path('speeds.bin')
+        storage.write_array(filename, [1.0, 2.0], 'speeds')
+        with self.assertRaises(ValueError):
+            storage.open_array(filename, kind='loads')
+        with open(filename, 'ab') as array_file:
+            array_file.write(b'\x00')
+        with self.assertRaises(ValueError):
+            storage.read_header(filename)
+        with open(filename, 'wb') as array_file:
+            array_file.write(b'not an array file')
+        with self.assertRaises(ValueError):
+            storage.open_array(filename)
+        with self.assertRaises(ValueError):
+            storage.write_array(filename, [1], 'weights')
+        with self.assertRaises(ValueError):
+            storage.create_array(filename, 1, 'loads', np.complex128)
+
+    def test_empty_array(self):
+        filename = self.path('loads.bin')
+        storage.write_array(filename, [], 'loads')
+        self.assertEqual(len(storage.open_array(filename)), 0)
+
+    def test_schedulers_on_memory_maps(self):
+        task_loads = np.random.default_rng(1).integers(1, 100, 5000)
+        storage.write_array(self.path('loads.bin'), task_loads, 'loads',
+                            np.int32)
+        loads = storage.open_array(self.path('loads.bin'))
+        for scheduler in [schedulers_np.round_robin, schedulers_np.compact]:
+            mapping = storage.create_array(self.path('mapping.bin'),
+                                           len(loads), 'mapping')
+            result = scheduler(len(loads), 13, out=mapping)
+            self.assertIs(result, mapping)
+            self.assertEqual(mapping.tolist(),
+                             scheduler(len(loads), 13).tolist())
+        mapping = storage.create_array(self.path('mapping.bin'),
+                                       len(loads), 'mapping')
+        schedulers_np.list_scheduler(loads, 13, out=mapping)
+        self.assertEqual(mapping.tolist(),
+                         schedulers.list_scheduler(task_loads.tolist(), 13))
+        self.assertEqual(schedulers.lpt(loads, 13),
+                         schedulers.lpt(task_loads, 13))
+        resource_loads = evaluate_mapping(mapping, loads, 13, verbose=False)
+        self.assertEqual(resource_loads, compute_metrics(
+                mapping.tolist(), task_loads.tolist(), 13)
+                .resource_loads.tolist())
+
+    def test_output_length(self):
+        with self.assertRaises(ValueError):
+            schedulers_np.compact(10, 2, out=np.empty(9, dtype=np.int32))
+
+
+if __name__ == '__main__':
+    unittest.main()
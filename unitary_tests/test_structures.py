@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                                        # noqa
+from simulator.structures import Workload, Mapping        # noqa
+import simulator.schedulers as schedulers                 # noqa
+import simulator.schedulers_np as schedulers_np           # noqa
+import simulator.support as support                       # noqa
+
+
+class WorkloadTest(unittest.TestCase):
+    def test_sequence_and_array(self):
+        workload = Workload([3, 1, 2])
+        self.assertEqual(len(workload), 3)
+        self.assertEqual(workload[0], 3)
+        self.assertIsInstance(workload[0], int)
+        # Slices, lists and arrays of indices return read-only arrays
+        for index in (slice(0, 2), [0, 1], np.array([0, 1]),
+                      np.array([True, True, False])):
+            self.assertEqual(workload[index].tolist(), [3, 1])
+            self.assertFalse(workload[index].flags.writeable)
+        self.assertEqual(workload[np.int64(-1)], 2)
+        self.assertEqual(list(workload), [3, 1, 2])
+        self.assertEqual(workload.dtype, np.int64)
+        self.assertTrue(np.shares_memory(np.asarray(workload),
+                                         workload.loads))
+        self.assertEqual(Workload([0.5]).dtype, np.float64)
+        self.assertEqual(Workload([1, 2], dtype='uint32').nbytes, 8)
+        # Arrays keep their type
+        for dtype in ('int32', 'uint32', 'uint64', 'float32'):
+            loads = np.array([70000, 1], dtype=dtype)
+            workload = Workload(loads)
+            self.assertEqual(workload.dtype, dtype)
+            self.assertEqual(workload.tolist(), loads.tolist())
+
+    def test_no_copy(self):
+        loads = np.array([3, 1, 2], dtype=np.uint32)
+        workload = Workload(loads, copy=False)
+        self.assertTrue(np.shares_memory(workload.loads, loads))
+        self.assertEqual(workload.total_load, 6)
+        with self.assertRaises(ValueError):
+            loads[1] = 5
+        workload[1] = 5
+        self.assertEqual(loads.tolist(), [3, 1, 2])
+        self.assertEqual(workload.total_load, 10)
+
+    def test_cache_invalidation(self):
+        workload = Workload([3, 1, 2])
+        self.assertEqual(workload.sorted_order().tolist(), [0, 2, 1])
+        self.assertEqual(workload.total_load, 6)
+        workload[1] = 5
+        self.assertEqual(workload.sorted_order().tolist(), [1, 0, 2])
+        self.assertEqual(workload.total_load, 10)
+        workload.append(7)
+        workload.extend([4, 4])
+        self.assertEqual(workload.tolist(), [3, 5, 2, 7, 4, 4])
+        self.assertEqual(workload.max_load, 7)
+        self.assertEqual(workload.sorted_order().tolist(),
+                         [3, 1, 4, 5, 0, 2])
+
+    def test_read_only_views(self):
+        workload = Workload([3, 1, 2])
+        with self.assertRaises(ValueError):
+            workload.loads[0] = 4
+        with self.assertRaises(ValueError):
+            workload.sorted_order()[0] = 1
+
+
+class MappingTest(unittest.TestCase):
+    def test_sequence_and_caches(self):
+        mapping = Mapping([1, 0, 1, 2], 4)
+        self.assertEqual(mapping.resources.dtype, np.int32)
+        self.assertEqual(mapping[2], 1)
+        self.assertEqual(mapping[[3, 0]].tolist(), [2, 1])
+        self.assertEqual(mapping.task_counts().tolist(), [1, 2, 1, 0])
+        self.assertEqual(mapping.tasks_of(1).tolist(), [0, 2])
+        self.assertEqual(mapping.tasks_of(3).tolist(), [])
+        workload = Workload([1, 2, 3, 4])
+        self.assertEqual(mapping.resource_loads(workload).tolist(),
+                         [2, 4, 4, 0])
+        self.assertIs(mapping.resource_loads(workload),
+                      mapping.resource_loads(workload))
+        # Changes to the mapping or the workload invalidate the caches
+        mapping[0] = 3
+        self.assertEqual(mapping.task_counts().tolist(), [1, 1, 1, 1])
+        self.assertEqual(mapping.tasks_of(1).tolist(), [2])
+        self.assertEqual(mapping.resource_loads(workload).tolist(),
+                         [2, 3, 4, 1])
+        workload[2] = 10
+        self.assertEqual(mapping.resource_loads(workload).tolist(),
+                         [2, 10, 4, 1])
+        mapping.extend([0])
+        self.assertEqual(len(mapping), 5)
+        with self.assertRaises(ValueError):
+            mapping.resource_loads(workload)
+
+    def test_invalid_resources(self):
+        self.assertEqual(Mapping([0, 5]).num_resources, 6)
+        with self.assertRaises(ValueError):
+            Mapping([0, 4], 4)
+        mapping = Mapping([0, 1], 2)
+        with self.assertRaises(ValueError):
+            mapping[0] = -1
+        with self.assertRaises(ValueError):
+            mapping.append(2)
+
+    def test_no_copy(self):
+        resources = schedulers_np.round_robin(6, 3)
+        mapping = Mapping(resources, 3, copy=False)
+        self.assertTrue(np.shares_memory(mapping.resources, resources))
+        self.assertEqual(mapping.task_counts().tolist(), [2, 2, 2])
+        # The array cannot change behind the cached counts
+        with self.assertRaises(ValueError):
+            resources[0] = 1
+        # The mapping copies the array before changing it
+        mapping[0] = 2
+        self.assertEqual(resources[0], 0)
+        self.assertEqual(mapping.task_counts().tolist(), [1, 2, 3])
+
+
+class CompatibilityTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.task_loads = rng.integers(1, 50, 40).tolist()
+        self.workload = Workload(self.task_loads)
+        self.num_resources = 5
+
+    def test_schedulers(self):
+        for scheduler in [schedulers.list_scheduler, schedulers.lpt,
+                          schedulers.karmarkar_karp, schedulers.multifit]:
+            self.assertEqual(
+                    scheduler(self.workload, self.num_resources),
+                    scheduler(self.task_loads, self.num_resources))
+        self.assertEqual(
+                schedulers.lpt_with_limits(self.workload, 5, 9),
+                schedulers.lpt_with_limits(self.task_loads, 5, 9))
+        self.assertEqual(
+                schedulers.makespan_lower_bound(self.workload, 5),
+                schedulers.makespan_lower_bound(self.task_loads, 5))
+        self.assertIs(schedulers.decreasing_load_order(self.workload),
+                      self.workload.sorted_order())
+
+    def test_support(self):
+        mapping = schedulers.lpt(self.task_loads, self.num_resources)
+        expected = support.compute_metrics(
+                mapping, self.task_loads, self.num_resources)
+        compact_mapping = Mapping(mapping, self.num_resources)
+        for task_loads in [self.task_loads, self.workload]:
+            metrics = support.compute_metrics(
+                    compact_mapping, task_loads, self.num_resources)
+            self.assertEqual(metrics.resource_loads.tolist(),
+                             expected.resource_loads.tolist())
+            self.assertEqual(metrics.tasks_per_resource.tolist(),
+                             expected.tasks_per_resource.tolist())
+            self.assertEqual(metrics.makespan, expected.makespan)
+        refined = schedulers.refine(compact_mapping, self.workload,
+                                    self.num_resources)
+        self.assertEqual(refined, schedulers.refine(
+                mapping, self.task_loads, self.num_resources))
+
+
+if __name__ == '__main__':
+    unittest.main()
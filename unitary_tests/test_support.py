@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 
 import unittest
+import random
+import concurrent.futures
 import sys
 # Add the parent directory to the path so we can import
 # code from our simulator
 sys.path.append('../')
 
+import numpy as np                                     # noqa
 from simulator.support import generate_uniform_loads   # noqa
 from simulator.support import evaluate_mapping         # noqa
+from simulator.support import compute_metrics          # noqa
+from simulator.support import summarize                # noqa
+from simulator.support import approximation_ratio      # noqa
 
 
 class GULTest(unittest.TestCase):
@@ -32,6 +38,26 @@ class GULTest(unittest.TestCase):
         self.assertEqual(task_loads[3], 26)
         self.assertEqual(task_loads[4], 29)
 
+    def test_generators(self):
+        task_loads = generate_uniform_loads(1000, 1, 7, rng=random.Random(4))
+        self.assertEqual(task_loads, generate_uniform_loads(1000, 1, 7, 4))
+        random.seed(4)
+        self.assertEqual(task_loads,
+                         [random.randrange(1, 7) for i in range(1000)])
+        task_loads = generate_uniform_loads(
+                1000, 1, 7, rng=np.random.default_rng(4), as_array=True)
+        self.assertEqual(task_loads.dtype, np.int64)
+        self.assertTrue(np.all((task_loads >= 1) & (task_loads < 7)))
+
+    def test_threads(self):
+        expected = [generate_uniform_loads(10000, rng_seed=seed)
+                    for seed in range(8)]
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            task_loads = list(pool.map(
+                    lambda seed: generate_uniform_loads(10000, rng_seed=seed),
+                    range(8)))
+        self.assertEqual(task_loads, expected)
+
 
 class EMTest(unittest.TestCase):
     def test_small_mapping(self):
@@ -51,5 +77,34 @@ class EMTest(unittest.TestCase):
         self.assertEqual(resource_loads[4], 0)
 
 
+class MetricsTest(unittest.TestCase):
+    def test_small_mapping(self):
+        task_loads = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        mapping = [0, 0, 0, 0, 1, 1, 1, 1, 3, 3]
+        metrics = compute_metrics(mapping, task_loads, 5)
+
+        self.assertEqual(metrics.resource_loads.tolist(), [10, 26, 0, 19, 0])
+        self.assertEqual(metrics.tasks_per_resource.tolist(), [4, 4, 0, 2, 0])
+        self.assertEqual(metrics.makespan, 26)
+        self.assertEqual(metrics.minimum, 0)
+        self.assertEqual(metrics.average, 11)
+        self.assertEqual(metrics.median, 10)
+        self.assertAlmostEqual(metrics.stdev, 11.532562594670797)
+        self.assertAlmostEqual(metrics.imbalance, 26/11 - 1)
+
+    def test_approximation_ratio(self):
+        task_loads = [5, 5, 4, 4, 3, 3, 3]
+        mapping = [0, 1, 2, 2, 1, 0, 0]
+        self.assertAlmostEqual(approximation_ratio(mapping, task_loads, 3),
+                               11/9)
+        self.assertAlmostEqual(
+                approximation_ratio(mapping, task_loads, 3, 10), 1.1)
+
+    def test_summarize(self):
+        self.assertEqual(summarize([1, 2, 3]), '[1, 2, 3]')
+        self.assertEqual(summarize(list(range(100)), 4),
+                         '[0, 1, ..., 98, 99] (100 values)')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import tempfile
+import sys
+# Add the parent directory to the path so we can import
+# code from our simulator
+sys.path.append('../')
+
+import numpy as np                    # noqa
+import simulator.workloads as workloads  # noqa
+
+
+GENERATORS = [workloads.uniform_loads, workloads.exponential_loads,
+              workloads.pareto_loads, workloads.bimodal_loads,
+              workloads.zipf_loads]
+
+
+class GeneratorsTest(unittest.TestCase):
+    def test_size_and_seed(self):
+        for generator in GENERATORS:
+            loads = generator(1000, rng_seed=7)
+            self.assertEqual(len(loads), 1000)
+            self.assertTrue(np.all(loads >= 0))
+            self.assertTrue(np.array_equal(loads,
+                                           generator(1000, rng_seed=7)))
+
+    def test_distributions(self):
+        loads = workloads.exponential_loads(100000, mean=3.0, rng_seed=1)
+        self.assertAlmostEqual(loads.mean(), 3.0, delta=0.1)
+        loads = workloads.pareto_loads(1000, minimum=2.0, rng_seed=1)
+        self.assertTrue(np.all(loads >= 2.0))
+        loads = workloads.zipf_loads(1000, max_load=50, rng_seed=1)
+        self.assertTrue(np.all((loads >= 1) & (loads <= 50)))
+        loads = workloads.bimodal_loads(100000, high_fraction=0.25,
+                                        rng_seed=1)
+        self.assertAlmostEqual(np.mean(loads > 5.0), 0.25, delta=0.01)
+
+
+class ChunksTest(unittest.TestCase):
+    def test_chunks(self):
+        chunks = list(workloads.iter_loads(workloads.exponential_loads,
+                                           1050, 100, rng_seed=3, mean=2.0))
+        self.assertEqual([len(chunk) for chunk in chunks], [100] * 10 + [50])
+        again = workloads.iter_loads(workloads.exponential_loads,
+                                     1050, 100, rng_seed=3, mean=2.0)
+        self.assertTrue(np.array_equal(np.concatenate(chunks),
+                                       np.concatenate(list(again))))
+
+    def test_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            text_file = os.path.join(directory, 'trace.txt')
+            with open(text_file, 'w') as trace:
+                trace.write('1\n2.5\n4\n')
+            npy_file = os.path.join(directory, 'trace.npy')
+            np.save(npy_file, np.array([1, 2.5, 4]))
+            for filename in [text_file, npy_file]:
+                self.assertEqual(workloads.trace_loads(filename).tolist(),
+                                 [1, 2.5, 4])
+                self.assertEqual(
+                        workloads.trace_loads(filename, 5, 1).tolist(),
+                        [2.5, 4, 1, 2.5, 4])
+                chunks = workloads.iter_loads(workloads.trace_loads, 7, 3,
+                                              trace=filename)
+                self.assertEqual(np.concatenate(list(chunks)).tolist(),
+                                 [1, 2.5, 4, 1, 2.5, 4, 1])
+                chunks = workloads.iter_loads(workloads.trace_loads, 4, 3,
+                                              trace=filename, offset=2)
+                self.assertEqual(np.concatenate(list(chunks)).tolist(),
+                                 [4, 1, 2.5, 4])
+
+    def test_trace_offset_beyond_end(self):
+        trace = np.arange(10)
+        self.assertEqual(workloads.trace_loads(trace, offset=12).tolist(),
+                         list(range(2, 10)))
+        self.assertEqual(workloads.trace_loads(trace, 3, 12).tolist(),
+                         [2, 3, 4])
+
+    def test_empty_trace(self):
+        trace = np.array([])
+        self.assertEqual(workloads.trace_loads(trace).tolist(), [])
+        self.assertEqual(workloads.trace_loads(trace, 0, 3).tolist(), [])
+        with self.assertRaises(ValueError):
+            workloads.trace_loads(trace, 2)
+        with tempfile.TemporaryDirectory() as directory:
+            text_file = os.path.join(directory, 'trace.txt')
+            open(text_file, 'w').close()
+            self.assertEqual(workloads.trace_loads(text_file).tolist(), [])
+            with self.assertRaises(ValueError):
+                workloads.trace_loads(text_file, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()